@@ -0,0 +1,52 @@
+"""user_profiles: preferences y mobility_constraints NOT NULL con default '{}'
+
+Primera revisión: parte del esquema que crea Base.metadata.create_all antes
+de las migraciones. Bases existentes: `alembic upgrade head`; bases nuevas
+creadas por create_all (ya con el esquema final): `alembic stamp head`.
+
+Revision ID: a1c3e5f70b21
+Revises: 
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c3e5f70b21'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = ('preferences', 'mobility_constraints')
+
+
+def upgrade() -> None:
+    for column in JSON_COLUMNS:
+        # Rellenar nulos antes de imponer NOT NULL
+        op.execute(
+            f"UPDATE user_profiles SET {column} = '{{}}'::jsonb WHERE {column} IS NULL"
+        )
+        op.alter_column(
+            'user_profiles',
+            column,
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False
+        )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'user_profiles',
+        'mobility_constraints',
+        server_default=None,
+        nullable=True
+    )
+    op.alter_column(
+        'user_profiles',
+        'preferences',
+        server_default=None
+    )
@@ -0,0 +1,46 @@
+"""attractions: search_tsv generada (nombre, tags, descripción) e índice GIN
+
+Revision ID: a8c2e4f61d37
+Revises: f5b8d0e26a93
+Create Date: 2026-10-16 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c2e4f61d37'
+down_revision: Union[str, None] = 'f5b8d0e26a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'attractions',
+        sa.Column(
+            'search_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+                "setweight(jsonb_to_tsvector('spanish', coalesce(tags, '[]'::jsonb), '[\"string\"]'), 'B') || "
+                "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')",
+                persisted=True
+            )
+        )
+    )
+    op.create_index(
+        'idx_attr_search_tsv',
+        'attractions',
+        ['search_tsv'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_attr_search_tsv', table_name='attractions')
+    op.drop_column('attractions', 'search_tsv')
@@ -0,0 +1,31 @@
+"""attractions: índice parcial (categoría, popularidad) para verificadas
+
+Revision ID: b6d4f8a03e19
+Revises: a8c2e4f61d37
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d4f8a03e19'
+down_revision: Union[str, None] = 'a8c2e4f61d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_attr_verified_cat_pop',
+        'attractions',
+        ['category', sa.text('popularity_score DESC')],
+        postgresql_where=sa.text('verified = true')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_attr_verified_cat_pop', table_name='attractions')
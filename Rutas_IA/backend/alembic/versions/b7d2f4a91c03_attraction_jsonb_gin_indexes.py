@@ -0,0 +1,40 @@
+"""attractions: índices GIN (jsonb_path_ops) en tags y accessibility
+
+Revision ID: b7d2f4a91c03
+Revises: a1c3e5f70b21
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f4a91c03'
+down_revision: Union[str, None] = 'a1c3e5f70b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_attraction_tags_gin',
+        'attractions',
+        ['tags'],
+        postgresql_using='gin',
+        postgresql_ops={'tags': 'jsonb_path_ops'}
+    )
+    op.create_index(
+        'idx_attraction_accessibility_gin',
+        'attractions',
+        ['accessibility'],
+        postgresql_using='gin',
+        postgresql_ops={'accessibility': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_attraction_accessibility_gin', table_name='attractions')
+    op.drop_index('idx_attraction_tags_gin', table_name='attractions')
@@ -0,0 +1,39 @@
+"""user_profiles: índice GIN de preferences con jsonb_path_ops
+
+Revision ID: c4e8a2d65f17
+Revises: b7d2f4a91c03
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d65f17'
+down_revision: Union[str, None] = 'b7d2f4a91c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_user_preferences', table_name='user_profiles', if_exists=True)
+    op.create_index(
+        'idx_user_prefs_path',
+        'user_profiles',
+        ['preferences'],
+        postgresql_using='gin',
+        postgresql_ops={'preferences': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_prefs_path', table_name='user_profiles')
+    op.create_index(
+        'idx_user_preferences',
+        'user_profiles',
+        ['preferences'],
+        postgresql_using='gin'
+    )
@@ -0,0 +1,30 @@
+"""attractions: índice (destination_id, category, rating DESC)
+
+Revision ID: d9f1b3c57e42
+Revises: c4e8a2d65f17
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f1b3c57e42'
+down_revision: Union[str, None] = 'c4e8a2d65f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_attr_dest_cat_rating',
+        'attractions',
+        ['destination_id', 'category', sa.text('rating DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_attr_dest_cat_rating', table_name='attractions')
@@ -0,0 +1,41 @@
+"""attractions: location_xy (Web Mercator, generada) con índice GiST
+
+Revision ID: e3a7c9d14b58
+Revises: d9f1b3c57e42
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9d14b58'
+down_revision: Union[str, None] = 'd9f1b3c57e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'attractions',
+        sa.Column(
+            'location_xy',
+            Geometry(geometry_type='POINT', srid=3857, spatial_index=False),
+            sa.Computed("ST_Transform(location::geometry, 3857)", persisted=True)
+        )
+    )
+    op.create_index(
+        'idx_attr_loc_xy',
+        'attractions',
+        ['location_xy'],
+        postgresql_using='gist'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_attr_loc_xy', table_name='attractions')
+    op.drop_column('attractions', 'location_xy')
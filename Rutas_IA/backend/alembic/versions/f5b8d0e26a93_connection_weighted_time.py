@@ -0,0 +1,39 @@
+"""attraction_connections: weighted_time generada e índice (origen, peso)
+
+Revision ID: f5b8d0e26a93
+Revises: e3a7c9d14b58
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d0e26a93'
+down_revision: Union[str, None] = 'e3a7c9d14b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'attraction_connections',
+        sa.Column(
+            'weighted_time',
+            sa.Numeric(10, 2),
+            sa.Computed("travel_time_minutes * COALESCE(traffic_factor, 1.0)", persisted=True)
+        )
+    )
+    op.create_index(
+        'idx_conn_from_weighted',
+        'attraction_connections',
+        ['from_attraction_id', 'weighted_time']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_conn_from_weighted', table_name='attraction_connections')
+    op.drop_column('attraction_connections', 'weighted_time')
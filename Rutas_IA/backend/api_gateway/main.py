@@ -37,7 +37,9 @@ async def lifespan(app: FastAPI):
     logger.info(f"🚀 Iniciando {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info("=" * 60)
     
-    # Crear tablas en la base de datos
+    # Crear tablas en la base de datos (solo las que falten: los cambios sobre
+    # tablas existentes se aplican con `alembic upgrade head`; una base recién
+    # creada aquí se marca con `alembic stamp head`, ver README)
     try:
         logger.info("📊 Verificando tablas de base de datos...")
         Base.metadata.create_all(bind=engine)
@@ -0,0 +1,21 @@
+# backend/scripts/recompute_popularity.py
+import sys
+import os
+
+# Agregar directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.database.base import SessionLocal
+from services.attractions.service import AttractionService
+
+def recompute():
+    db = SessionLocal()
+    try:
+        print("📈 Recalculando popularity_score de las atracciones...")
+        result = AttractionService.recompute_popularity_scores(db)
+        print(f"🏁 {result['updated']} atracciones actualizadas (rating medio global: {result['global_mean_rating']})")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    recompute()
@@ -8,9 +8,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
 from geoalchemy2.elements import WKTElement # type: ignore
+from geoalchemy2.shape import to_shape # type: ignore
 from shared.database.base import SessionLocal, engine, Base
 from shared.database.models import Destination, Attraction, AttractionConnection, User, UserProfile
 from shared.security import get_password_hash
+from services.connections.service import ConnectionService
 
 def haversine_distance(lon1, lat1, lon2, lat2):
     """Calcula distancia en metros entre dos puntos"""
@@ -134,33 +136,34 @@ def seed():
     # - Distancia > 15 km -> Car/Uber (40 km/h)
     
     print("🔄 Generando conexiones automáticas (esto puede tardar unos segundos)...")
-    connections_count = 0
     
     # Limpiar conexiones previas para no duplicar
     # db.query(AttractionConnection).delete() 
     # db.commit()
 
-    for i, origin in enumerate(all_attrs):
-        # Extraer lat/lon del WKT string o del objeto geoalchemy
-        # Truco rápido para parsing WKT sin librerías pesadas en el script
+    # Coordenadas de cada atracción (una sola vez, sin consultas por par)
+    coords = {}
+    for attr in all_attrs:
         try:
-            # Formato esperado: POINT(-99.1332 19.4326)
-            wkt_origin = db.scalar(origin.location.ST_AsText())
-            coords_o = wkt_origin.replace("POINT(", "").replace(")", "").split(" ")
-            lon1, lat1 = float(coords_o[0]), float(coords_o[1])
-        except:
+            point = to_shape(attr.location)
+            coords[attr.id] = (point.x, point.y)
+        except Exception:
             continue
-
-        for j, target in enumerate(all_attrs):
-            if i == j: continue # No conectar consigo mismo
-
-            # Extraer coords destino
-            try:
-                wkt_target = db.scalar(target.location.ST_AsText())
-                coords_t = wkt_target.replace("POINT(", "").replace(")", "").split(" ")
-                lon2, lat2 = float(coords_t[0]), float(coords_t[1])
-            except:
-                continue
+    
+    # Conexiones existentes en una consulta (en lugar de un SELECT por arista)
+    existing = set(
+        db.query(
+            AttractionConnection.from_attraction_id,
+            AttractionConnection.to_attraction_id,
+            AttractionConnection.transport_mode
+        ).all()
+    )
+    
+    new_connections = []
+    
+    for origin_id, (lon1, lat1) in coords.items():
+        for target_id, (lon2, lat2) in coords.items():
+            if origin_id == target_id: continue # No conectar consigo mismo
 
             # Calcular distancia
             dist_meters = haversine_distance(lon1, lat1, lon2, lat2)
@@ -185,27 +188,22 @@ def seed():
                 transit_time = int((dist_meters / 1000) / 20 * 60) + 10 
                 modes.append(("public_transport", transit_time, 5))
 
-            # Insertar en BD
             for mode, time_min, cost in modes:
-                # Verificar si ya existe
-                exists = db.query(AttractionConnection).filter(
-                    AttractionConnection.from_attraction_id == origin.id,
-                    AttractionConnection.to_attraction_id == target.id,
-                    AttractionConnection.transport_mode == mode
-                ).first()
+                if (origin_id, target_id, mode) in existing:
+                    continue
                 
-                if not exists:
-                    conn = AttractionConnection(
-                        from_attraction_id=origin.id,
-                        to_attraction_id=target.id,
-                        distance_meters=dist_meters,
-                        travel_time_minutes=time_min,
-                        transport_mode=mode,
-                        cost=cost,
-                        traffic_factor=1.2 if mode == 'taxi' else 1.0
-                    )
-                    db.add(conn)
-                    connections_count += 1
+                new_connections.append({
+                    'from_attraction_id': origin_id,
+                    'to_attraction_id': target_id,
+                    'distance_meters': dist_meters,
+                    'travel_time_minutes': time_min,
+                    'transport_mode': mode,
+                    'cost': cost,
+                    'traffic_factor': 1.2 if mode == 'taxi' else 1.0
+                })
+
+    # Insertar en BD por lotes (execute_values, sin objetos ORM)
+    connections_count = ConnectionService.bulk_insert(db, new_connections)
 
     db.commit()
     print(f"✅ {connections_count} Conexiones generadas exitosamente.")
@@ -16,6 +16,11 @@ from shared.schemas.attraction import (
     AttractionWithDistance
 )
 from shared.schemas.base import MessageResponse
+from shared.schemas import (
+    ATTRACTION_LIST_ADAPTER,
+    ATTRACTION_ITEM_LIST_ADAPTER,
+    dump_orm_list
+)
 from .service import AttractionService
 
 router = APIRouter(
@@ -79,6 +84,7 @@ def list_attractions(
     search: Optional[str] = Query(None, description="Buscar por nombre"),
     min_rating: Optional[float] = Query(None, ge=0.0, le=5.0, description="Rating mínimo"),
     verified_only: bool = Query(False, description="Solo atracciones verificadas"),
+    compact: bool = Query(False, description="Solo id, destino, nombre, categoría, rating y ubicación"),
     db: Session = Depends(get_db)
 ):
     """
@@ -92,6 +98,7 @@ def list_attractions(
     - search: Buscar por nombre (búsqueda parcial)
     - min_rating: Rating mínimo (0-5)
     - verified_only: Solo mostrar atracciones verificadas
+    - compact: Respuesta reducida (AttractionListItem), sin descripción ni JSONB
     """
     attractions, total = AttractionService.get_all(
         db=db,
@@ -101,14 +108,17 @@ def list_attractions(
         category=category,
         search=search,
         min_rating=min_rating,
-        verified_only=verified_only
+        verified_only=verified_only,
+        compact=compact
     )
     
+    adapter = ATTRACTION_ITEM_LIST_ADAPTER if compact else ATTRACTION_LIST_ADAPTER
+    
     return {
         "total": total,
         "skip": skip,
         "limit": limit,
-        "items": [AttractionRead.model_validate(a) for a in attractions]
+        "items": dump_orm_list(adapter, attractions)
     }
 
 
@@ -148,7 +158,7 @@ def search_attractions(
     
     return {
         "total": total,
-        "items": [AttractionRead.model_validate(a) for a in attractions]
+        "items": dump_orm_list(ATTRACTION_LIST_ADAPTER, attractions)
     }
 
 
@@ -231,7 +241,8 @@ def get_attractions_by_category(
         limit=limit
     )
     
-    return [AttractionRead.model_validate(a) for a in attractions]
+    # response_model valida las filas ORM directamente (from_attributes)
+    return attractions
 
 
 @router.get(
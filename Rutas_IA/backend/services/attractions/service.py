@@ -4,12 +4,13 @@ Servicio CRUD para gestionar atracciones turísticas
 Incluye búsquedas geoespaciales con PostGIS
 """
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, cast
+from math import cos, radians
+import re
+import numpy as np
+from sqlalchemy.orm import Session, load_only, raiseload
+from sqlalchemy import func, and_, or_, select, update, values, column, Integer, Numeric
 from geoalchemy2.functions import ST_Distance, ST_DWithin, ST_MakePoint # type: ignore
-from geoalchemy2.elements import WKTElement # type: ignore
 from fastapi import HTTPException, status
-from geoalchemy2 import Geography as GeoType # type: ignore        
 
 from shared.database.models import Attraction, Destination
 from shared.schemas.attraction import (
@@ -19,14 +20,49 @@ from shared.schemas.attraction import (
     AttractionSearchParams,
     AttractionWithDistance
 )
+from shared.graph_loader import invalidate_graph_cache
+from shared.utils.numbers import optional_float
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Columnas de AttractionListItem (listados compactos: sin descripción ni JSONB)
+_LIST_ITEM_COLUMNS = (
+    Attraction.id,
+    Attraction.destination_id,
+    Attraction.name,
+    Attraction.category,
+    Attraction.rating,
+    Attraction.location
+)
+
+
+def _prefix_tsquery(text: str) -> Optional[str]:
+    """
+    Consulta de texto completo con prefijos ("muse arte" → "muse:* & arte:*")
+    
+    Solo se usan caracteres de palabra, así que el texto del usuario no puede
+    inyectar operadores de tsquery. None si no queda ningún término.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return ' & '.join(f"{term}:*" for term in terms)
+
 
 class AttractionService:
     """Servicio para operaciones CRUD y búsqueda de atracciones"""
     
+    # Popularidad (0-100): calidad (rating bayesiano) + volumen de interacciones
+    POPULARITY_RATING_WEIGHT = 0.7
+    POPULARITY_VOLUME_WEIGHT = 0.3
+    # Peso del rating previo (el de la atracción o la media global), en votos
+    POPULARITY_PRIOR_VOTES = 5.0
+    # Filas por UPDATE ... FROM (VALUES ...) (2 parámetros por fila)
+    POPULARITY_UPDATE_CHUNK = 5000
+    # Latitud máxima para la búsqueda cercana en Web Mercator (definido hasta ±85.06°)
+    MERCATOR_MAX_LAT = 85.0
+    
     @staticmethod
     def create(db: Session, data: AttractionCreate) -> Attraction:
         """
@@ -84,6 +120,7 @@ class AttractionService:
             db.add(attraction)
             db.commit()
             db.refresh(attraction)
+            invalidate_graph_cache()
             
             logger.info(f"Atracción creada: {attraction.name} (ID: {attraction.id})")
             return attraction
@@ -123,7 +160,8 @@ class AttractionService:
         category: Optional[str] = None,
         search: Optional[str] = None,
         min_rating: Optional[float] = None,
-        verified_only: bool = False
+        verified_only: bool = False,
+        compact: bool = False
     ) -> Tuple[List[Attraction], int]:
         """
         Obtener lista de atracciones con filtros y paginación
@@ -134,13 +172,16 @@ class AttractionService:
             limit: Número máximo de registros
             destination_id: Filtrar por destino (opcional)
             category: Filtrar por categoría (opcional)
+            search: Texto a buscar (texto completo; por nombre si no deja lexemas)
             min_rating: Rating mínimo (opcional)
             verified_only: Solo atracciones verificadas (opcional)
+            compact: Cargar solo las columnas de AttractionListItem
             
         Returns:
             Tuple: (lista de atracciones, total de registros)
         """
-        query = db.query(Attraction)
+        # Los listados solo serializan columnas: una relación perezosa sería un N+1
+        query = db.query(Attraction).options(raiseload('*'))
         
         # Aplicar filtros
         if destination_id:
@@ -149,8 +190,20 @@ class AttractionService:
         if category:
             query = query.filter(Attraction.category == category.lower())
 
+        # Búsqueda de texto completo sobre search_tsv (índice GIN); si el texto
+        # no deja lexemas (solo stopwords como "de" o "la") se busca en el nombre
+        ts_query = None
         if search:
-            query = query.filter(Attraction.name.ilike(f"%{search}%"))
+            search_terms = _prefix_tsquery(search)
+            if search_terms:
+                ts_query = func.to_tsquery('spanish', search_terms)
+                if not db.scalar(select(func.numnode(ts_query))):
+                    ts_query = None
+            
+            if ts_query is not None:
+                query = query.filter(Attraction.search_tsv.op('@@')(ts_query))
+            else:
+                query = query.filter(Attraction.name.ilike(f"%{search}%"))
         
         if min_rating:
             query = query.filter(Attraction.rating >= min_rating)
@@ -162,9 +215,14 @@ class AttractionService:
         total = query.count()
         
         # Ordenar por popularidad y aplicar paginación
-        attractions = query.order_by(
-            Attraction.popularity_score.desc()
-        ).offset(skip).limit(limit).all()
+        if compact:
+            query = query.options(load_only(*_LIST_ITEM_COLUMNS))
+        
+        order = [Attraction.popularity_score.desc()]
+        if ts_query is not None:
+            order.insert(0, func.ts_rank(Attraction.search_tsv, ts_query).desc())
+        
+        attractions = query.order_by(*order).offset(skip).limit(limit).all()
         
         return attractions, total
     
@@ -180,7 +238,7 @@ class AttractionService:
         Returns:
             Tuple: (lista de atracciones, total)
         """
-        query = db.query(Attraction)
+        query = db.query(Attraction).options(raiseload('*'))
         
         # Filtro por categoría
         if params.category:
@@ -202,12 +260,12 @@ class AttractionService:
         if params.verified_only:
             query = query.filter(Attraction.verified == True)
         
-        # Filtro por tags (búsqueda en JSONB)
+        # Filtro por tags: una sola contención (@>) con todos los tags,
+        # resuelta con idx_attraction_tags_gin
         if params.tags:
-            for tag in params.tags:
-                query = query.filter(
-                    Attraction.tags.contains([tag])
-                )
+            query = query.filter(
+                Attraction.tags.contains(list(params.tags))
+            )
         
         total = query.count()
         
@@ -241,27 +299,32 @@ class AttractionService:
         Returns:
             List[dict]: Lista de atracciones con distancia calculada
         """        
-        # Crear punto de referencia (Geography espera lon, lat)
-        reference_point = WKTElement(f'POINT({lon} {lat})', srid=4326)
-        
-        # Construir query con ST_Distance usando cast explícito
-        query = db.query(
-            Attraction,
-            ST_Distance(
-                cast(Attraction.location, GeoType),
-                cast(reference_point, GeoType)
-            ).label('distance')
-        )
-        
-        # Filtrar por radio (convertir km a metros)
+        reference_point = func.ST_SetSRID(ST_MakePoint(lon, lat), 4326)
         radius_meters = radius_km * 1000
-        query = query.filter(
-            ST_DWithin(
-                cast(Attraction.location, GeoType),
-                cast(reference_point, GeoType),
-                radius_meters
-            )
-        )
+        
+        if abs(lat) <= AttractionService.MERCATOR_MAX_LAT:
+            # Punto de referencia proyectado a Web Mercator (como location_xy)
+            reference_xy = func.ST_Transform(reference_point, 3857)
+            
+            # En Mercator las distancias se estiran por 1/cos(lat): a escala de
+            # ciudad basta corregir con la latitud de referencia
+            mercator_scale = cos(radians(lat))
+            
+            # Distancia plana (sin cálculo geodésico por fila), en metros reales;
+            # el filtro por radio usa idx_attr_loc_xy
+            distance = ST_Distance(Attraction.location_xy, reference_xy) * mercator_scale
+            within_radius = ST_DWithin(Attraction.location_xy, reference_xy, radius_meters / mercator_scale)
+        else:
+            # Cerca de los polos Web Mercator no está definido: cálculo geodésico
+            reference_geog = func.geography(reference_point)
+            distance = ST_Distance(Attraction.location, reference_geog)
+            within_radius = ST_DWithin(Attraction.location, reference_geog, radius_meters)
+        
+        query = db.query(Attraction, distance.label('distance'))
+        
+        # Los listados solo serializan columnas: una relación perezosa sería un N+1
+        query = query.options(raiseload('*'))
+        query = query.filter(within_radius)
         
         # Filtrar por categoría si se especifica
         if category:
@@ -324,7 +387,7 @@ class AttractionService:
         Returns:
             List[Attraction]: Lista de atracciones
         """
-        query = db.query(Attraction).filter(
+        query = db.query(Attraction).options(raiseload('*')).filter(
             Attraction.category == category.lower()
         )
         
@@ -363,6 +426,7 @@ class AttractionService:
             
             db.commit()
             db.refresh(attraction)
+            invalidate_graph_cache()
             
             logger.info(f"Atracción actualizada: {attraction.name} (ID: {attraction.id})")
             return attraction
@@ -393,6 +457,7 @@ class AttractionService:
             attraction_name = attraction.name
             db.delete(attraction)
             db.commit()
+            invalidate_graph_cache()
             
             logger.info(f"Atracción eliminada: {attraction_name} (ID: {attraction_id})")
             return {"message": f"Atracción '{attraction_name}' eliminada exitosamente"}
@@ -448,8 +513,100 @@ class AttractionService:
             "attraction_id": attraction_id,
             "name": attraction.name,
             "total_reviews": total_reviews,
-            "avg_sentiment_score": float(avg_sentiment) if avg_sentiment else None,
+            "avg_sentiment_score": optional_float(avg_sentiment),
             "total_user_ratings": total_ratings,
-            "avg_user_rating": float(avg_user_rating) if avg_user_rating else None,
-            "popularity_score": float(attraction.popularity_score) if attraction.popularity_score else None # type: ignore
-        }
\ No newline at end of file
+            "avg_user_rating": optional_float(avg_user_rating),
+            "popularity_score": optional_float(attraction.popularity_score)
+        }
+    
+    @staticmethod
+    def recompute_popularity_scores(db: Session) -> dict:
+        """
+        Recalcular popularity_score de todas las atracciones
+        
+        Una sola consulta agregada (reviews y ratings por atracción), cálculo
+        vectorizado en NumPy y escritura con UPDATE ... FROM (VALUES ...) por
+        bloques, en lugar de leer y guardar cada atracción por el ORM.
+        
+        Args:
+            db: Sesión de base de datos
+            
+        Returns:
+            dict: Número de atracciones actualizadas y media global usada
+        """
+        from shared.database.models import Review, AttractionRating
+        
+        ratings_sq = select(
+            AttractionRating.attraction_id,
+            func.count().label('n'),
+            func.avg(AttractionRating.rating).label('avg')
+        ).group_by(AttractionRating.attraction_id).subquery()
+        
+        reviews_sq = select(
+            Review.attraction_id,
+            func.count().label('n')
+        ).group_by(Review.attraction_id).subquery()
+        
+        rows = db.execute(
+            select(
+                Attraction.id,
+                Attraction.rating,
+                func.coalesce(ratings_sq.c.n, 0),
+                ratings_sq.c.avg,
+                func.coalesce(reviews_sq.c.n, 0)
+            )
+            .outerjoin(ratings_sq, ratings_sq.c.attraction_id == Attraction.id)
+            .outerjoin(reviews_sq, reviews_sq.c.attraction_id == Attraction.id)
+        ).all()
+        
+        if not rows:
+            return {"updated": 0, "global_mean_rating": None}
+        
+        ids, stored, n_ratings, avg_ratings, n_reviews = zip(*rows)
+        
+        # NaN donde no hay dato
+        stored = np.array([np.nan if v is None else float(v) for v in stored])
+        avg_ratings = np.array([np.nan if v is None else float(v) for v in avg_ratings])
+        n_ratings = np.array(n_ratings, dtype=np.float64)
+        n_reviews = np.array(n_reviews, dtype=np.float64)
+        
+        # Rating previo: el de la atracción, o la media global si no tiene
+        known = np.concatenate([stored[~np.isnan(stored)], avg_ratings[~np.isnan(avg_ratings)]])
+        global_mean = float(known.mean()) if known.size else 0.0
+        prior = np.where(np.isnan(stored), global_mean, stored)
+        
+        # Media bayesiana: los ratings de usuarios desplazan el previo
+        k = AttractionService.POPULARITY_PRIOR_VOTES
+        user_sum = np.where(np.isnan(avg_ratings), 0.0, avg_ratings) * n_ratings
+        bayes_rating = (user_sum + k * prior) / (n_ratings + k)
+        
+        interactions = np.log1p(n_ratings + n_reviews)
+        max_interactions = interactions.max()
+        volume = interactions / max_interactions if max_interactions > 0 else interactions
+        
+        scores = 100.0 * (
+            AttractionService.POPULARITY_RATING_WEIGHT * np.clip(bayes_rating / 5.0, 0.0, 1.0)
+            + AttractionService.POPULARITY_VOLUME_WEIGHT * volume
+        )
+        scores = np.round(scores, 2).tolist()
+        
+        chunk = AttractionService.POPULARITY_UPDATE_CHUNK
+        for start in range(0, len(ids), chunk):
+            new_scores = values(
+                column('id', Integer),
+                column('score', Numeric(5, 2)),
+                name='new_scores'
+            ).data(list(zip(ids[start:start + chunk], scores[start:start + chunk])))
+            
+            db.execute(
+                update(Attraction)
+                .where(Attraction.id == new_scores.c.id)
+                .values(popularity_score=new_scores.c.score)
+                .execution_options(synchronize_session=False)
+            )
+        
+        db.commit()
+        
+        logger.info(f"popularity_score recalculado para {len(ids)} atracciones")
+        
+        return {"updated": len(ids), "global_mean_rating": round(global_mean, 2)}
@@ -14,6 +14,7 @@ from shared.schemas.connection import (
     ConnectionWithAttractions
 )
 from shared.schemas.base import MessageResponse
+from shared.schemas import CONNECTION_LIST_ADAPTER, dump_orm_list
 from .service import ConnectionService
 
 router = APIRouter(
@@ -165,7 +166,7 @@ def list_connections(
         "total": total,
         "skip": skip,
         "limit": limit,
-        "items": [ConnectionRead.model_validate(c) for c in connections]
+        "items": dump_orm_list(CONNECTION_LIST_ADAPTER, connections)
     }
 
 
@@ -190,7 +191,8 @@ def get_connections_from(
         attraction_id=attraction_id,
         transport_mode=transport_mode
     )
-    return [ConnectionRead.model_validate(c) for c in connections]
+    # response_model valida las filas ORM directamente (from_attributes)
+    return connections
 
 
 @router.get(
@@ -212,7 +214,8 @@ def get_connections_to(
         attraction_id=attraction_id,
         transport_mode=transport_mode
     )
-    return [ConnectionRead.model_validate(c) for c in connections]
+    # response_model valida las filas ORM directamente (from_attributes)
+    return connections
 
 
 @router.get(
@@ -3,7 +3,8 @@
 Servicio CRUD para gestionar conexiones entre atracciones
 Fundamental para construcción de grafos y algoritmos de rutas
 """
-from typing import List, Optional, Tuple, Dict
+from typing import Any, Iterable, List, Optional, Tuple, Dict
+from psycopg2.extras import execute_values
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 from geoalchemy2.functions import ST_Distance # type: ignore
@@ -16,10 +17,20 @@ from shared.schemas.connection import (
     ConnectionRead,
     ConnectionSearchParams
 )
+from shared.graph_loader import invalidate_graph_cache
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Columnas del INSERT masivo (route_geometry llega como WKB y se convierte en SQL)
+_BULK_INSERT_SQL = (
+    "INSERT INTO attraction_connections ("
+    "from_attraction_id, to_attraction_id, distance_meters, travel_time_minutes, "
+    "transport_mode, cost, traffic_factor, route_geometry"
+    ") VALUES %s"
+)
+_BULK_INSERT_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, ST_GeogFromWKB(%s))"
+
 
 class ConnectionService:
     """Servicio para operaciones CRUD de conexiones entre atracciones"""
@@ -78,6 +89,7 @@ class ConnectionService:
             db.add(connection)
             db.commit()
             db.refresh(connection)
+            invalidate_graph_cache()
             
             logger.info(
                 f"Conexión creada: {from_attraction.name} -> {to_attraction.name} "
@@ -129,6 +141,62 @@ class ConnectionService:
         logger.info(f"Conexión bidireccional creada entre {from_id} y {to_id}")
         return connection_ab, connection_ba
     
+    @staticmethod
+    def bulk_insert(
+        db: Session,
+        rows: Iterable[Dict[str, Any]],
+        page_size: int = 10000
+    ) -> int:
+        """
+        Insertar muchas conexiones con INSERT ... VALUES por lotes (execute_values)
+        
+        No pasa por el ORM (sin objetos ni seguimiento de cambios) ni valida
+        existencia o duplicados: pensado para scripts de carga. Se ejecuta en la
+        transacción de la sesión; el commit (y invalidate_graph_cache() después,
+        si el proceso sirve rutas) queda a cargo del llamador.
+        
+        Args:
+            db: Sesión de base de datos
+            rows: Dicts con from_attraction_id, to_attraction_id, distance_meters,
+                travel_time_minutes, transport_mode y opcionalmente cost,
+                traffic_factor y route_geometry (WKB en bytes)
+            page_size: Filas por sentencia INSERT
+            
+        Returns:
+            int: Número de filas enviadas
+        """
+        values = [
+            (
+                row['from_attraction_id'],
+                row['to_attraction_id'],
+                row['distance_meters'],
+                row['travel_time_minutes'],
+                row['transport_mode'],
+                row.get('cost', 0.0),
+                row.get('traffic_factor', 1.0),
+                row.get('route_geometry')
+            )
+            for row in rows
+        ]
+        
+        if not values:
+            return 0
+        
+        cursor = db.connection().connection.cursor()
+        try:
+            execute_values(
+                cursor,
+                _BULK_INSERT_SQL,
+                values,
+                template=_BULK_INSERT_TEMPLATE,
+                page_size=page_size
+            )
+        finally:
+            cursor.close()
+        
+        logger.info(f"Inserción masiva: {len(values)} conexiones")
+        return len(values)
+    
     @staticmethod
     def get(db: Session, connection_id: int) -> Optional[AttractionConnection]:
         """Obtener una conexión por ID"""
@@ -364,6 +432,7 @@ class ConnectionService:
             
             db.commit()
             db.refresh(connection)
+            invalidate_graph_cache()
             
             logger.info(f"Conexión {connection_id} actualizada")
             return connection
@@ -393,6 +462,7 @@ class ConnectionService:
         try:
             db.delete(connection)
             db.commit()
+            invalidate_graph_cache()
             
             logger.info(f"Conexión {connection_id} eliminada")
             return {"message": f"Conexión {connection_id} eliminada exitosamente"}
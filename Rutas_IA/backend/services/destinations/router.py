@@ -14,6 +14,7 @@ from shared.schemas.destination import (
     DestinationWithStats
 )
 from shared.schemas.base import MessageResponse
+from shared.schemas import DESTINATION_LIST_ADAPTER, dump_orm_list
 from .service import DestinationService
 
 router = APIRouter(
@@ -107,7 +108,7 @@ def list_destinations(
         "total": total,
         "skip": skip,
         "limit": limit,
-        "items": [DestinationRead.model_validate(d) for d in destinations]
+        "items": dump_orm_list(DESTINATION_LIST_ADAPTER, destinations)
     }
 
 
@@ -230,4 +231,5 @@ def get_destinations_by_country(
     - `/destinations/country/Colombia`
     """
     destinations = DestinationService.get_by_country(db, country)
-    return [DestinationRead.model_validate(d) for d in destinations]
\ No newline at end of file
+    # response_model valida las filas ORM directamente (from_attributes)
+    return destinations
\ No newline at end of file
@@ -14,6 +14,7 @@ from shared.schemas.destination import (
     DestinationRead,
     DestinationWithStats
 )
+from shared.utils.numbers import optional_float
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -38,22 +39,12 @@ class DestinationService:
             HTTPException: Si hay error en la creación
         """
         try:
-            # Convertir location dict a formato WKT para PostGIS
-            lat = data.location.get('lat')
-            lon = data.location.get('lon')
-            
-            if lat is None or lon is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="location debe contener 'lat' y 'lon'"
-                )
-            
             # Crear el objeto Destination
             destination_data = data.model_dump(exclude={'location'})
             destination = Destination(**destination_data)
             
-            # Asignar la ubicación en formato WKT
-            destination.location = f"POINT({lon} {lat})"
+            # Asignar la ubicación en formato WKT (lat/lon ya validados por Location)
+            destination.location = f"POINT({data.location.lon} {data.location.lat})"
             
             db.add(destination)
             db.commit()
@@ -260,7 +251,7 @@ class DestinationService:
         result = {
             **destination.__dict__,
             "total_attractions": total_attractions,
-            "avg_rating": float(avg_rating) if avg_rating else None
+            "avg_rating": optional_float(avg_rating)
         }
         
         # Eliminar atributos internos de SQLAlchemy
@@ -5,10 +5,11 @@ Combina: Rules Engine + Search Service (BFS) + Route Optimizer (A*)
 """
 from .service import ItineraryGeneratorService
 from .router import router as itinerary_router
-from .clustering import DayClustering
+from .clustering import DayClustering, PoolItem
 
 __all__ = [
     "ItineraryGeneratorService",
     "itinerary_router",
-    "DayClustering"
+    "DayClustering",
+    "PoolItem"
 ]
\ No newline at end of file
@@ -2,7 +2,8 @@
 """
 Algoritmos de agrupación (Clustering) para dividir atracciones en días
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Union
+from collections import namedtuple
 import math
 import random
 from geoalchemy2.shape import to_shape # type: ignore
@@ -10,6 +11,9 @@ from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Candidato compacto para el clustering (más ligero que un dict por atracción)
+PoolItem = namedtuple('PoolItem', 'id name lat lon score duration')
+
 class DayClustering:
     """
     Agrupa atracciones en 'N' días basándose en su proximidad geográfica.
@@ -17,45 +21,42 @@ class DayClustering:
     """
 
     @staticmethod
-    def cluster_attractions(attractions: List[Dict], num_days: int) -> List[List[Dict]]:
+    def cluster_attractions(
+        attractions: List[Union[PoolItem, Dict]],
+        num_days: int
+    ) -> List[Tuple[List[Union[PoolItem, Dict]], Optional[Tuple[float, float]]]]:
         """
         Divide las atracciones en grupos por día.
         
         Args:
-            attractions: Lista de dicts de atracciones (debe incluir coordenadas lat/lon)
+            attractions: Lista de PoolItem (o dicts con coordenadas lat/lon)
             num_days: Número de clusters a crear
             
         Returns:
-            Lista de Listas (cada sub-lista es un día)
+            Lista de tuplas (miembros del día, centroide (lat, lon) o None)
         """
         if not attractions:
             return []
         
         # Si hay menos días que atracciones, devolver todo en un grupo o dividir simple
         if num_days <= 0:
-            return [attractions]
+            return [(attractions, DayClustering._centroid_of(attractions))]
         
         if len(attractions) <= num_days:
             # Una atracción por día si son muy pocas
-            return [[attr] for attr in attractions]
+            return [([attr], DayClustering._extract_coords(attr)) for attr in attractions]
 
         # Extraer coordenadas para facilitar cálculo
         points = []
         for attr in attractions:
-            # Asumimos que 'location' viene o como objeto geoalchemy o tupla
-            # Aquí intentamos extraer (lat, lon)
-            lat, lon = None, None
-
-            if 'location_coords' in attr:
-                lat, lon = attr['location_coords']
-            elif 'latitude' in attr and 'longitude' in attr:
-                lat, lon = attr['latitude'], attr['longitude']
+            coords = DayClustering._extract_coords(attr)
 
-            if lat is None or lon is None:
-                logger.warning(f"Atracción {attr.get('id', '? ')} sin coordenadas válidas, se omitirá")
+            if coords is None:
+                attr_id = attr.id if isinstance(attr, PoolItem) else attr.get('id', '? ')
+                logger.warning(f"Atracción {attr_id} sin coordenadas válidas, se omitirá")
                 continue  # Saltar esta atracción
             
-            points.append({'data': attr, 'coords': (lat, lon)})
+            points.append({'data': attr, 'coords': coords})
 
         # 1. Inicializar centroides (elegir puntos aleatorios existentes)
         centroids = random.sample([p['coords'] for p in points], num_days)
@@ -65,10 +66,12 @@ class DayClustering:
         # K-Means iterativo
         iterations = 10 
         for _ in range(iterations):
-            # Reiniciar clusters
+            # Reiniciar clusters y acumuladores del centroide
             current_clusters = [[] for _ in range(num_days)]
+            sum_lats = [0.0] * num_days
+            sum_lons = [0.0] * num_days
             
-            # 2. Asignar cada punto al centroide más cercano
+            # 2. Asignar cada punto al centroide más cercano (acumulando sumas en la misma pasada)
             for p in points:
                 p_lat, p_lon = p['coords']
                 
@@ -83,27 +86,56 @@ class DayClustering:
                         best_cluster_idx = i
                 
                 current_clusters[best_cluster_idx].append(p)
+                sum_lats[best_cluster_idx] += p_lat
+                sum_lons[best_cluster_idx] += p_lon
             
-            # 3. Recalcular centroides
+            # 3. Recalcular centroides a partir de las sumas acumuladas
             new_centroids = []
-            for cluster in current_clusters:
+            for i, cluster in enumerate(current_clusters):
                 if not cluster:
                     # Si un cluster quedó vacío, mantener el viejo (o re-randomizar)
                     new_centroids.append(centroids[0])
                     continue
                 
-                avg_lat = sum(p['coords'][0] for p in cluster) / len(cluster)
-                avg_lon = sum(p['coords'][1] for p in cluster) / len(cluster)
-                new_centroids.append((avg_lat, avg_lon))
+                count = len(cluster)
+                new_centroids.append((sum_lats[i] / count, sum_lons[i] / count))
             
             centroids = new_centroids
             clusters = current_clusters
 
         # Convertir de vuelta al formato original y filtrar vacíos
+        # (el centroide de cada cluster no vacío es exactamente la media de sus miembros)
         final_result = []
-        for cluster_points in clusters:
+        for cluster_points, centroid in zip(clusters, centroids):
             if cluster_points:
-                final_result.append([cp['data'] for cp in cluster_points])
+                final_result.append(([cp['data'] for cp in cluster_points], centroid))
         
         logger.info(f"Clustering completado: {len(attractions)} atracciones en {len(final_result)} grupos")
         return final_result
+
+    @staticmethod
+    def _extract_coords(attr: Union[PoolItem, Dict]) -> Optional[Tuple[float, float]]:
+        """Extraer (lat, lon) de una atracción, o None si no tiene coordenadas"""
+        lat, lon = None, None
+
+        if isinstance(attr, PoolItem):
+            lat, lon = attr.lat, attr.lon
+        elif 'location_coords' in attr:
+            lat, lon = attr['location_coords']
+        elif 'latitude' in attr and 'longitude' in attr:
+            lat, lon = attr['latitude'], attr['longitude']
+
+        if lat is None or lon is None:
+            return None
+        return (lat, lon)
+
+    @staticmethod
+    def _centroid_of(attractions: List[Union[PoolItem, Dict]]) -> Optional[Tuple[float, float]]:
+        """Centroide simple de un grupo (solo para los casos sin K-Means)"""
+        coords = [c for c in (DayClustering._extract_coords(a) for a in attractions) if c is not None]
+        if not coords:
+            return None
+        return (
+            sum(c[0] for c in coords) / len(coords),
+            sum(c[1] for c in coords) / len(coords)
+        )
@@ -3,9 +3,10 @@
 Endpoints REST para generación de itinerarios (VERSIÓN MEJORADA)
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Response
 from fastapi.concurrency import run_in_threadpool
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
 
 from shared.database.base import get_db
 from shared. schemas.itinerary import (
@@ -15,6 +16,7 @@ from shared. schemas.itinerary import (
     ItineraryWithDays,
     ItineraryUpdate
 )
+from shared.schemas import ITINERARY_WITH_DAYS_ADAPTER, dump_orm_json
 from shared.database.models import Itinerary
 from shared.utils.logger import setup_logger
 from .service import ItineraryGeneratorService
@@ -23,7 +25,8 @@ logger = setup_logger(__name__)
 
 router = APIRouter(
     prefix="/itinerary",
-    tags=["Itinerary Generator"]
+    tags=["Itinerary Generator"],
+    default_response_class=ORJSONResponse
 )
 
 
@@ -99,12 +102,20 @@ def get_itinerary(
 ):
     """
     Obtener un itinerario completo con sus días
+    
+    La respuesta se serializa una sola vez a bytes JSON (pydantic-core);
+    response_model queda solo para la documentación.
     """
-    itinerary = db.query(Itinerary).filter(Itinerary.id == itinerary_id).first()
+    itinerary = db.query(Itinerary).options(
+        selectinload(Itinerary.days)
+    ).filter(Itinerary.id == itinerary_id).first()
     if not itinerary:
         raise HTTPException(status_code=404, detail="Itinerario no encontrado")
     
-    return itinerary
+    return Response(
+        content=dump_orm_json(ITINERARY_WITH_DAYS_ADAPTER, itinerary),
+        media_type="application/json"
+    )
 
 
 @router.put(
@@ -1,15 +1,18 @@
 # backend/services/itinerary_generator/service.py
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta, date
+import numpy as np
 from sqlalchemy.orm import Session
-from geoalchemy2.shape import to_shape # type: ignore
+from sqlalchemy import func, cast
+from geoalchemy2 import Geometry # type: ignore
 
 from shared.database.models import UserProfile, Attraction, Itinerary, ItineraryAttraction, ItineraryDay
 from shared.config.constants import SCORING_WEIGHTS, DEFAULT_VISIT_DURATION
+from shared.graph_loader import get_cached_graph
 from services.search_service import SearchService
 from services.route_optimizer import RouterOptimizerService
 from services.rules_engine import RulesEngineService
-from .clustering import DayClustering
+from .clustering import DayClustering, PoolItem
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -74,29 +77,37 @@ class ItineraryGeneratorService:
         scores_map = {}
         duration_map = {} 
         
+        # Una sola consulta IN para todos los candidatos (evita N+1).
+        # Las coordenadas se proyectan en PostGIS para no parsear WKB en Python.
+        candidate_ids = [item['attraction']['id'] for item in selected_candidates]
+        db_rows = self.db.query(
+            Attraction.id,
+            func.ST_Y(cast(Attraction.location, Geometry)).label('lat'),
+            func.ST_X(cast(Attraction.location, Geometry)).label('lon'),
+            Attraction.average_visit_duration
+        ).filter(Attraction.id.in_(candidate_ids)).all() if candidate_ids else []
+        db_attrs_by_id = {row.id: row for row in db_rows}
+        
         for item in selected_candidates:
             attr = item['attraction']
             score = item['score']
             
-            db_attr = self.db.query(Attraction).filter(Attraction.id == attr['id']).first()
-            if not db_attr or not db_attr.location:
+            db_attr = db_attrs_by_id.get(attr['id'])
+            if not db_attr or db_attr.lat is None or db_attr.lon is None:
                 continue
             
-            try:
-                point = to_shape(db_attr.location)
-                lat, lon = point.y, point.x
-            except Exception:
-                continue
+            lat, lon = db_attr.lat, db_attr.lon
             
             real_duration = db_attr.average_visit_duration or DEFAULT_VISIT_DURATION
             
-            attractions_pool.append({
-                'id': attr['id'],
-                'name': attr['name'],
-                'location_coords': (lat, lon),
-                'score': score,
-                'duration': real_duration
-            })
+            attractions_pool.append(PoolItem(
+                id=attr['id'],
+                name=attr['name'],
+                lat=lat,
+                lon=lon,
+                score=score,
+                duration=real_duration
+            ))
             scores_map[attr['id']] = score
             duration_map[attr['id']] = real_duration
 
@@ -135,16 +146,22 @@ class ItineraryGeneratorService:
         total_time = 0
         total_cost = 0.0
         total_attractions_count = 0
-        visit_order_global = 1
         
-        for day_idx, group in enumerate(daily_groups):
+        # Días y sus atracciones se acumulan para insertarlos con un solo flush
+        itinerary_days = []
+        day_attraction_lists = []
+        
+        # Grafo del destino cargado una sola vez para todos los días
+        graph = get_cached_graph(self.db, destination_id)
+        
+        for day_idx, (group, centroid) in enumerate(daily_groups):
             day_num = day_idx + 1
             day_date = start_date.date() + timedelta(days=day_idx)
             
             if not group:
                 continue
             
-            waypoints = [a['id'] for a in group]
+            waypoints = [a.id for a in group]
             
             # Optimizar con A*
             route_result = self.optimizer_service.optimize_multi_stop(
@@ -153,18 +170,18 @@ class ItineraryGeneratorService:
                 waypoints=waypoints,
                 end_attraction_id=hotel_id,
                 optimization_mode=optimization_mode,
-                attraction_scores=scores_map
+                attraction_scores=scores_map,
+                graph=graph
             )
             
             # Fallback si no encuentra ruta
-            final_attractions_list = route_result['attractions'] if route_result['path_found'] else [{'id': wid, 'name': next((a['name'] for a in attractions_pool if a['id']==wid), '')} for wid in waypoints]
+            final_attractions_list = route_result['attractions'] if route_result['path_found'] else [{'id': a.id, 'name': a.name} for a in group]
             final_segments_list = route_result['segments'] if route_result['path_found'] else []
             day_distance = route_result['summary']['total_distance_meters'] if route_result['path_found'] else 0.0
             day_time = route_result['summary']['total_time_minutes'] if route_result['path_found'] else 0
             day_cost = route_result['summary']['total_cost'] if route_result['path_found'] else 0.0
 
-            centroid_lat = sum(a['location_coords'][0] for a in group) / len(group)
-            centroid_lon = sum(a['location_coords'][1] for a in group) / len(group)
+            centroid_lat, centroid_lon = centroid if centroid else (None, None)
             
             # Preparar JSON
             day_data_attractions = []
@@ -198,29 +215,37 @@ class ItineraryGeneratorService:
                 optimization_score=route_result['summary'].get('optimization_score', 0)
             )
             
-            self.db.add(itinerary_day)
-            self.db.flush()
-            
-            for idx, attr_data in enumerate(final_attractions_list):
-                attr_id = attr_data['id']
-                duration = duration_map.get(attr_id, DEFAULT_VISIT_DURATION)
-                itinerary_attr = ItineraryAttraction(
-                    itinerary_id=itinerary.id,
-                    day_id=itinerary_day.id,
-                    attraction_id=attr_id,
-                    visit_order=visit_order_global,
-                    day_order=idx + 1,
-                    attraction_score=scores_map.get(attr_id),
-                    visit_duration_minutes=duration
-                )
-                self.db.add(itinerary_attr)
-                visit_order_global += 1
+            itinerary_days.append(itinerary_day)
+            day_attraction_lists.append(final_attractions_list)
             
             total_distance = total_distance + day_distance
             total_time = total_time + day_time
             total_cost = total_cost + day_cost
             total_attractions_count = total_attractions_count + len(waypoints)
         
+        # Un solo flush para obtener los IDs de todos los días
+        self.db.add_all(itinerary_days)
+        self.db.flush()
+        
+        visit_order_global = 1
+        itinerary_attr_mappings = []
+        for itinerary_day, final_attractions_list in zip(itinerary_days, day_attraction_lists):
+            for idx, attr_data in enumerate(final_attractions_list):
+                attr_id = attr_data['id']
+                itinerary_attr_mappings.append({
+                    "itinerary_id": itinerary.id,
+                    "day_id": itinerary_day.id,
+                    "attraction_id": attr_id,
+                    "visit_order": visit_order_global,
+                    "day_order": idx + 1,
+                    "attraction_score": scores_map.get(attr_id),
+                    "visit_duration_minutes": duration_map.get(attr_id, DEFAULT_VISIT_DURATION)
+                })
+                visit_order_global += 1
+        
+        if itinerary_attr_mappings:
+            self.db.bulk_insert_mappings(ItineraryAttraction, itinerary_attr_mappings)
+        
         itinerary.total_distance_meters = total_distance
         itinerary.total_duration_minutes = total_time
         itinerary.total_cost = total_cost
@@ -243,49 +268,47 @@ class ItineraryGeneratorService:
         }
 
     def _rank_candidates(self, candidates_data: List[Dict], profile: Dict) -> List[Dict]:
-        scored_list = []
-        priority_cats = set(profile.get('priority_categories', []))
-        recommended_cats = set(profile.get('recommended_categories', []))
-        avoid_cats = set(profile.get('avoid_categories', []))
-        allowed_prices = set(profile.get('allowed_price_ranges', ['gratis', 'bajo', 'medio', 'alto']))
+        if not candidates_data:
+            return []
+
+        priority_cats = list(profile.get('priority_categories', []))
+        recommended_cats = list(profile.get('recommended_categories', []))
+        avoid_cats = list(profile.get('avoid_categories', []))
+        allowed_prices = list(profile.get('allowed_price_ranges', ['gratis', 'bajo', 'medio', 'alto']))
         required_amenities = set(profile.get('required_amenities', []))
         min_rating = profile.get('min_rating', 0.0)
 
-        for item in candidates_data:
-            attr = item['attraction']
-            dist_meters = item.get('distance_from_start', 0)
-            
-            score = 0.0
-            rating = attr.get('rating') or 3.0
-            
-            # Cálculos seguros
-            score = score + (rating * SCORING_WEIGHTS['rating_multiplier'])
-            
-            cat = attr.get('category', '').lower()
-            if cat in priority_cats:
-                score = score + SCORING_WEIGHTS['priority_category']
-            elif cat in recommended_cats:
-                score = score + SCORING_WEIGHTS['recommended_category']
-            elif cat in avoid_cats:
-                score = score + SCORING_WEIGHTS['avoid_category']
-            
-            price = attr.get('price_range', '').lower()
-            if price not in allowed_prices:
-                score = score + SCORING_WEIGHTS['price_mismatch']
-            
-            attr_amenities = set(attr.get('amenities') or [])
-            missing_reqs = required_amenities - attr_amenities
-            if missing_reqs:
-                score = score + (len(missing_reqs) * SCORING_WEIGHTS['missing_amenity'])
-            
-            if rating < min_rating:
-                score = score + SCORING_WEIGHTS['rating_below_min']
-            
-            dist_km = dist_meters / 1000.0
-            score = score - (dist_km * SCORING_WEIGHTS['distance_penalty_per_km'])
-            
-            scored_list.append({'attraction': attr, 'score': round(score, 2)})
-        
-        scored_list.sort(key=lambda x: x['score'], reverse=True)
-        
-        return scored_list
\ No newline at end of file
+        attrs = [item['attraction'] for item in candidates_data]
+
+        # Columnas (SoA) para puntuar todos los candidatos en bloque
+        ratings = np.array([float(a.get('rating') or 3.0) for a in attrs], dtype=np.float64)
+        dist_km = np.array([item.get('distance_from_start', 0) or 0 for item in candidates_data], dtype=np.float64) / 1000.0
+        cats = np.array([(a.get('category') or '').lower() for a in attrs], dtype=object)
+        prices = np.array([(a.get('price_range') or '').lower() for a in attrs], dtype=object)
+        missing_counts = np.array(
+            [len(required_amenities - set(a.get('amenities') or [])) for a in attrs],
+            dtype=np.float64
+        ) if required_amenities else np.zeros(len(attrs), dtype=np.float64)
+
+        category_bonus = np.where(
+            np.isin(cats, priority_cats), SCORING_WEIGHTS['priority_category'],
+            np.where(
+                np.isin(cats, recommended_cats), SCORING_WEIGHTS['recommended_category'],
+                np.where(np.isin(cats, avoid_cats), SCORING_WEIGHTS['avoid_category'], 0.0)
+            )
+        )
+
+        scores = (
+            ratings * SCORING_WEIGHTS['rating_multiplier']
+            + category_bonus
+            + np.where(np.isin(prices, allowed_prices), 0.0, SCORING_WEIGHTS['price_mismatch'])
+            + missing_counts * SCORING_WEIGHTS['missing_amenity']
+            + np.where(ratings < min_rating, SCORING_WEIGHTS['rating_below_min'], 0.0)
+            - dist_km * SCORING_WEIGHTS['distance_penalty_per_km']
+        )
+        scores = np.round(scores, 2)
+
+        # Orden descendente estable (igual que sort(reverse=True))
+        order = np.argsort(-scores, kind='stable')
+
+        return [{'attraction': attrs[i], 'score': float(scores[i])} for i in order]
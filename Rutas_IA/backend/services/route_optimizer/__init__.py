@@ -6,6 +6,7 @@ Incluye algoritmos: A* (A-Star)
 from .service import RouterOptimizerService
 from .router import router as router_optimizer_router
 from .a_star import AStar
+from .pareto import ParetoSearch
 from .heuristics import Heuristics, CostCalculator, get_optimization_weights
 from .path_generator import PathGenerator, OptimizedRoute, RouteSegment
 
@@ -13,6 +14,7 @@ __all__ = [
     "RouterOptimizerService",
     "router_optimizer_router",
     "AStar",
+    "ParetoSearch",
     "Heuristics",
     "CostCalculator",
     "get_optimization_weights",
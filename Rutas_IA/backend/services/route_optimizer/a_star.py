@@ -2,14 +2,16 @@
 """
 Implementación del algoritmo A* (A-Star) core
 """
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass, field
 from heapq import heappush, heappop
+import numpy as np
+from math import radians, cos, isnan
 from sqlalchemy.orm import Session
 
 from shared.database.models import Attraction
 from shared.utils.logger import setup_logger
-from shared.graph_loader import GraphDataManager
+from shared.graph_loader import GraphDataManager, get_cached_graph
 from .heuristics import Heuristics, CostCalculator, get_optimization_weights
 from .path_generator import PathGenerator, OptimizedRoute
 
@@ -43,19 +45,32 @@ class AStar:
         self,
         db: Session,
         optimization_mode: str,
-        heuristic_type: str = "euclidean"
+        heuristic_type: str = "euclidean",
+        graph: Optional[GraphDataManager] = None,
+        attraction_cache: Optional[Dict[int, Attraction]] = None,
+        edge_cost_cache: Optional[Tuple[GraphDataManager, Dict[int, float], List[float]]] = None
     ):
         self.db = db
         self.optimization_mode = optimization_mode
         self.heuristic_type = heuristic_type
         self.nodes_explored = 0
         
+        # Grafo en memoria reutilizable entre llamadas a find_path
+        self.graph = graph
+        
+        # Atracciones ya cargadas por el llamador ({id: Attraction})
+        self.attraction_cache = attraction_cache if attraction_cache is not None else {}
+        
+        # Costos de aristas ya calculados: (grafo, scores, costos). Solo es válido
+        # entre instancias con el mismo modo de optimización
+        self.edge_cost_cache = edge_cost_cache
+        
         # Obtener pesos según modo
         self.weights = get_optimization_weights(optimization_mode)
         
         # Inicializar calculadores
         self.cost_calculator = CostCalculator(self.weights)
-        self.path_generator = PathGenerator(db)
+        self.path_generator = PathGenerator(db, attraction_cache=self.attraction_cache)
         
         logger.info(f"A* inicializado: modo={optimization_mode}, heurística={heuristic_type}")
     
@@ -71,14 +86,8 @@ class AStar:
         """
         logger.info(f"Buscando ruta A*: {start_attraction_id} → {end_attraction_id}")
         
-        # 1. Obtener la atracción de inicio de la DB SOLO para saber el destination_id
-        # y cargar el grafo correcto.
-        start_attr_db = self.db.query(Attraction).filter(Attraction.id == start_attraction_id).first()
-        if not start_attr_db:
-            raise ValueError(f"Atracción de inicio {start_attraction_id} no encontrada")
-            
-        # 2. CARGAR EL GRAFO EN MEMORIA (Optimización N+1)
-        graph = GraphDataManager(self.db, start_attr_db.destination_id)
+        # 1-2. CARGAR EL GRAFO EN MEMORIA (Optimización N+1), reutilizando el cacheado
+        graph = self.get_graph(start_attraction_id)
 
         # Obtener nodos de inicio y fin desde la memoria RAM
         start_node_data = graph.get_node(start_attraction_id)
@@ -92,17 +101,51 @@ class AStar:
         
         # Inicializar estructuras de datos
         self.nodes_explored = 0
+        
+        # Destino inalcanzable: el cierre transitivo del grafo lo sabe sin
+        # expandir toda la componente del origen
+        if not graph.is_reachable(start_attraction_id, end_attraction_id):
+            logger.warning(f"❌ No se encontró ruta ({end_attraction_id} inalcanzable desde {start_attraction_id})")
+            return self.path_generator.create_empty_route(
+                self.nodes_explored,
+                self.optimization_mode
+            )
+        
         open_set = []  # Min-heap
         closed_set: Set[int] = set()
         came_from: Dict[int, int] = {}
         g_scores: Dict[int, float] = {start_attraction_id: 0.0}
         
-        # Calcular heurística inicial (usando coordenadas del diccionario)
+        # Coordenadas en arrays contiguos (SoA) indexados por posición del nodo
+        id_to_idx = graph.id_to_idx
+        lats = graph.lats
+        lons = graph.lons
+        end_idx = id_to_idx[end_attraction_id]
+        
+        # Precalcular trigonometría del destino (fijo durante toda la búsqueda)
+        use_haversine = (
+            self.heuristic_type == 'euclidean'
+            and not isnan(lats[end_idx])
+            and not isnan(lons[end_idx])
+        )
+        end_lat_rad = end_lon_rad = cos_end_lat = 0.0
+        if use_haversine:
+            end_lat_rad = radians(lats[end_idx])
+            end_lon_rad = radians(lons[end_idx])
+            cos_end_lat = cos(end_lat_rad)
+        
+        # Costos de TODAS las aristas del grafo en una sola llamada vectorizada
+        # (índices CSR: las aristas del nodo i empiezan en edge_indptr[i])
+        edge_costs = self.get_edge_costs(graph, attraction_scores)
+        edge_indptr = graph.edge_indptr
+        
+        # Calcular heurística inicial
         h_initial = 0.0
-        if self.heuristic_type == 'euclidean':
-            h_initial = Heuristics.haversine_distance(
-                start_node_data['lat'], start_node_data['lon'],
-                end_node_data['lat'], end_node_data['lon']
+        start_idx = id_to_idx[start_attraction_id]
+        if use_haversine and not isnan(lats[start_idx]):
+            h_initial = Heuristics.haversine_to_fixed(
+                lats[start_idx], lons[start_idx],
+                end_lat_rad, end_lon_rad, cos_end_lat
             )
 
         initial_node = AStarNode(
@@ -113,6 +156,9 @@ class AStar:
         )
         heappush(open_set, initial_node)
         
+        # Mejor g conocido hasta el destino: cota para podar el frontier
+        best_goal_g = float('inf')
+        
         # ALGORITMO A*
         while open_set and self.nodes_explored < max_iterations:
             # Obtener nodo con menor f_cost
@@ -147,17 +193,17 @@ class AStar:
             
             # 3. OBTENER VECINOS DE MEMORIA (No SQL)
             neighbors = graph.get_neighbors(current_id)
+            edge_base = int(edge_indptr[id_to_idx[current_id]])
             
-            for neighbor in neighbors:
+            for k, neighbor in enumerate(neighbors):
                 neighbor_id = neighbor['to_attraction_id']
                 
                 # Saltar si ya fue explorado
                 if neighbor_id in closed_set:
                     continue
                 
-                # Calcular g_cost del vecino
-                edge_cost = self._calculate_edge_cost(neighbor, attraction_scores)
-                tentative_g = current_node.g_cost + edge_cost
+                # Calcular g_cost del vecino (costo de arista precalculado)
+                tentative_g = current_node.g_cost + edge_costs[edge_base + k]
                 
                 # Si encontramos un mejor camino
                 if neighbor_id not in g_scores or tentative_g < g_scores[neighbor_id]:
@@ -166,14 +212,22 @@ class AStar:
                     
                     # 4. CALCULAR HEURÍSTICA (Usando datos en memoria)
                     h_cost = 0.0
-                    neighbor_data = graph.get_node(neighbor_id)
                     
-                    if neighbor_data and self.heuristic_type == 'euclidean':
-                        # Llamada correcta a la estática con 4 argumentos
-                        h_cost = Heuristics.haversine_distance(
-                            neighbor_data['lat'], neighbor_data['lon'],
-                            end_node_data['lat'], end_node_data['lon']
-                        )
+                    if use_haversine:
+                        neighbor_idx = id_to_idx[neighbor_id]
+                        neighbor_lat = lats[neighbor_idx]
+                        if not isnan(neighbor_lat):
+                            h_cost = Heuristics.haversine_to_fixed(
+                                neighbor_lat, lons[neighbor_idx],
+                                end_lat_rad, end_lon_rad, cos_end_lat
+                            )
+                    
+                    # Poda: un nodo cuyo f ya no mejora la mejor ruta al destino
+                    # nunca se expandiría antes que ella
+                    if neighbor_id == end_attraction_id:
+                        best_goal_g = tentative_g
+                    elif tentative_g + h_cost >= best_goal_g:
+                        continue
                         
                     neighbor_node = AStarNode(
                         attraction_id=neighbor_id,
@@ -192,20 +246,69 @@ class AStar:
             self.optimization_mode
         )
     
-    def _calculate_edge_cost(
+    def get_graph(self, start_attraction_id: int) -> GraphDataManager:
+        """
+        Obtener el grafo del destino, cargándolo solo si no hay uno cacheado
+        que contenga la atracción de inicio
+        """
+        if self.graph is not None and self.graph.get_node(start_attraction_id):
+            return self.graph
+        
+        # Obtener la atracción de inicio de la DB SOLO para saber el destination_id
+        start_attr_db = self.attraction_cache.get(start_attraction_id)
+        if start_attr_db is None:
+            start_attr_db = self.db.query(Attraction).filter(Attraction.id == start_attraction_id).first()
+        if not start_attr_db:
+            raise ValueError(f"Atracción de inicio {start_attraction_id} no encontrada")
+        
+        self.graph = get_cached_graph(self.db, start_attr_db.destination_id)
+        return self.graph
+    
+    def get_edge_costs(
         self,
-        connection: Dict,
+        graph: GraphDataManager,
         attraction_scores: Optional[Dict[int, float]]
-    ) -> float:
-        """Calcular costo de una arista"""
-        # Score de idoneidad
-        score = 0.0
-        if attraction_scores and connection['to_attraction_id'] in attraction_scores:
-            score = attraction_scores[connection['to_attraction_id']]
-        
-        return self.cost_calculator.calculate_edge_cost(
-            distance_meters=connection['distance_meters'],
-            travel_time_minutes=connection['travel_time_minutes'],
-            cost=connection['cost'],
-            suitability_score=score
-        )
\ No newline at end of file
+    ) -> List[float]:
+        """
+        Obtener el costo de todas las aristas, calculándolo solo una vez por
+        (grafo, attraction_scores) y reutilizándolo entre llamadas a find_path
+        """
+        scores = attraction_scores or {}
+        cached = self.edge_cost_cache
+        if cached is not None and cached[0] is graph and cached[1] == scores:
+            return cached[2]
+        
+        edge_costs = self._compute_edge_costs(graph, attraction_scores)
+        self.edge_cost_cache = (graph, dict(scores), edge_costs)
+        return edge_costs
+    
+    def _compute_edge_costs(
+        self,
+        graph: GraphDataManager,
+        attraction_scores: Optional[Dict[int, float]]
+    ) -> List[float]:
+        """
+        Calcular el costo de todas las aristas del grafo con el kernel por lotes
+        
+        Returns:
+            List[float]: Costo por arista, en el orden CSR del grafo
+        """
+        node_scores = np.zeros(len(graph.node_ids), dtype=np.float64)
+        if attraction_scores:
+            id_to_idx = graph.id_to_idx
+            for attraction_id, score in attraction_scores.items():
+                idx = id_to_idx.get(attraction_id)
+                if idx is not None and score:
+                    node_scores[idx] = score
+        
+        edge_costs = CostCalculator.calculate_edge_cost_batch(
+            graph.edge_distances,
+            graph.edge_times,
+            graph.edge_costs,
+            node_scores[graph.edge_targets],
+            self.weights,
+            self.cost_calculator.is_cost_mode
+        )
+        
+        # Lista de floats nativos: indexarla en el bucle es más barato que un ndarray
+        return edge_costs.tolist()
@@ -3,16 +3,61 @@
 Funciones heurísticas para el algoritmo A*
 """
 from typing import Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast
-from geoalchemy2 import Geography # type: ignore
+import logging
 from math import radians, cos, sin, asin, sqrt
+import numpy as np
 
-from shared.database. models import Attraction
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    from numba import njit # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba es opcional
+    NUMBA_AVAILABLE = False
+
+
+def _edge_cost_loop(
+    distances: np.ndarray,
+    times: np.ndarray,
+    costs: np.ndarray,
+    scores: np.ndarray,
+    w_d: float,
+    w_t: float,
+    w_c: float,
+    w_s: float,
+    is_cost_mode: bool
+) -> np.ndarray:
+    """Kernel de costo por arista (misma fórmula que CostCalculator.calculate_edge_cost)"""
+    n = distances.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        distance_normalized = min(1.0, distances[i] / 5000.0)
+        time_normalized = min(1.0, times[i] / 60.0)
+        
+        c = costs[i]
+        if is_cost_mode:
+            cost_factor = 0.0 if c == 0 else (
+                0.1 if c <= 5 else (
+                    0.3 if c <= 15 else (
+                        0.6 if c <= 30 else 1.0 + c / 50.0
+                    )
+                )
+            )
+        else:
+            cost_factor = min(1.0, c / 100.0)
+        
+        score_factor = 1.0 - scores[i] / 100.0 if scores[i] > 0 else 0.0
+        
+        edge_cost = w_d * distance_normalized + w_t * time_normalized + w_c * cost_factor + w_s * score_factor
+        out[i] = max(0.001, edge_cost)
+    return out
+
+
+# Compilado con LLVM si numba está disponible; si no, se usa la ruta NumPy
+_edge_cost_kernel = njit(cache=True, fastmath=True)(_edge_cost_loop) if NUMBA_AVAILABLE else None
+
 
 class Heuristics:
     """Colección de funciones heurísticas para A*"""
@@ -38,44 +83,46 @@ class Heuristics:
         return R * c
     
     @staticmethod
-    def manhattan_distance(
-        db: Session,
-        from_attraction: Attraction,
-        to_attraction: Attraction
+    def haversine_to_fixed(
+        lat1: float,
+        lon1: float,
+        end_lat_rad: float,
+        end_lon_rad: float,
+        cos_end_lat: float
     ) -> float:
+        """
+        Haversine hacia un destino fijo cuyos valores trigonométricos ya se
+        precalcularon (radianes y coseno de la latitud).
+        Evita recalcular radians/cos del destino en cada vecino de A*.
+        """
+        if lat1 is None or lon1 is None:
+            return 0.0
+        
+        lat1_rad = radians(lat1)
+        
+        dLat = end_lat_rad - lat1_rad
+        dLon = end_lon_rad - radians(lon1)
+        
+        a = sin(dLat / 2)**2 + cos(lat1_rad) * cos_end_lat * sin(dLon / 2)**2
+        c = 2 * asin(sqrt(a))
+        
+        return 6371000 * c
+    
+    @staticmethod
+    def manhattan_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
         Distancia Manhattan (taxi) - suma de diferencias en lat/lon
         Útil para ciudades con calles en cuadrícula
         """
-        try:
-            from_coords = db.query(
-                func.ST_Y(cast(from_attraction.location, Geography)),
-                func.ST_X(cast(from_attraction.location, Geography))
-            ).first()
-            
-            to_coords = db.query(
-                func.ST_Y(cast(to_attraction.location, Geography)),
-                func.ST_X(cast(to_attraction.location, Geography))
-            ).first()
-            
-            if from_coords and to_coords:
-                lat_diff = abs(from_coords[0] - to_coords[0])
-                lon_diff = abs(from_coords[1] - to_coords[1])
-                distance = (lat_diff + lon_diff) * 111000
-                return float(distance)
-            
-            return 0.0
-            
-        except Exception as e:
-            logger.warning(f"Error calculando distancia Manhattan: {str(e)}")
+        if None in [lat1, lon1, lat2, lon2]:
             return 0.0
+        
+        lat_diff = abs(lat1 - lat2)
+        lon_diff = abs(lon1 - lon2)
+        return float((lat_diff + lon_diff) * 111000)
     
     @staticmethod
-    def zero_heuristic(
-        db: Session,
-        from_attraction: Attraction,
-        to_attraction: Attraction
-    ) -> float:
+    def zero_heuristic(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
         Heurística nula (siempre 0)
         Convierte A* en Dijkstra
@@ -95,6 +142,12 @@ class CostCalculator:
         """
         self.weights = weights
         self.is_cost_mode = weights.get('cost', 0) >= 2.0
+        
+        # Pesos como atributos planos: evita 4 búsquedas en dict por arista
+        self.w_d = weights.get('distance', 0.0)
+        self.w_t = weights.get('time', 0.0)
+        self.w_c = weights.get('cost', 0.0)
+        self.w_s = weights.get('score', 0.0)
     
     def calculate_edge_cost(
         self,
@@ -155,17 +208,77 @@ class CostCalculator:
         
         # Calcular costo ponderado
         edge_cost = (
-            self.weights.get('distance', 0.0) * distance_normalized +
-            self.weights.get('time', 0.0) * time_normalized +
-            self.weights.get('cost', 0.0) * cost_factor +
-            self.weights.get('score', 0.0) * score_factor
+            self.w_d * distance_normalized +
+            self.w_t * time_normalized +
+            self.w_c * cost_factor +
+            self.w_s * score_factor
         )
         
         # Log para debug en modo cost
-        if self.is_cost_mode and cost > 0:
-            logger.debug(f"💰 Edge cost=${cost:.2f} → factor={cost_factor:.2f} → weighted={edge_cost:.3f}")
+        if self.is_cost_mode and cost > 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("💰 Edge cost=$%.2f → factor=%.2f → weighted=%.3f", cost, cost_factor, edge_cost)
         
         return max(0.001, edge_cost)  # Mínimo para evitar ceros
+    
+    @staticmethod
+    def calculate_edge_cost_batch(
+        distances_meters: np.ndarray,
+        travel_times_minutes: np.ndarray,
+        costs: np.ndarray,
+        suitability_scores: np.ndarray,
+        weights: Dict[str, float],
+        is_cost_mode: bool
+    ) -> np.ndarray:
+        """
+        Versión vectorizada de calculate_edge_cost para muchas aristas a la vez
+        
+        Args:
+            distances_meters: Distancias en metros
+            travel_times_minutes: Tiempos de viaje en minutos
+            costs: Costos monetarios
+            suitability_scores: Scores de idoneidad (0-100)
+            weights: Pesos para distance, time, cost, score
+            is_cost_mode: Si se usa la escala de costo real
+            
+        Returns:
+            np.ndarray: Costo calculado por arista
+        """
+        distances_meters = np.asarray(distances_meters, dtype=np.float64)
+        travel_times_minutes = np.asarray(travel_times_minutes, dtype=np.float64)
+        costs = np.asarray(costs, dtype=np.float64)
+        suitability_scores = np.asarray(suitability_scores, dtype=np.float64)
+        
+        if _edge_cost_kernel is not None:
+            return _edge_cost_kernel(
+                distances_meters, travel_times_minutes, costs, suitability_scores,
+                weights.get('distance', 0.0), weights.get('time', 0.0),
+                weights.get('cost', 0.0), weights.get('score', 0.0),
+                is_cost_mode
+            )
+        
+        distance_normalized = np.minimum(1.0, distances_meters / 5000)
+        time_normalized = np.minimum(1.0, travel_times_minutes / 60)
+        
+        if is_cost_mode:
+            # Misma escalera que la versión escalar, sin ramas
+            cost_factor = np.select(
+                [costs == 0, costs <= 5, costs <= 15, costs <= 30],
+                [0.0, 0.1, 0.3, 0.6],
+                default=1.0 + costs / 50
+            )
+        else:
+            cost_factor = np.minimum(1.0, costs / 100)
+        
+        score_factor = np.where(suitability_scores > 0, 1.0 - suitability_scores / 100, 0.0)
+        
+        edge_costs = (
+            weights.get('distance', 0.0) * distance_normalized +
+            weights.get('time', 0.0) * time_normalized +
+            weights.get('cost', 0.0) * cost_factor +
+            weights.get('score', 0.0) * score_factor
+        )
+        
+        return np.maximum(0.001, edge_costs)
 
 
 def get_optimization_weights(mode: str) -> Dict[str, float]:
@@ -0,0 +1,207 @@
+# backend/services/router_optimizer/pareto.py
+"""
+Búsqueda multiobjetivo (distancia, tiempo, costo) por etiquetas
+"""
+from typing import List, Dict, Tuple
+from heapq import heappush, heappop
+
+from shared.graph_loader import GraphDataManager
+from shared.utils.numbers import optional_float
+from shared.utils.logger import setup_logger
+from .path_generator import OptimizedRoute, RouteSegment
+
+logger = setup_logger(__name__)
+
+
+class ParetoSearch:
+    """
+    Dijkstra multiobjetivo con etiquetas (label-setting)
+
+    Cada nodo guarda las etiquetas (distancia, tiempo, costo) no dominadas
+    que lo alcanzan. Las etiquetas se extraen en orden lexicográfico, por lo
+    que una etiqueta extraída nunca es dominada por otra posterior y puede
+    fijarse como permanente.
+    """
+
+    def __init__(self, graph: GraphDataManager):
+        """
+        Inicializar búsqueda
+
+        Args:
+            graph: Grafo del destino ya cargado en memoria
+        """
+        self.graph = graph
+        self.labels_explored = 0
+
+    @staticmethod
+    def _dominated(
+        distance: float,
+        time: float,
+        cost: float,
+        labels: List[Tuple[float, float, float]]
+    ) -> bool:
+        """Indica si (distancia, tiempo, costo) es dominada o igual a alguna etiqueta"""
+        for label_distance, label_time, label_cost in labels:
+            if label_distance <= distance and label_time <= time and label_cost <= cost:
+                return True
+        return False
+
+    def find_front(
+        self,
+        start_attraction_id: int,
+        end_attraction_id: int,
+        max_labels: int = 50000
+    ) -> List[OptimizedRoute]:
+        """
+        Calcular el frente de Pareto de rutas entre dos atracciones
+
+        Args:
+            start_attraction_id: ID de inicio
+            end_attraction_id: ID de destino
+            max_labels: Máximo de etiquetas a extraer (corta la búsqueda)
+
+        Returns:
+            List[OptimizedRoute]: Rutas no dominadas, ordenadas por distancia
+        """
+        graph = self.graph
+        self.labels_explored = 0
+
+        if start_attraction_id not in graph.id_to_idx or end_attraction_id not in graph.id_to_idx:
+            logger.warning(
+                f"Atracciones {start_attraction_id} → {end_attraction_id} fuera del grafo"
+            )
+            return []
+
+        start_idx = graph.id_to_idx[start_attraction_id]
+        end_idx = graph.id_to_idx[end_attraction_id]
+
+        edge_indptr = graph.edge_indptr.tolist()
+        edge_targets = graph.edge_targets.tolist()
+        edge_distances = graph.edge_distances.tolist()
+        edge_times = graph.edge_times.tolist()
+        edge_costs = graph.edge_costs.tolist()
+
+        # Etiquetas: (nodo, arista usada, etiqueta previa); -1 en el inicio
+        label_nodes: List[int] = [start_idx]
+        label_edges: List[int] = [-1]
+        label_prev: List[int] = [-1]
+
+        permanent: Dict[int, List[Tuple[float, float, float]]] = {}
+        front_labels: List[int] = []
+
+        open_set = [(0.0, 0.0, 0.0, 0)]
+
+        while open_set:
+            distance, time, cost, label_id = heappop(open_set)
+            node_idx = label_nodes[label_id]
+
+            node_labels = permanent.setdefault(node_idx, [])
+            if ParetoSearch._dominated(distance, time, cost, node_labels):
+                continue
+            if node_idx != end_idx and ParetoSearch._dominated(
+                distance, time, cost, permanent.get(end_idx, [])
+            ):
+                continue
+
+            node_labels.append((distance, time, cost))
+            self.labels_explored += 1
+
+            if node_idx == end_idx:
+                front_labels.append(label_id)
+                continue
+
+            if self.labels_explored >= max_labels:
+                logger.warning(f"Límite de etiquetas alcanzado ({max_labels}), frente parcial")
+                break
+
+            end_labels = permanent.get(end_idx, [])
+            for edge_pos in range(edge_indptr[node_idx], edge_indptr[node_idx + 1]):
+                neighbor_idx = edge_targets[edge_pos]
+                new_distance = distance + edge_distances[edge_pos]
+                new_time = time + edge_times[edge_pos]
+                new_cost = cost + edge_costs[edge_pos]
+
+                if ParetoSearch._dominated(new_distance, new_time, new_cost, end_labels):
+                    continue
+                if ParetoSearch._dominated(
+                    new_distance, new_time, new_cost, permanent.get(neighbor_idx, [])
+                ):
+                    continue
+
+                label_nodes.append(neighbor_idx)
+                label_edges.append(edge_pos)
+                label_prev.append(label_id)
+                heappush(open_set, (new_distance, new_time, new_cost, len(label_nodes) - 1))
+
+        routes = [
+            self._build_route(label_id, label_nodes, label_edges, label_prev)
+            for label_id in front_labels
+        ]
+
+        logger.info(
+            f"Frente de Pareto {start_attraction_id} → {end_attraction_id}: "
+            f"{len(routes)} rutas, {self.labels_explored} etiquetas"
+        )
+
+        return routes
+
+    def _build_route(
+        self,
+        label_id: int,
+        label_nodes: List[int],
+        label_edges: List[int],
+        label_prev: List[int]
+    ) -> OptimizedRoute:
+        """
+        Reconstruir la ruta de una etiqueta del destino desde el grafo en memoria
+
+        Los segmentos salen de las aristas usadas por la etiqueta, de modo que
+        dos rutas por los mismos nodos con distinto transporte se distinguen.
+        """
+        graph = self.graph
+
+        edge_chain = []
+        current = label_id
+        while label_prev[current] != -1:
+            edge_chain.append((label_nodes[label_prev[current]], label_edges[current]))
+            current = label_prev[current]
+        edge_chain.reverse()
+
+        path = [graph.node_ids[label_nodes[current]]]
+        segments = []
+        for from_idx, edge_pos in edge_chain:
+            from_id = graph.node_ids[from_idx]
+            edge = graph.adjacency_list[from_id][edge_pos - int(graph.edge_indptr[from_idx])]
+            segments.append(RouteSegment(
+                from_attraction_id=from_id,
+                to_attraction_id=edge['to_attraction_id'],
+                distance_meters=edge['distance_meters'],
+                travel_time_minutes=edge['travel_time_minutes'] or 0,
+                transport_mode=edge['transport_mode'],
+                cost=edge['cost']
+            ))
+            path.append(edge['to_attraction_id'])
+
+        attractions = []
+        for attraction_id in path:
+            node = graph.nodes[attraction_id]
+            attractions.append({
+                'id': node['id'],
+                'name': node['name'],
+                'category': node['category'],
+                'rating': optional_float(node['rating']),
+                'price_range': node['price_range'],
+                'address': node['address']
+            })
+
+        return OptimizedRoute(
+            attractions=attractions,
+            segments=segments,
+            total_distance=round(sum(seg.distance_meters for seg in segments), 2),
+            total_time=sum(seg.travel_time_minutes for seg in segments),
+            total_cost=round(sum(seg.cost for seg in segments), 2),
+            optimization_score=0.0,
+            path_found=True,
+            nodes_explored=self.labels_explored,
+            optimization_mode="pareto"
+        )
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from sqlalchemy.orm import Session
 
 from shared.database.models import Attraction, AttractionConnection
+from shared.utils.numbers import optional_float
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -40,14 +41,20 @@ class OptimizedRoute:
 class PathGenerator:
     """Generador y reconstructor de rutas"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        attraction_cache: Optional[Dict[int, Attraction]] = None
+    ):
         """
         Inicializar generador
         
         Args:
             db: Sesión de base de datos
+            attraction_cache: Atracciones ya cargadas ({id: Attraction}), opcional
         """
         self.db = db
+        self.attraction_cache = attraction_cache if attraction_cache is not None else {}
     
     def reconstruct_path(
         self,
@@ -159,17 +166,26 @@ class PathGenerator:
         """
         attractions = []
         
+        # Cargar en una sola consulta las atracciones que no estén en caché
+        missing_ids = {
+            attraction_id for attraction_id in path
+            if attraction_id not in self.attraction_cache
+        }
+        if missing_ids:
+            for attr in self.db.query(Attraction).filter(
+                Attraction.id.in_(missing_ids)
+            ).all():
+                self.attraction_cache[attr.id] = attr
+        
         for attraction_id in path:
-            attr = self.db.query(Attraction).filter(
-                Attraction.id == attraction_id
-            ).first()
+            attr = self.attraction_cache.get(attraction_id)
             
             if attr:
                 attr_dict = {
                     'id': attr.id,
                     'name': attr.name,
                     'category': attr.category,
-                    'rating': float(attr.rating) if attr.rating else None,
+                    'rating': optional_float(attr.rating),
                     'price_range': attr.price_range,
                     'address': attr.address
                 }
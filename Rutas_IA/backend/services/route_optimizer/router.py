@@ -4,6 +4,7 @@ Endpoints REST para optimización de rutas con A*
 """
 from typing import Optional, List, Dict
 from fastapi import APIRouter, Depends, Query, Body, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Union
 
@@ -12,7 +13,8 @@ from .service import RouterOptimizerService
 
 router = APIRouter(
     prefix="/router",
-    tags=["Route Optimization (A*)"]
+    tags=["Route Optimization (A*)"],
+    default_response_class=ORJSONResponse
 )
 
 
@@ -192,4 +194,43 @@ def compare_optimization_modes(
         start_attraction_id=start_attraction_id,
         end_attraction_id=end_attraction_id,
         attraction_scores=attraction_scores
-    )
\ No newline at end of file
+    )
+
+
+@router.get(
+    "/pareto",
+    response_model=dict,
+    summary="Frente de Pareto entre dos atracciones",
+    description="Todas las rutas no dominadas en distancia, tiempo y costo"
+)
+def pareto_routes(
+    start_attraction_id: int = Query(..., gt=0),
+    end_attraction_id: int = Query(..., gt=0),
+    max_labels: int = Query(50000, ge=100, le=500000),
+    db: Session = Depends(get_db)
+):
+    """
+    Calcular el frente de Pareto de rutas.
+    
+    Una sola búsqueda multiobjetivo (distancia, tiempo, costo) devuelve
+    todas las rutas no dominadas. `best_by_mode` indica, para cada modo
+    (distance, time, cost, balanced, score), el índice de la ruta del
+    frente que ese modo elegiría.
+    
+    Respuesta:
+    ```json
+    {
+        "routes": [
+            {"summary": {"total_distance_meters": 4200, "total_time_minutes": 50, "total_cost": 0, ...}, ...},
+            {"summary": {"total_distance_meters": 6500, "total_time_minutes": 25, "total_cost": 15, ...}, ...}
+        ],
+        "best_by_mode": {"distance": 0, "time": 1, "cost": 0, "balanced": 0, "score": 0}
+    }
+    ```
+    """
+    return RouterOptimizerService.compute_pareto_routes(
+        db=db,
+        start_attraction_id=start_attraction_id,
+        end_attraction_id=end_attraction_id,
+        max_labels=max_labels
+    )
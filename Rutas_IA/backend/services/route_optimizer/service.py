@@ -2,17 +2,87 @@
 """
 Servicio para optimización de rutas usando A*
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+import heapq
+import os
+import threading
+import numpy as np
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from .a_star import AStar
+from .pareto import ParetoSearch
 from .path_generator import OptimizedRoute
 from shared.database. models import Attraction
+from shared.graph_loader import GraphDataManager, get_cached_graph
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    from numba import njit # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba es opcional
+    NUMBA_AVAILABLE = False
+
+# Campos de RouteSegment expuestos en las respuestas (getter reutilizable)
+_SEG_KEYS = (
+    'from_attraction_id',
+    'to_attraction_id',
+    'distance_meters',
+    'travel_time_minutes',
+    'transport_mode',
+    'cost'
+)
+_seg_get = attrgetter(*_SEG_KEYS)
+
+
+def _weighted_route_cost_loop(
+    distances: np.ndarray,
+    times: np.ndarray,
+    costs: np.ndarray,
+    mode_id: int,
+    w_d: float,
+    w_t: float,
+    w_c: float,
+    cheap: float,
+    expensive: float
+) -> np.ndarray:
+    """Kernel de costo ponderado por ruta (misma fórmula que la ruta NumPy)"""
+    n = distances.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        d = distances[i]
+        t = times[i]
+        c = costs[i]
+        weighted = (d / 1000.0) * w_d + (t / 60.0) * w_t + c * w_c
+        
+        if mode_id == 3:  # cost
+            if c == 0:
+                weighted *= 0.3
+            elif c <= cheap:
+                weighted *= 0.6
+            elif c >= expensive:
+                weighted *= 2.5
+        elif mode_id == 1:  # distance
+            if d > 3000:
+                weighted *= 1.5
+        elif mode_id == 2:  # time
+            if t > 30:
+                weighted *= 1.5
+        
+        out[i] = weighted
+    return out
+
+
+# Compilado con LLVM si numba está disponible; sin fastmath porque las
+# matrices de rutas usan inf para los pares sin camino
+_weighted_route_cost_kernel = (
+    njit(cache=True)(_weighted_route_cost_loop) if NUMBA_AVAILABLE else None
+)
+
 
 class RouterOptimizerService:
     """Servicio de optimización de rutas"""
@@ -37,6 +107,19 @@ class RouterOptimizerService:
         "expensive": 50   # Taxi
     }
     
+    # IDs numéricos de modo para el kernel compilado
+    MODE_IDS = {
+        "balanced": 0,
+        "distance": 1,
+        "time": 2,
+        "cost": 3,
+        "score": 4
+    }
+    
+    # Máximo de paradas para resolver el orden exacto con Held-Karp
+    # (O(W²·2^W)); por encima se usa la estrategia greedy
+    HELD_KARP_MAX_STOPS = 12
+    
     # ═══════════════════════════════════════════════════════════
     
     @staticmethod
@@ -53,13 +136,17 @@ class RouterOptimizerService:
         Optimizar ruta entre dos atracciones usando A*
         """
         try:
-            start_attr = db.query(Attraction).filter(
-                Attraction.id == start_attraction_id
-            ).first()
+            attraction_scores = RouterOptimizerService._normalize_scores(attraction_scores)
             
-            end_attr = db.query(Attraction).filter(
-                Attraction.id == end_attraction_id
-            ).first()
+            # Inicio y destino en una sola consulta
+            attractions_by_id = {
+                attr.id: attr
+                for attr in db.query(Attraction).filter(
+                    Attraction.id.in_((start_attraction_id, end_attraction_id))
+                ).all()
+            }
+            start_attr = attractions_by_id.get(start_attraction_id)
+            end_attr = attractions_by_id.get(end_attraction_id)
             
             if not start_attr:
                 raise HTTPException(
@@ -76,7 +163,8 @@ class RouterOptimizerService:
             astar = AStar(
                 db=db,
                 optimization_mode=optimization_mode,
-                heuristic_type=heuristic_type
+                heuristic_type=heuristic_type,
+                attraction_cache=attractions_by_id
             )
             
             route = astar.find_path(
@@ -115,21 +203,35 @@ class RouterOptimizerService:
         waypoints: List[int],
         end_attraction_id: Optional[int] = None,
         optimization_mode: str = "balanced",
-        attraction_scores: Optional[Dict[int, float]] = None
+        attraction_scores: Optional[Dict[int, float]] = None,
+        graph: Optional[GraphDataManager] = None
     ) -> Dict:
         """
         Optimizar ruta con múltiples paradas
+        
+        Si se pasa `graph`, se reutiliza el grafo ya cargado en memoria
+        en lugar de recargarlo desde la BD.
         """
         try:
+            attraction_scores = RouterOptimizerService._normalize_scores(attraction_scores)
+            
             if not waypoints:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Debe proporcionar al menos una parada (waypoint)"
                 )
             
-            start_attr = db.query(Attraction).filter(
-                Attraction.id == start_attraction_id
-            ).first()
+            if end_attraction_id is None:
+                end_attraction_id = start_attraction_id
+            
+            # Inicio, paradas y destino en una sola consulta
+            attractions_by_id = {
+                attr.id: attr
+                for attr in db.query(Attraction).filter(
+                    Attraction.id.in_({start_attraction_id, end_attraction_id, *waypoints})
+                ).all()
+            }
+            start_attr = attractions_by_id.get(start_attraction_id)
             
             if not start_attr:
                 raise HTTPException(
@@ -137,13 +239,12 @@ class RouterOptimizerService:
                     detail=f"Atracción de inicio {start_attraction_id} no encontrada"
                 )
             
-            if end_attraction_id is None:
-                end_attraction_id = start_attraction_id
-            
             # Inicializar A*
             astar = AStar(
                 db=db,
-                optimization_mode=optimization_mode
+                optimization_mode=optimization_mode,
+                graph=graph,
+                attraction_cache=attractions_by_id
             )
             
             # ═══════════════════════════════════════════════════════════
@@ -160,21 +261,50 @@ class RouterOptimizerService:
             # ═══════════════════════════════════════════════════════════
             
             current_location = start_attraction_id
-            remaining_stops = waypoints. copy()
+            stops = list(dict.fromkeys(waypoints))
+            
+            # ═══════════════════════════════════════════════════════════
+            # PRECALCULAR MATRIZ DE RUTAS (una sola vez, en paralelo)
+            # ═══════════════════════════════════════════════════════════
+            
+            pairs = [(start_attraction_id, stop) for stop in stops]
+            pairs += [(src, dst) for src in stops for dst in stops if src != dst]
+            pairs += [(stop, end_attraction_id) for stop in stops if stop != end_attraction_id]
+            if start_attraction_id != end_attraction_id:
+                pairs.append((start_attraction_id, end_attraction_id))
+            pairs = list(dict.fromkeys(pairs))
+            
+            routes = RouterOptimizerService._find_paths_concurrently(
+                db=db,
+                astar=astar,
+                pairs=pairs,
+                attraction_scores=attraction_scores
+            )
+            
+            node_ids = list(dict.fromkeys([start_attraction_id, *stops, end_attraction_id]))
+            node_index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+            dist_matrix, time_matrix, cost_matrix, found_matrix = RouterOptimizerService._build_route_matrices(
+                routes, node_index
+            )
+            
+            # Costo ponderado de todas las rutas candidatas en una sola pasada
+            weighted_matrix = RouterOptimizerService._calculate_weighted_route_costs(
+                total_distances=dist_matrix,
+                total_times=time_matrix,
+                total_costs=cost_matrix,
+                weights=weights,
+                optimization_mode=optimization_mode
+            )
+            weighted_matrix[~found_matrix] = np.inf
+            
+            # ═══════════════════════════════════════════════════════════
             
             all_attractions = []
-            all_segments = []
-            total_distance = 0.0
-            total_time = 0
-            total_cost = 0.0
-            total_nodes = 0
-            
-            # Contadores para análisis
-            transport_stats = {
-                "walking": 0,
-                "public_transit": 0,
-                "taxi": 0
-            }
+            # Segmentos en columnas (una lista por campo de _SEG_KEYS); los
+            # dicts de respuesta se construyen una sola vez al final
+            segment_columns = [[] for _ in _SEG_KEYS]
+            # Totales acumulados: [distancia, tiempo, costo, nodos explorados]
+            totals = np.zeros(4, dtype=np.float64)
             
             all_attractions.append({
                 'id': start_attr.id,
@@ -185,39 +315,37 @@ class RouterOptimizerService:
             
             order = 1
             
-            while remaining_stops:
-                best_next = None
-                best_route = None
-                best_weighted_cost = float('inf')
-                
-                for next_stop in remaining_stops:
-                    route = astar.find_path(
-                        start_attraction_id=current_location,
-                        end_attraction_id=next_stop,
-                        attraction_scores=attraction_scores
-                    )
-                    
-                    if route. path_found:
-                        # ═══════════════════════════════════════════════════
-                        # CALCULAR COSTO PONDERADO SEGÚN MODO
-                        # ═══════════════════════════════════════════════════
-                        
-                        weighted_cost = RouterOptimizerService._calculate_weighted_route_cost(
-                            route=route,
-                            weights=weights,
-                            optimization_mode=optimization_mode
-                        )
-                        
-                        # ═══════════════════════════════════════════════════
-                        
-                        if weighted_cost < best_weighted_cost:
-                            best_weighted_cost = weighted_cost
-                            best_next = next_stop
-                            best_route = route
-                
-                if best_next is None:
-                    logger.warning(f"No se encontró ruta desde {current_location}")
-                    break
+            stop_columns = np.array([node_index[stop] for stop in stops], dtype=np.int64)
+            
+            # ═══════════════════════════════════════════════════════════
+            # ORDEN DE VISITA: Held-Karp (óptimo) o greedy si hay muchas paradas
+            # ═══════════════════════════════════════════════════════════
+            
+            visit_order = None
+            if len(stops) <= RouterOptimizerService.HELD_KARP_MAX_STOPS:
+                visit_order = RouterOptimizerService._held_karp_order(
+                    weighted_matrix,
+                    node_index[start_attraction_id],
+                    stop_columns,
+                    node_index[end_attraction_id]
+                )
+            if visit_order is None:
+                visit_order = RouterOptimizerService._greedy_order(
+                    weighted_matrix,
+                    node_index[start_attraction_id],
+                    stop_columns,
+                    np.array(stops, dtype=np.int64)
+                )
+                if len(visit_order) < len(stops):
+                    last_id = stops[visit_order[-1]] if visit_order else start_attraction_id
+                    logger.warning(f"No se encontró ruta desde {last_id}")
+            
+            for best_idx in visit_order:
+                best_next = stops[best_idx]
+                best_route = routes[(current_location, best_next)]
+                best_weighted_cost = float(
+                    weighted_matrix[node_index[current_location], stop_columns[best_idx]]
+                )
                 
                 # ═══════════════════════════════════════════════════════════
                 # LOG DETALLADO PARA MODO COST
@@ -232,49 +360,17 @@ class RouterOptimizerService:
                 
                 # ═══════════════════════════════════════════════════════════
                 
-                for attr in best_route.attractions[1:]:
-                    attr['order'] = order
-                    all_attractions.append(attr)
-                    order += 1
-                
-                # Procesar segmentos y contar tipos de transporte
-                for seg in best_route.segments:
-                    segment_dict = {
-                        'from_attraction_id': seg.from_attraction_id,
-                        'to_attraction_id': seg.to_attraction_id,
-                        'distance_meters': seg.distance_meters,
-                        'travel_time_minutes': seg.travel_time_minutes,
-                        'transport_mode': seg.transport_mode,
-                        'cost': seg.cost
-                    }
-                    all_segments.append(segment_dict)
-                    
-                    # Estadísticas de transporte
-                    if seg.cost == 0:
-                        transport_stats["walking"] += 1
-                    elif seg.cost <= RouterOptimizerService.COST_THRESHOLDS["medium"]:
-                        transport_stats["public_transit"] += 1
-                    else:
-                        transport_stats["taxi"] += 1
-                
-                total_distance += best_route.total_distance
-                total_time += best_route. total_time
-                total_cost += best_route.total_cost
-                total_nodes += best_route.nodes_explored
+                order = RouterOptimizerService._merge_route(
+                    best_route, all_attractions, segment_columns, totals, order
+                )
                 
                 current_location = best_next
-                remaining_stops. remove(best_next)
             
             # Ruta de regreso
             if current_location != end_attraction_id:
-                final_route = astar.find_path(
-                    start_attraction_id=current_location,
-                    end_attraction_id=end_attraction_id,
-                    attraction_scores=attraction_scores
-                )
+                final_route = routes[(current_location, end_attraction_id)]
                 
                 if final_route. path_found:
-
                     
                     if optimization_mode == "cost":
                         logger.info(
@@ -282,35 +378,20 @@ class RouterOptimizerService:
                             f"distancia={final_route. total_distance:.0f}m"
                         )
                     
-                    # ═══════════════════════════════════════════════════════════
-                    
-                    for attr in final_route.attractions[1:]:
-                        attr['order'] = order
-                        all_attractions.append(attr)
-                        order += 1
-                    
-                    for seg in final_route.segments:
-                        segment_dict = {
-                            'from_attraction_id': seg.from_attraction_id,
-                            'to_attraction_id': seg.to_attraction_id,
-                            'distance_meters': seg.distance_meters,
-                            'travel_time_minutes': seg.travel_time_minutes,
-                            'transport_mode': seg.transport_mode,
-                            'cost': seg.cost
-                        }
-                        all_segments.append(segment_dict)
-                        
-                        if seg.cost == 0:
-                            transport_stats["walking"] += 1
-                        elif seg. cost <= RouterOptimizerService. COST_THRESHOLDS["medium"]:
-                            transport_stats["public_transit"] += 1
-                        else:
-                            transport_stats["taxi"] += 1
-                    
-                    total_distance += final_route. total_distance
-                    total_time += final_route.total_time
-                    total_cost += final_route.total_cost
-                    total_nodes += final_route.nodes_explored
+                    order = RouterOptimizerService._merge_route(
+                        final_route, all_attractions, segment_columns, totals, order
+                    )
+            
+            total_distance, total_time, total_cost, total_nodes = totals.tolist()
+            total_time = int(total_time)
+            total_nodes = int(total_nodes)
+            
+            # Estadísticas de transporte: clasificar todos los segmentos de una vez
+            transport_stats = RouterOptimizerService._count_transport_types(
+                segment_columns[_SEG_KEYS.index('cost')]
+            )
+            
+            all_segments = [dict(zip(_SEG_KEYS, row)) for row in zip(*segment_columns)]
             
             # ═══════════════════════════════════════════════════════════
             # CALCULAR SCORE DE OPTIMIZACIÓN SEGÚN MODO
@@ -365,7 +446,7 @@ class RouterOptimizerService:
                 "metadata": {
                     "optimization_mode": optimization_mode,
                     "waypoints_requested": len(waypoints),
-                    "waypoints_visited": len(waypoints) - len(remaining_stops)
+                    "waypoints_visited": len(visit_order)
                 }
             }
             
@@ -379,32 +460,327 @@ class RouterOptimizerService:
             )
     
     @staticmethod
-    def _calculate_weighted_route_cost(
+    def _merge_route(
         route: OptimizedRoute,
+        all_attractions: List[Dict],
+        segment_columns: List[List],
+        totals: np.ndarray,
+        order: int
+    ) -> int:
+        """
+        Agregar un tramo a la ruta multi-stop acumulada
+        
+        Añade sus atracciones (sin repetir el origen) numeradas desde `order`,
+        sus segmentos a las columnas y sus totales al vector acumulado.
+        
+        Returns:
+            int: Siguiente número de orden
+        """
+        for attr in route.attractions[1:]:
+            attr['order'] = order
+            all_attractions.append(attr)
+            order += 1
+        
+        for column, values in zip(segment_columns, zip(*map(_seg_get, route.segments))):
+            column.extend(values)
+        
+        totals += (
+            route.total_distance,
+            route.total_time,
+            route.total_cost,
+            route.nodes_explored
+        )
+        
+        return order
+    
+    @staticmethod
+    def _held_karp_order(
+        weighted_matrix: np.ndarray,
+        start_idx: int,
+        stop_columns: np.ndarray,
+        end_idx: int
+    ) -> Optional[List[int]]:
+        """
+        Orden óptimo de visita (TSP de camino) con DP de Held-Karp sobre bitmasks
+        
+        Args:
+            weighted_matrix: Costos ponderados S×S (inf si no hay ruta)
+            start_idx: Fila del punto de inicio
+            stop_columns: Columna de cada parada
+            end_idx: Columna del destino final
+            
+        Returns:
+            List[int]: Índices de paradas en orden, o None si no hay recorrido completo
+        """
+        n = len(stop_columns)
+        full_mask = (1 << n) - 1
+        stop_range = np.arange(n)
+        stop_bits = 1 << stop_range
+        
+        between_stops = weighted_matrix[np.ix_(stop_columns, stop_columns)]
+        
+        # dp[mask, j]: costo mínimo visitando `mask` y terminando en la parada j
+        dp = np.full((1 << n, n), np.inf)
+        parent = np.full((1 << n, n), -1, dtype=np.int64)
+        dp[stop_bits, stop_range] = weighted_matrix[start_idx, stop_columns]
+        
+        for mask in range(1, full_mask):
+            row = dp[mask]
+            if not np.isfinite(row).any():
+                continue
+            
+            # Mejor predecesor i para llegar a cada j desde este mask
+            transitions = row[:, None] + between_stops
+            best_from = transitions.argmin(axis=0)
+            best_cost = transitions[best_from, stop_range]
+            
+            free = (mask & stop_bits) == 0
+            next_masks = mask | stop_bits[free]
+            targets = stop_range[free]
+            improves = best_cost[free] < dp[next_masks, targets]
+            
+            dp[next_masks[improves], targets[improves]] = best_cost[free][improves]
+            parent[next_masks[improves], targets[improves]] = best_from[free][improves]
+        
+        # Cerrar el recorrido hacia el destino final (0 si la parada ya es el destino)
+        end_costs = weighted_matrix[stop_columns, end_idx].copy()
+        end_costs[stop_columns == end_idx] = 0.0
+        final_costs = dp[full_mask] + end_costs
+        
+        last = int(final_costs.argmin())
+        if not np.isfinite(final_costs[last]):
+            return None
+        
+        order = []
+        mask = full_mask
+        while last != -1:
+            order.append(last)
+            previous = int(parent[mask, last])
+            mask ^= 1 << last
+            last = previous
+        
+        order.reverse()
+        return order
+    
+    @staticmethod
+    def _greedy_order(
+        weighted_matrix: np.ndarray,
+        start_idx: int,
+        stop_columns: np.ndarray,
+        stop_ids: np.ndarray
+    ) -> List[int]:
+        """
+        Orden de visita greedy: siempre la parada más barata desde la actual
+        
+        Los empates se resuelven por el ID de atracción más bajo, para que
+        el orden no dependa del orden en que llegaron los waypoints.
+        
+        Returns:
+            List[int]: Índices de paradas en orden (parcial si alguna no es alcanzable)
+        """
+        visited = np.zeros(len(stop_columns), dtype=bool)
+        order = []
+        current_row = start_idx
+        
+        while not visited.all():
+            best = RouterOptimizerService._next_candidates(
+                weighted_matrix[current_row, stop_columns],
+                stop_ids,
+                visited,
+                k=1
+            )
+            
+            if not best:
+                break
+            
+            _, _, best_idx = best[0]
+            order.append(best_idx)
+            visited[best_idx] = True
+            current_row = stop_columns[best_idx]
+        
+        return order
+    
+    @staticmethod
+    def _next_candidates(
+        candidate_costs: np.ndarray,
+        stop_ids: np.ndarray,
+        visited: np.ndarray,
+        k: int = 1
+    ) -> List[Tuple[float, int, int]]:
+        """
+        Seleccionar las k paradas alcanzables más baratas con un heap
+        
+        Args:
+            candidate_costs: Costo ponderado hacia cada parada desde la actual
+            stop_ids: ID de atracción de cada parada (desempate)
+            visited: Máscara de paradas ya visitadas
+            k: Cantidad de candidatas a devolver
+            
+        Returns:
+            List[Tuple]: (costo, id_atracción, índice_parada) ordenadas por costo
+            y, en empate, por ID de atracción
+        """
+        reachable = np.flatnonzero(~visited & np.isfinite(candidate_costs))
+        
+        return heapq.nsmallest(
+            k,
+            zip(
+                candidate_costs[reachable].tolist(),
+                stop_ids[reachable].tolist(),
+                reachable.tolist()
+            )
+        )
+    
+    @staticmethod
+    def _build_route_matrices(
+        routes: Dict[Tuple[int, int], OptimizedRoute],
+        node_index: Dict[int, int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Volcar las rutas precalculadas a matrices densas S×S
+        
+        Args:
+            routes: Ruta por par (origen, destino)
+            node_index: Posición de cada atracción en la matriz
+            
+        Returns:
+            tuple: (distancia, tiempo, costo, encontrada); inf donde no hay ruta
+        """
+        size = len(node_index)
+        dist_matrix = np.full((size, size), np.inf)
+        time_matrix = np.full((size, size), np.inf)
+        cost_matrix = np.full((size, size), np.inf)
+        found_matrix = np.zeros((size, size), dtype=bool)
+        
+        for (src, dst), route in routes.items():
+            if route.path_found:
+                i, j = node_index[src], node_index[dst]
+                dist_matrix[i, j] = route.total_distance
+                time_matrix[i, j] = route.total_time
+                cost_matrix[i, j] = route.total_cost
+                found_matrix[i, j] = True
+        
+        return dist_matrix, time_matrix, cost_matrix, found_matrix
+    
+    @staticmethod
+    def _find_paths_concurrently(
+        db: Session,
+        astar: AStar,
+        pairs: List[Tuple[int, int]],
+        attraction_scores: Optional[Dict[int, float]] = None
+    ) -> Dict[Tuple[int, int], OptimizedRoute]:
+        """
+        Ejecutar varias búsquedas A* independientes en un pool de hilos
+        
+        Cada hilo usa su propia Session, su propio AStar y su propia copia del
+        caché de atracciones (no son thread-safe); el grafo en memoria y los
+        costos de sus aristas se comparten porque son de solo lectura.
+        
+        Args:
+            db: Sesión de la petición (se usa su engine para las sesiones de los hilos)
+            astar: Instancia A* de referencia (modo, heurística y grafo)
+            pairs: Pares (origen, destino) a resolver
+            attraction_scores: Scores de idoneidad
+            
+        Returns:
+            Dict: Ruta calculada por cada par
+        """
+        if not pairs:
+            return {}
+        
+        if len(pairs) == 1:
+            src, dst = pairs[0]
+            return {
+                pairs[0]: astar.find_path(
+                    start_attraction_id=src,
+                    end_attraction_id=dst,
+                    attraction_scores=attraction_scores
+                )
+            }
+        
+        # Cargar el grafo y los costos de sus aristas una vez antes de compartirlos con los hilos
+        graph = astar.get_graph(pairs[0][0])
+        astar.get_edge_costs(graph, attraction_scores)
+        
+        local = threading.local()
+        worker_sessions: List[Session] = []
+        sessions_lock = threading.Lock()
+        
+        def run_pair(pair: Tuple[int, int]) -> OptimizedRoute:
+            worker_astar = getattr(local, "astar", None)
+            if worker_astar is None:
+                worker_db = Session(bind=db.get_bind())
+                with sessions_lock:
+                    worker_sessions.append(worker_db)
+                worker_astar = AStar(
+                    db=worker_db,
+                    optimization_mode=astar.optimization_mode,
+                    heuristic_type=astar.heuristic_type,
+                    graph=graph,
+                    # Copia propia: las atracciones que cargue este hilo pertenecen a
+                    # su Session y no deben llegar al caché de la petición
+                    attraction_cache=dict(astar.attraction_cache),
+                    edge_cost_cache=astar.edge_cost_cache
+                )
+                local.astar = worker_astar
+            
+            return worker_astar.find_path(
+                start_attraction_id=pair[0],
+                end_attraction_id=pair[1],
+                attraction_scores=attraction_scores
+            )
+        
+        max_workers = min(len(pairs), os.cpu_count() or 1)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                return dict(zip(pairs, pool.map(run_pair, pairs)))
+        finally:
+            for worker_db in worker_sessions:
+                worker_db.close()
+    
+    @staticmethod
+    def _calculate_weighted_route_costs(
+        total_distances: np.ndarray,
+        total_times: np.ndarray,
+        total_costs: np.ndarray,
         weights: Dict[str, float],
         optimization_mode: str
-    ) -> float:
+    ) -> np.ndarray:
         """
-        Calcular costo ponderado de una ruta según el modo de optimización
+        Calcular costo ponderado de muchas rutas a la vez según el modo de optimización
         
         Args:
-            route: Ruta calculada por A*
+            total_distances: Distancia total de cada ruta (metros)
+            total_times: Tiempo total de cada ruta (minutos)
+            total_costs: Costo total de cada ruta
             weights: Pesos para distance, time, cost
             optimization_mode: Modo de optimización
             
         Returns:
-            float: Costo ponderado
+            np.ndarray: Costo ponderado por ruta (misma forma que la entrada)
         """
-        # Normalizar valores
-        norm_distance = route.total_distance / 1000  # km
-        norm_time = route.total_time / 60            # horas
-        norm_cost = route.total_cost                  # valor directo
-        
-        # Costo base ponderado
-        weighted_cost = (
-            norm_distance * weights['distance'] +
-            norm_time * weights['time'] +
-            norm_cost * weights['cost']
+        total_distances = np.asarray(total_distances, dtype=np.float64)
+        total_times = np.asarray(total_times, dtype=np.float64)
+        total_costs = np.asarray(total_costs, dtype=np.float64)
+        
+        if _weighted_route_cost_kernel is not None:
+            return _weighted_route_cost_kernel(
+                np.ascontiguousarray(total_distances).ravel(),
+                np.ascontiguousarray(total_times).ravel(),
+                np.ascontiguousarray(total_costs).ravel(),
+                RouterOptimizerService.MODE_IDS.get(optimization_mode, 0),
+                float(weights['distance']),
+                float(weights['time']),
+                float(weights['cost']),
+                float(RouterOptimizerService.COST_THRESHOLDS["cheap"]),
+                float(RouterOptimizerService.COST_THRESHOLDS["expensive"])
+            ).reshape(total_distances.shape)
+        
+        # Costo base ponderado (km, horas, valor directo)
+        weighted_costs = (
+            (total_distances / 1000) * weights['distance'] +
+            (total_times / 60) * weights['time'] +
+            total_costs * weights['cost']
         )
         
         # ═══════════════════════════════════════════════════════════
@@ -412,29 +788,56 @@ class RouterOptimizerService:
         # ═══════════════════════════════════════════════════════════
         
         if optimization_mode == "cost":
-            # Bonificar rutas gratuitas (caminando)
-            if route.total_cost == 0:
-                weighted_cost *= 0.3  # 70% de descuento
-            # Bonificar rutas muy baratas
-            elif route.total_cost <= RouterOptimizerService.COST_THRESHOLDS["cheap"]:
-                weighted_cost *= 0.6  # 40% de descuento
-            # Penalizar rutas caras
-            elif route.total_cost >= RouterOptimizerService.COST_THRESHOLDS["expensive"]:
-                weighted_cost *= 2.5  # 150% de penalización
-                
+            # Bonificar gratuitas (70%) y muy baratas (40%), penalizar caras (150%)
+            weighted_costs = weighted_costs * np.select(
+                [
+                    total_costs == 0,
+                    total_costs <= RouterOptimizerService.COST_THRESHOLDS["cheap"],
+                    total_costs >= RouterOptimizerService.COST_THRESHOLDS["expensive"]
+                ],
+                [0.3, 0.6, 2.5],
+                default=1.0
+            )
+            
         elif optimization_mode == "distance":
-            # Penalizar rutas largas exponencialmente
-            if route.total_distance > 3000:  # Más de 3km
-                weighted_cost *= 1.5
+            # Penalizar rutas de más de 3km
+            weighted_costs = weighted_costs * np.where(total_distances > 3000, 1.5, 1.0)
                 
         elif optimization_mode == "time":
-            # Penalizar rutas lentas
-            if route.total_time > 30:  # Más de 30 min
-                weighted_cost *= 1.5
+            # Penalizar rutas de más de 30 min
+            weighted_costs = weighted_costs * np.where(total_times > 30, 1.5, 1.0)
         
         # ═══════════════════════════════════════════════════════════
         
-        return weighted_cost
+        return weighted_costs
+    
+    @staticmethod
+    def _count_transport_types(segment_costs: List[float]) -> Dict[str, int]:
+        """
+        Contar segmentos por tipo de transporte según su costo
+        
+        Gratis → caminando, hasta el umbral "medium" → transporte público,
+        por encima → taxi.
+        
+        Args:
+            segment_costs: Costo de cada segmento de la ruta
+            
+        Returns:
+            Dict: Conteo por tipo de transporte
+        """
+        costs = np.asarray(segment_costs, dtype=np.float64)
+        bins = np.digitize(
+            costs,
+            [0.0, RouterOptimizerService.COST_THRESHOLDS["medium"]],
+            right=True
+        )
+        counts = np.bincount(bins, minlength=3)
+        
+        return {
+            "walking": int(counts[0]),
+            "public_transit": int(counts[1]),
+            "taxi": int(counts[2])
+        }
     
     @staticmethod
     def _calculate_optimization_score(
@@ -491,12 +894,21 @@ class RouterOptimizerService:
         Comparar rutas con diferentes modos de optimización
         """
         try:
+            attraction_scores = RouterOptimizerService._normalize_scores(attraction_scores)
             modes = ["distance", "time", "cost", "balanced", "score"]
-            comparisons = []
             
-            for mode in modes:
+            # Cargar el grafo una sola vez; los modos lo comparten en solo lectura
+            try:
+                graph = AStar(db=db, optimization_mode="balanced").get_graph(start_attraction_id)
+            except Exception as e:
+                logger.warning(f"No se pudo precargar el grafo: {str(e)}")
+                graph = None
+            
+            def run_mode(mode: str) -> Dict:
+                # Session y AStar propios por hilo (no son thread-safe)
+                worker_db = Session(bind=db.get_bind())
                 try:
-                    astar = AStar(db=db, optimization_mode=mode)
+                    astar = AStar(db=worker_db, optimization_mode=mode, graph=graph)
                     
                     route = astar.find_path(
                         start_attraction_id=start_attraction_id,
@@ -505,7 +917,7 @@ class RouterOptimizerService:
                     )
                     
                     if route.path_found:
-                        comparisons.append({
+                        return {
                             "mode": mode,
                             "path_found": True,
                             "total_distance_meters": route.total_distance,
@@ -514,20 +926,35 @@ class RouterOptimizerService:
                             "optimization_score": route.optimization_score,
                             "nodes_explored": route.nodes_explored,
                             "attractions_count": len(route. attractions)
-                        })
-                    else:
-                        comparisons.append({
-                            "mode": mode,
-                            "path_found": False
-                        })
+                        }
+                    return {
+                        "mode": mode,
+                        "path_found": False
+                    }
                         
                 except Exception as e:
                     logger.warning(f"Error con modo {mode}: {str(e)}")
-                    comparisons. append({
+                    return {
                         "mode": mode,
                         "path_found": False,
                         "error": str(e)
-                    })
+                    }
+                finally:
+                    worker_db.close()
+            
+            # Si el resultado no depende del modo (inicio == destino o destino
+            # inalcanzable en el grafo), basta con una sola búsqueda
+            mode_independent = graph is not None and (
+                start_attraction_id == end_attraction_id
+                or not graph.is_reachable(start_attraction_id, end_attraction_id)
+            )
+            
+            if mode_independent:
+                base_comparison = run_mode(modes[0])
+                comparisons = [{**base_comparison, "mode": mode} for mode in modes]
+            else:
+                with ThreadPoolExecutor(max_workers=len(modes)) as pool:
+                    comparisons = list(pool.map(run_mode, modes))
             
             logger.info(f"Comparación de rutas completada: {len(comparisons)} modos")
             
@@ -544,6 +971,138 @@ class RouterOptimizerService:
                 detail=f"Error al comparar rutas: {str(e)}"
             )
     
+    @staticmethod
+    def compute_pareto_routes(
+        db: Session,
+        start_attraction_id: int,
+        end_attraction_id: int,
+        max_labels: int = 50000
+    ) -> Dict:
+        """
+        Calcular el frente de Pareto (distancia, tiempo, costo) entre dos atracciones
+        
+        Una sola búsqueda multiobjetivo devuelve todas las rutas no dominadas;
+        la mejor ruta de cada modo de MODE_WEIGHTS se elige escalarizando el
+        frente, sin repetir la búsqueda por modo.
+        """
+        try:
+            attractions_by_id = {
+                attr.id: attr
+                for attr in db.query(Attraction).filter(
+                    Attraction.id.in_((start_attraction_id, end_attraction_id))
+                ).all()
+            }
+            start_attr = attractions_by_id.get(start_attraction_id)
+            end_attr = attractions_by_id.get(end_attraction_id)
+            
+            if not start_attr:
+                raise HTTPException(
+                    status_code=status. HTTP_404_NOT_FOUND,
+                    detail=f"Atracción de inicio {start_attraction_id} no encontrada"
+                )
+            
+            if not end_attr:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Atracción destino {end_attraction_id} no encontrada"
+                )
+            
+            graph = get_cached_graph(db, start_attr.destination_id)
+            search = ParetoSearch(graph)
+            front = search.find_front(
+                start_attraction_id=start_attraction_id,
+                end_attraction_id=end_attraction_id,
+                max_labels=max_labels
+            )
+            
+            # ═══════════════════════════════════════════════════════════
+            # ESCALARIZAR EL FRENTE PARA CADA MODO
+            # ═══════════════════════════════════════════════════════════
+            
+            best_by_mode = {}
+            if front:
+                distances = np.array([route.total_distance for route in front], dtype=np.float64)
+                times = np.array([route.total_time for route in front], dtype=np.float64)
+                costs = np.array([route.total_cost for route in front], dtype=np.float64)
+                
+                for mode, weights in RouterOptimizerService.MODE_WEIGHTS.items():
+                    weighted_costs = RouterOptimizerService._calculate_weighted_route_costs(
+                        total_distances=distances,
+                        total_times=times,
+                        total_costs=costs,
+                        weights=weights,
+                        optimization_mode=mode
+                    )
+                    best_by_mode[mode] = int(weighted_costs.argmin())
+            
+            # ═══════════════════════════════════════════════════════════
+            
+            routes = []
+            for route in front:
+                routes.append({
+                    "attractions": route.attractions,
+                    "segments": [dict(zip(_SEG_KEYS, _seg_get(seg))) for seg in route.segments],
+                    "summary": {
+                        "total_distance_meters": route.total_distance,
+                        "total_distance_km": round(route.total_distance / 1000, 2),
+                        "total_time_minutes": route.total_time,
+                        "total_time_hours": round(route.total_time / 60, 2),
+                        "total_cost": route.total_cost,
+                        "hops": len(route.attractions) - 1
+                    }
+                })
+            
+            logger.info(
+                f"Frente de Pareto: {start_attr.name} → {end_attr.name} "
+                f"({len(routes)} rutas no dominadas)"
+            )
+            
+            return {
+                "path_found": len(routes) > 0,
+                "start_attraction": {
+                    "id": start_attr.id,
+                    "name": start_attr.name,
+                    "category": start_attr.category
+                },
+                "end_attraction": {
+                    "id": end_attr.id,
+                    "name": end_attr.name,
+                    "category": end_attr.category
+                },
+                "routes": routes,
+                "best_by_mode": best_by_mode,
+                "metadata": {
+                    "algorithm": "Pareto label-setting",
+                    "objectives": ["distance", "time", "cost"],
+                    "front_size": len(routes),
+                    "labels_explored": search.labels_explored
+                }
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error calculando frente de Pareto: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al calcular frente de Pareto: {str(e)}"
+            )
+    
+    @staticmethod
+    def _normalize_scores(
+        attraction_scores: Optional[Dict]
+    ) -> Optional[Dict[int, float]]:
+        """
+        Normalizar los scores a Dict[int, float] una sola vez por petición
+        
+        El body JSON llega con claves str ("1": 95.5); A* y el generador de
+        rutas buscan por ID entero.
+        """
+        if not attraction_scores:
+            return attraction_scores
+        
+        return {int(k): float(v) for k, v in attraction_scores.items()}
+    
     @staticmethod
     def _format_route_response(
         route: OptimizedRoute,
@@ -567,14 +1126,7 @@ class RouterOptimizerService:
             },
             "attractions": route.attractions,
             "segments": [
-                {
-                    "from_attraction_id": seg.from_attraction_id,
-                    "to_attraction_id": seg.to_attraction_id,
-                    "distance_meters": seg. distance_meters,
-                    "travel_time_minutes": seg.travel_time_minutes,
-                    "transport_mode": seg.transport_mode,
-                    "cost": seg.cost
-                }
+                dict(zip(_SEG_KEYS, _seg_get(seg)))
                 for seg in route. segments
             ],
             "summary": {
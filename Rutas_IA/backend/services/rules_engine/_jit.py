@@ -0,0 +1,65 @@
+# backend/services/rules_engine/_jit.py
+"""
+Compilación opcional (numba) de condiciones numéricas de reglas
+"""
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+try:
+    from numba import njit # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba es opcional
+    NUMBA_AVAILABLE = False
+
+
+def cond_jit(*fields: Tuple[str, str, float]) -> Callable:
+    """
+    Decorador para condiciones numéricas compiladas con numba
+    
+    La función decorada recibe solo floats (uno por campo) y devuelve bool;
+    el envoltorio extrae esos valores de la working memory y llama al kernel.
+    Sin numba (o con NUMBA_DISABLE_JIT=1) se ejecuta la función Python tal cual.
+    
+    Como la función solo usa aritmética y comparaciones, también se expone
+    `_vector(contexts)`: la evalúa una vez sobre columnas NumPy (una por
+    campo) de varias working memories y devuelve la máscara de aplicabilidad.
+    
+    Args:
+        fields: Tuplas (sección, clave, valor por defecto) a leer de ctx
+        
+    Example:
+        @cond_jit(('weather', 'temperature', 25.0))
+        def _is_hot(temperature):
+            return temperature > 30
+    """
+    def decorator(fn: Callable[..., bool]) -> Callable[[Dict], bool]:
+        kernel = njit(cache=True)(fn) if NUMBA_AVAILABLE else fn
+        
+        def condition(ctx: Dict) -> bool:
+            values = [
+                float(ctx.get(section, {}).get(key, default))
+                for section, key, default in fields
+            ]
+            return bool(kernel(*values))
+        
+        def vector_condition(contexts: List[Dict]) -> np.ndarray:
+            columns = [
+                np.array(
+                    [float(ctx.get(section, {}).get(key, default)) for ctx in contexts],
+                    dtype=np.float64
+                )
+                for section, key, default in fields
+            ]
+            mask = np.asarray(fn(*columns), dtype=bool)
+            return np.broadcast_to(mask, (len(contexts),))
+        
+        condition.__name__ = fn.__name__
+        condition.__doc__ = fn.__doc__
+        condition._jitted = True
+        condition._jit_kernel = kernel
+        condition._jit_reads = frozenset(section for section, _, _ in fields)
+        condition._jit_fields = fields
+        condition._vector = vector_condition
+        return condition
+    
+    return decorator
@@ -3,7 +3,12 @@
 Motor de inferencia con encadenamiento hacia adelante (Forward Chaining)
 Procesa reglas desde los hechos hacia las conclusiones
 """
-from typing import Dict, List, Set, Optional
+from typing import Callable, Dict, List, Set, Optional, FrozenSet, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import types
+from collections import defaultdict
 from copy import deepcopy
 
 from .rules_base import Rule, RulesBase, RulePriority
@@ -11,6 +16,141 @@ from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Marca de "depende de toda la memoria" (iteración sobre claves, etc.)
+ALL_FIELDS = '*'
+
+# Marca de "clave ausente" en el registro de deshacer
+_MISSING = object()
+
+
+class TrackingMemory(dict):
+    """
+    Working memory que registra accesos y copia bajo demanda (copy-on-write)
+    
+    - Mientras `accessed` no es None, cada lectura o escritura de una clave de
+      primer nivel se anota ahí. El motor lo usa para saber qué campos lee
+      cada condición y qué campos pudo modificar cada acción.
+    - Se construye con una copia superficial de la memoria del llamador. Con
+      `copy_on_access` activo (durante las acciones), el primer acceso a una
+      clave copia en profundidad solo ese valor, así las acciones nunca
+      modifican los objetos del llamador y el resto no se copia.
+    - Mientras `undo` no es None, el primer acceso a cada clave guarda su valor
+      previo (y vuelve a copiarlo aunque ya sea propio), de modo que
+      `rollback()` deshace una acción fallida restaurando solo esas claves.
+    """
+    
+    __slots__ = ('accessed', 'copy_on_access', 'owned', 'undo')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accessed: Optional[Set[str]] = None
+        self.copy_on_access = False
+        self.owned: Set[str] = set()
+        self.undo: Optional[Dict[str, Tuple[object, bool]]] = None
+    
+    def _record(self, key) -> bool:
+        """Guardar el valor previo de `key` para deshacer (True la primera vez)"""
+        if self.undo is None or key in self.undo:
+            return False
+        self.undo[key] = (super().get(key, _MISSING), key in self.owned)
+        return True
+    
+    def rollback(self):
+        """Restaurar los valores guardados en `undo`"""
+        for key, (value, was_owned) in self.undo.items():
+            if value is _MISSING:
+                super().pop(key, None)
+            else:
+                super().__setitem__(key, value)
+            if not was_owned:
+                self.owned.discard(key)
+        self.undo = {}
+    
+    def _touch(self, key):
+        """Registrar acceso a `key` y, si corresponde, copiar su valor"""
+        if self.accessed is not None:
+            self.accessed.add(key)
+        first_access = self._record(key)
+        if self.copy_on_access and (first_access or key not in self.owned):
+            self.owned.add(key)
+            if super().__contains__(key):
+                super().__setitem__(key, deepcopy(super().__getitem__(key)))
+    
+    def _touch_all(self):
+        """Acceso a toda la memoria (iteración, update)"""
+        if self.accessed is not None:
+            self.accessed.add(ALL_FIELDS)
+        if self.copy_on_access:
+            for key in list(super().keys()):
+                self._touch(key)
+    
+    def __getitem__(self, key):
+        self._touch(key)
+        return super().__getitem__(key)
+    
+    def get(self, key, default=None):
+        self._touch(key)
+        return super().get(key, default)
+    
+    def __contains__(self, key):
+        if self.accessed is not None:
+            self.accessed.add(key)
+        return super().__contains__(key)
+    
+    def __setitem__(self, key, value):
+        if self.accessed is not None:
+            self.accessed.add(key)
+        self._record(key)
+        self.owned.add(key)
+        super().__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        if self.accessed is not None:
+            self.accessed.add(key)
+        self._record(key)
+        self.owned.add(key)
+        super().__delitem__(key)
+    
+    def setdefault(self, key, default=None):
+        self._touch(key)
+        return super().setdefault(key, default)
+    
+    def pop(self, key, *args):
+        self._touch(key)
+        return super().pop(key, *args)
+    
+    def __iter__(self):
+        self._touch_all()
+        return super().__iter__()
+    
+    def keys(self):
+        self._touch_all()
+        return super().keys()
+    
+    def values(self):
+        self._touch_all()
+        return super().values()
+    
+    def items(self):
+        self._touch_all()
+        return super().items()
+    
+    def update(self, *args, **kwargs):
+        self._touch_all()
+        super().update(*args, **kwargs)
+
+
+class _InferState:
+    """Estado de la última inferencia (reglas ejecutadas, iteraciones, traza)"""
+    
+    __slots__ = ('iterations', 'executed_mask', 'rules_fired', 'trace')
+    
+    def __init__(self, trace: Optional[List[Dict]] = None):
+        self.iterations = 0
+        self.executed_mask = 0  # bit i = self.rules[i] ejecutada
+        self.rules_fired = 0
+        self.trace = trace
+
 
 class ForwardChainingEngine:
     """
@@ -27,10 +167,18 @@ class ForwardChainingEngine:
     3. Retornar working memory final (estado enriquecido)
     """
     
+    # Categorías cuyas reglas cierran el estrato al dispararse
+    SEQUENTIAL_CATEGORIES = {'validation'}
+    
+    # Por debajo de este número de reglas explain_rules evalúa en secuencia
+    EXPLAIN_PARALLEL_MIN_RULES = 25
+    
     def __init__(
         self,
         rules: Optional[List[Rule]] = None,
-        max_iterations: int = 100
+        max_iterations: int = 100,
+        force_sequential: bool = False,
+        stop_on_error: bool = False
     ):
         """
         Inicializar motor de inferencia
@@ -38,21 +186,99 @@ class ForwardChainingEngine:
         Args:
             rules: Lista de reglas (si None, usa todas las reglas de RulesBase)
             max_iterations: Máximo de iteraciones para evitar loops infinitos
+            force_sequential: Si True, una sola regla por iteración (sin estratos)
+            stop_on_error: Si True, una validación con error (RulesBase.HALT_FLAG)
+                descarta las reglas MEDIUM/LOW pendientes
         """
-        self.rules = rules if rules else RulesBase.get_all_rules()
+        self.rules = list(rules if rules else RulesBase.get_all_rules_sorted())
         self.max_iterations = max_iterations
-        self.executed_rules: Set[str] = set()
-        self.iteration_count = 0
+        self.force_sequential = force_sequential
+        self.stop_on_error = stop_on_error
+        self._state = _InferState()
+        
+        # Nivel DEBUG activo (se refresca al iniciar cada inferencia)
+        self._debug_on = logger.isEnabledFor(logging.DEBUG)
+        
+        # Memoria alfa: rule.id -> (resultado de la condición, campos leídos)
+        # e índice inverso campo -> reglas cuyo resultado depende de él
+        self._alpha_cache: Dict[str, Tuple[bool, FrozenSet[str]]] = {}
+        self._alpha_index: Dict[str, Set[str]] = defaultdict(set)
         
         # Ordenar reglas por prioridad
-        self.rules.sort(key=lambda r: r.priority.value)
+        self.rules.sort(key=lambda r: r.priority)
+        
+        # Reglas que se descartan al activarse HALT_FLAG (bit i = self.rules[i])
+        self._low_priority_mask = sum(
+            1 << idx for idx, rule in enumerate(self.rules)
+            if rule.priority >= RulePriority.MEDIUM
+        )
+        
+        # Reglas agrupadas por hechos requeridos: {hechos: máscara de reglas}
+        required_groups: Dict[FrozenSet[str], int] = defaultdict(int)
+        for idx, rule in enumerate(self.rules):
+            if rule.required_facts:
+                required_groups[rule.required_facts] |= 1 << idx
+        self._required_groups = tuple(required_groups.items())
+        
+        # Condiciones compiladas (cond_jit): declaran de antemano sus campos
+        self._jit_reads: Dict[str, FrozenSet[str]] = {
+            rule.id: rule.condition._jit_reads
+            for rule in self.rules
+            if getattr(rule.condition, '_jitted', False)
+        }
+        
+        # Reglas con condiciones equivalentes: comparten el resultado en la
+        # memoria alfa (una evaluación por memoria para todo el grupo)
+        equivalent_groups: Dict[Tuple, List[str]] = defaultdict(list)
+        for rule in self.rules:
+            equivalent_groups[RulesBase.condition_fingerprint(rule.condition)[1]].append(rule.id)
+        self._equivalent_rules: Dict[str, Tuple[str, ...]] = {
+            rule_id: tuple(other for other in group if other != rule_id)
+            for group in equivalent_groups.values() if len(group) > 1
+            for rule_id in group
+        }
+        
+        # Índice por categoría (conserva el orden por prioridad)
+        rules_by_category: Dict[str, List[Rule]] = defaultdict(list)
+        for rule in self.rules:
+            rules_by_category[rule.category].append(rule)
+        self._rules_by_category: Dict[str, Tuple[Rule, ...]] = {
+            category: tuple(category_rules)
+            for category, category_rules in rules_by_category.items()
+        }
+        
+        # Motores por categoría (se crean en el primer uso y se reutilizan)
+        self._engines_by_category: Dict[str, 'ForwardChainingEngine'] = {}
+        
+        # Acciones indexadas por posición (bit i = self.rules[i]): el bucle
+        # despacha con un índice de tupla en lugar de leer rule.action
+        self._action_table: Tuple = tuple(rule.action for rule in self.rules)
+        
+        # Detectar al registrar las condiciones que fallan con memoria vacía
+        self._probe_conditions()
+        
+        # MATCH especializado para este conjunto fijo de reglas
+        self._match_first_rule = self._build_match_first_rule()
+        
+        # Tabla de predicados: todas las condiciones en una sola llamada
+        self._eval_conditions, self._compiled_bits = RulesBase.compile_conditions(self.rules)
+        
+        # Si todas las reglas compiladas son de la base se usa la tabla
+        # memorizada de RulesBase (indexada por código de operación)
+        self._use_condition_memo = all(
+            RulesBase.is_base_rule(rule)
+            for idx, rule in enumerate(self.rules)
+            if self._compiled_bits >> idx & 1
+        )
         
         logger.info(f"Motor de inferencia inicializado con {len(self.rules)} reglas")
     
     def infer(
         self,
         working_memory: Dict,
-        enable_trace: bool = False
+        enable_trace: bool = False,
+        with_metadata: bool = True,
+        alpha_seed: Optional[Dict[str, Tuple[bool, FrozenSet[str]]]] = None
     ) -> Dict:
         """
         Ejecutar inferencia con forward chaining
@@ -60,92 +286,439 @@ class ForwardChainingEngine:
         Args:
             working_memory: Memoria de trabajo (contexto inicial)
             enable_trace: Si True, guarda traza de ejecución
+            with_metadata: Si False, no se escribe 'inference_metadata'
+                (ni la traza) en la memoria resultante
+            alpha_seed: Resultados de condición ya calculados para esta
+                memoria ({rule.id: (resultado, campos leídos)}), ver infer_batch
             
         Returns:
             Dict: Memoria de trabajo enriquecida
         """
-        # Hacer copia profunda para no modificar el original
-        wm = deepcopy(working_memory)
+        # Copia superficial + copy-on-write: las acciones copian solo los
+        # valores que tocan, el original del llamador no se modifica
+        wm = TrackingMemory(working_memory)
         
-        # Inicializar metadatos
-        wm['inference_metadata'] = {
-            'iterations': 0,
-            'rules_fired': 0,
-            'execution_trace': [] if enable_trace else None
-        }
+        # Inicializar metadatos (o descartar los de una inferencia anterior)
+        if with_metadata:
+            wm['inference_metadata'] = {
+                'iterations': 0,
+                'rules_fired': 0,
+                # La lista (si hay traza) es la de _InferState, se asigna al final
+                'execution_trace': None
+            }
+        else:
+            wm.pop('inference_metadata', None)
         
-        self.executed_rules = set()
-        self.iteration_count = 0
+        self._invalidate_alpha(None)
+        # (sin tabla compilada si alpha_seed ya trae un resultado por regla)
+        if self._eval_conditions is not None and len(alpha_seed or ()) < len(self.rules):
+            self._seed_alpha(self._compiled_seed(wm))
+        if alpha_seed:
+            self._seed_alpha(alpha_seed)
+        self._debug_on = logger.isEnabledFor(logging.DEBUG)
+        
+        # Estado del bucle en variables locales; se vuelca en `state` al final
+        # (la traza y la iteración actual las usa _execute_rule)
+        state = self._state = _InferState(trace=[] if enable_trace and with_metadata else None)
+        max_iterations = self.max_iterations
+        iteration_count = 0
+        # Reglas que no pueden cumplirse (faltan hechos requeridos): entran
+        # al MATCH como ya ejecutadas y no se evalúan
+        skipped_mask = self._missing_facts_mask(working_memory)
+        executed_mask = skipped_mask
+        rules_fired = 0
+        fired_actions = []
+        
+        # Métodos y atributos del bucle en locales: el costo del fixpoint es
+        # sobre todo de intérprete (búsquedas de atributos por iteración)
+        rules = self.rules
+        action_table = self._action_table
+        match_first_rule = self._match_first_rule
+        execute_rule = self._execute_rule
+        invalidate_alpha = self._invalidate_alpha
+        stratum_open = self._stratum_open
+        debug_on = self._debug_on
+        stop_on_error = self.stop_on_error
+        low_priority_mask = self._low_priority_mask
         
         logger.info("Iniciando inferencia Forward Chaining")
         
         # ALGORITMO FORWARD CHAINING
-        while self.iteration_count < self.max_iterations:
-            self.iteration_count += 1
+        while iteration_count < max_iterations:
+            iteration_count += 1
+            state.iterations = iteration_count
             
-            # MATCH: Encontrar reglas aplicables
-            applicable_rules = self._match_rules(wm)
+            # MATCH + CONFLICT RESOLUTION: las reglas están ordenadas por
+            # prioridad, así que la primera aplicable es la seleccionada
+            selected_idx = match_first_rule(wm, executed_mask)
             
-            if not applicable_rules:
+            if selected_idx is None:
                 # No hay más reglas que disparar -> FIN
-                logger.info(f"Inferencia completada en {self.iteration_count} iteraciones")
+                logger.info(f"Inferencia completada en {iteration_count} iteraciones")
                 break
             
-            # CONFLICT RESOLUTION: Seleccionar regla a ejecutar
-            selected_rule = self._resolve_conflict(applicable_rules)
+            # STRATUM: tras disparar una regla se sigue recorriendo desde su
+            # posición mientras ninguna regla anterior haya podido cambiar
+            while selected_idx is not None:
+                selected_rule = rules[selected_idx]
+                
+                if debug_on:
+                    logger.debug(
+                        "Regla seleccionada: %s (%s) - Prioridad: %s",
+                        selected_rule.id, selected_rule.name, selected_rule.priority.name
+                    )
+                
+                # EXECUTE: Ejecutar acción de la regla, registrando qué campos toca
+                wm.accessed = set()
+                wm.copy_on_access = True
+                wm.undo = {}
+                action = action_table[selected_idx]
+                result_wm = execute_rule(selected_rule, wm, state, action)
+                fired_actions.append(action)
+                changed_fields = wm.accessed
+                wm.accessed = None
+                wm.copy_on_access = False
+                wm.undo = None
+                
+                if result_wm is not wm:
+                    # La acción devolvió otra memoria: no se puede reutilizar nada
+                    # y puede compartir objetos con el llamador
+                    wm = TrackingMemory(deepcopy(dict(result_wm)))
+                    wm.owned.update(wm.keys())
+                    changed_fields = None
+                
+                # Marcar regla como ejecutada
+                executed_mask |= 1 << selected_idx
+                rules_fired += 1
+                
+                # Corte temprano: tras un error de validación las reglas
+                # MEDIUM/LOW pendientes se dan por descartadas
+                if stop_on_error and dict.get(wm, RulesBase.HALT_FLAG):
+                    executed_mask |= low_priority_mask
+                
+                # Descartar resultados memoizados que dependen de campos tocados
+                invalidate_alpha(changed_fields)
+                
+                if not stratum_open(selected_idx, executed_mask):
+                    break
+                
+                selected_idx = match_first_rule(wm, executed_mask, selected_idx + 1)
             
-            if selected_rule is None:
-                logger.warning("No se pudo resolver conflicto de reglas")
+            else:
+                # El estrato llegó al final sin otra regla aplicable y ninguna
+                # regla pendiente anterior lee campos modificados: un nuevo
+                # MATCH no encontraría nada -> FIN sin recorrer de nuevo
+                logger.info(f"Inferencia completada en {iteration_count} iteraciones")
                 break
-            
-            # EXECUTE: Ejecutar acción de la regla
-            wm = self._execute_rule(selected_rule, wm, enable_trace)
-            
-            # Marcar regla como ejecutada
-            self.executed_rules.add(selected_rule.id)
-            wm['inference_metadata']['rules_fired'] += 1
+        
+        state.executed_mask = executed_mask & ~skipped_mask
+        state.rules_fired = rules_fired
         
         # Actualizar metadatos finales
-        wm['inference_metadata']['iterations'] = self.iteration_count
-        wm['inference_metadata']['max_iterations_reached'] = (self.iteration_count >= self.max_iterations)
+        if with_metadata:
+            wm['inference_metadata']['rules_fired'] = rules_fired
+            wm['inference_metadata']['execution_trace'] = state.trace
+            wm['inference_metadata']['iterations'] = iteration_count
+            wm['inference_metadata']['max_iterations_reached'] = (iteration_count >= max_iterations)
         
-        if self.iteration_count >= self.max_iterations:
-            logger.warning(f"Límite de iteraciones alcanzado ({self.max_iterations})")
+        if iteration_count >= max_iterations:
+            logger.warning(f"Límite de iteraciones alcanzado ({max_iterations})")
         
         logger.info(
-            f"Inferencia finalizada: {wm['inference_metadata']['rules_fired']} reglas ejecutadas "
-            f"en {self.iteration_count} iteraciones"
+            f"Inferencia finalizada: {rules_fired} reglas ejecutadas "
+            f"en {iteration_count} iteraciones"
         )
         
-        return wm
+        dict.pop(wm, RulesBase.HALT_FLAG, None)
+        
+        # Textos de las reglas aplicadas, en el orden en que se ejecutaron
+        if dict.get(wm, RulesBase.APPLIED_IDS):
+            applied = RulesBase.applied_rules(wm, fired_actions)
+            wm['applied_rules'] = list(wm.get('applied_rules', [])) + applied
+        dict.pop(wm, RulesBase.APPLIED_IDS, None)
+        
+        return dict(wm)
     
-    def _match_rules(self, working_memory: Dict) -> List[Rule]:
+    @property
+    def iteration_count(self) -> int:
+        """Iteraciones de la última inferencia"""
+        return self._state.iterations
+    
+    @property
+    def executed_mask(self) -> int:
+        """Reglas ejecutadas en la última inferencia (bit i = self.rules[i])"""
+        return self._state.executed_mask
+    
+    @property
+    def executed_rules(self) -> Set[str]:
+        """IDs de las reglas ejecutadas (derivado de executed_mask)"""
+        return {
+            rule.id for idx, rule in enumerate(self.rules)
+            if self.executed_mask >> idx & 1
+        }
+    
+    def _missing_facts_mask(self, working_memory: Dict) -> int:
+        """
+        Reglas cuyos hechos requeridos no están en la memoria inicial
+        
+        Las acciones no crean esos hechos (son datos de entrada), así que
+        estas reglas no pueden dispararse en toda la inferencia.
+        
+        Returns:
+            int: Máscara de reglas descartadas (bit i = self.rules[i])
+        """
+        mask = 0
+        for required_facts, group_mask in self._required_groups:
+            if not required_facts <= working_memory.keys():
+                mask |= group_mask
+        return mask
+    
+    def _invalidate_alpha(self, changed_fields: Optional[Set[str]]):
+        """
+        Invalidar la memoria alfa para los campos modificados
+        
+        Args:
+            changed_fields: Campos tocados por la última acción
+                (None = invalidar todo)
+        """
+        if changed_fields is None or ALL_FIELDS in changed_fields:
+            self._alpha_cache = {}
+            self._alpha_index = defaultdict(set)
+            return
+        
+        for field in changed_fields:
+            for rule_id in self._alpha_index.pop(field, ()):
+                self._alpha_cache.pop(rule_id, None)
+    
+    def _probe_conditions(self):
+        """
+        Probar cada condición con una working memory vacía
+        
+        Las condiciones deben tolerar campos ausentes; las que fallan se
+        reportan una vez al crear el motor en lugar de en cada iteración.
+        """
+        for rule in self.rules:
+            try:
+                rule.condition({})
+            except Exception as e:
+                logger.warning("Condición de regla %s falla con memoria vacía: %s", rule.id, e)
+    
+    def _seed_alpha(self, seed: Dict[str, Tuple[bool, FrozenSet[str]]]):
         """
-        MATCH: Encontrar reglas cuyas condiciones se cumplen
+        Cargar en la memoria alfa resultados de condición ya calculados
+        
+        Args:
+            seed: {rule.id: (resultado, campos leídos)}
+        """
+        for rule_id, (is_applicable, reads) in seed.items():
+            self._alpha_cache[rule_id] = (is_applicable, reads)
+            for field in reads:
+                self._alpha_index[field].add(rule_id)
+    
+    def _compiled_seed(self, working_memory: Dict) -> Dict[str, Tuple[bool, FrozenSet[str]]]:
+        """
+        Evaluar la tabla de predicados compilada sobre la memoria inicial
+        
+        Returns:
+            Dict: {rule.id: (resultado, campos leídos)} de las reglas
+                compiladas cuya condición no falló
+        """
+        base_result = (
+            RulesBase.match_base_conditions(working_memory)
+            if self._use_condition_memo else None
+        )
+        
+        if base_result is not None:
+            mask, unknown = self._engine_bits(*base_result)
+        else:
+            mask, unknown = self._eval_conditions(working_memory)
+        
+        return self._mask_seed(mask, unknown)
+    
+    def _engine_bits(self, base_mask: int, base_unknown: int) -> Tuple[int, int]:
+        """
+        Traducir bits por código de operación (RulesBase) a bits por posición en el motor
+        """
+        mask = unknown = 0
+        for idx, rule in enumerate(self.rules):
+            if self._compiled_bits >> idx & 1:
+                mask |= (base_mask >> rule.cond_op & 1) << idx
+                unknown |= (base_unknown >> rule.cond_op & 1) << idx
+        return mask, unknown
+    
+    def _mask_seed(self, mask: int, unknown: int) -> Dict[str, Tuple[bool, FrozenSet[str]]]:
+        """
+        Semilla de memoria alfa a partir de bits por posición en el motor
+        
+        Returns:
+            Dict: {rule.id: (resultado, campos leídos)} de las reglas
+                compiladas cuyo bit no es desconocido
+        """
+        known = self._compiled_bits & ~unknown
+        
+        seed = {}
+        for idx, rule in enumerate(self.rules):
+            if known >> idx & 1:
+                reads = rule.reads if rule.reads is not None else self._jit_reads[rule.id]
+                seed[rule.id] = (bool(mask >> idx & 1), reads)
+        
+        return seed
+    
+    def _evaluate_condition(self, rule: Rule, working_memory: Dict) -> bool:
+        """
+        Evaluar la condición de una regla usando la memoria alfa
+        
+        Estilo RETE: el resultado se guarda junto con los campos de la working
+        memory que leyó la condición, y se reutiliza hasta que una acción
+        toque alguno de esos campos. Un fallo también se memoriza (como
+        False): la condición no se vuelve a ejecutar ni a registrar el error
+        en cada iteración mientras no cambien los campos que alcanzó a leer.
+        
+        Returns:
+            bool: Si la regla es aplicable (False si la condición falla)
+        """
+        cached = self._alpha_cache.get(rule.id)
+        if cached is not None:
+            return cached[0]
+        
+        tracking = isinstance(working_memory, TrackingMemory)
+        
+        # Evaluar condición registrando los campos que lee
+        if tracking:
+            working_memory.accessed = set()
+        
+        try:
+            is_applicable = bool(rule.condition(working_memory))
+        except Exception as e:
+            logger.error("Error evaluando condición de regla %s: %s", rule.id, e)
+            is_applicable = False
+        
+        if tracking:
+            reads = rule.reads
+            if reads is None:
+                reads = self._jit_reads.get(rule.id) or frozenset(working_memory.accessed)
+            working_memory.accessed = None
+            
+            if ALL_FIELDS not in reads:
+                hit = (is_applicable, reads)
+                for rule_id in (rule.id, *self._equivalent_rules.get(rule.id, ())):
+                    self._alpha_cache[rule_id] = hit
+                    for field in reads:
+                        self._alpha_index[field].add(rule_id)
+        
+        if is_applicable and self._debug_on:
+            logger.debug("Regla %s es aplicable", rule.id)
+        
+        return is_applicable
+    
+    def _match_first_rule(
+        self,
+        working_memory: Dict,
+        executed_mask: int,
+        start: int = 0
+    ) -> Optional[int]:
+        """
+        MATCH con corte temprano: primera regla aplicable no ejecutada
         
         Args:
             working_memory: Memoria de trabajo actual
+            executed_mask: Reglas ya ejecutadas (bit i = self.rules[i])
+            start: Posición desde la que buscar (continuación de un estrato)
             
         Returns:
-            List[Rule]: Reglas aplicables
+            Optional[int]: Índice en self.rules de la regla de mayor
+                prioridad aplicable, o None
         """
-        applicable_rules = []
-        
-        for rule in self.rules:
-            # Saltar si ya fue ejecutada
-            if rule.id in self.executed_rules:
+        for idx in range(start, len(self.rules)):
+            rule = self.rules[idx]
+            if executed_mask >> idx & 1:
                 continue
             
-            try:
-                # Evaluar condición
-                if rule.condition(working_memory):
-                    applicable_rules.append(rule)
-                    logger.debug(f"Regla {rule.id} es aplicable")
+            if self._evaluate_condition(rule, working_memory):
+                return idx
+        
+        return None
+    
+    def _build_match_first_rule(self):
+        """
+        Generar un _match_first_rule especializado para self.rules
+        
+        Las reglas no cambian tras __init__, así que se genera código con el
+        índice, la máscara y el ID de cada regla como constantes y la consulta
+        a la memoria alfa en línea; solo se llama a _evaluate_condition cuando
+        no hay resultado memoizado. Equivalente a la versión genérica.
+        
+        Returns:
+            Método ligado a esta instancia
+        """
+        namespace = {}
+        lines = [
+            "def _match_first_rule(self, working_memory, executed_mask, start=0):",
+            "    alpha_cache = self._alpha_cache",
+            "    evaluate = self._evaluate_condition",
+        ]
+        
+        for idx, rule in enumerate(self.rules):
+            namespace[f"_r{idx}"] = rule
+            lines += [
+                f"    if start <= {idx} and not executed_mask & {1 << idx}:",
+                f"        hit = alpha_cache.get({rule.id!r})",
+                f"        if (hit[0] if hit is not None else evaluate(_r{idx}, working_memory)):",
+                f"            return {idx}",
+            ]
+        
+        lines.append("    return None")
+        
+        exec("\n".join(lines), namespace)
+        return types.MethodType(namespace["_match_first_rule"], self)
+    
+    def _stratum_open(self, fired_idx: int, executed_mask: int) -> bool:
+        """
+        Indicar si el estrato actual puede seguir tras disparar una regla
+        
+        Sigue abierto si toda regla pendiente anterior a `fired_idx` conserva
+        su resultado memoizado (falso): la acción no tocó ningún campo que
+        lean, así que la siguiente regla a disparar está después de
+        `fired_idx`, igual que en la ejecución de una regla por iteración.
+        
+        Args:
+            fired_idx: Posición de la regla recién disparada
+            executed_mask: Reglas ya ejecutadas (bit i = self.rules[i])
             
-            except Exception as e:
-                logger.error(f"Error evaluando condición de regla {rule.id}: {str(e)}")
+        Returns:
+            bool: True si se puede continuar sin volver a empezar el MATCH
+        """
+        if self.force_sequential or self.rules[fired_idx].category in self.SEQUENTIAL_CATEGORIES:
+            return False
+        
+        alpha_cache = self._alpha_cache
+        
+        for idx in range(fired_idx):
+            if not executed_mask >> idx & 1 and self.rules[idx].id not in alpha_cache:
+                return False
+        
+        return True
+    
+    def _match_rules(self, working_memory: Dict) -> List[Rule]:
+        """
+        MATCH: Encontrar todas las reglas cuyas condiciones se cumplen
+        
+        Args:
+            working_memory: Memoria de trabajo actual
+            
+        Returns:
+            List[Rule]: Reglas aplicables
+        """
+        # Fuera de infer la memoria puede ser otra: no reutilizar resultados
+        self._invalidate_alpha(None)
         
-        return applicable_rules
+        executed_mask = self.executed_mask
+        
+        return [
+            rule for idx, rule in enumerate(self.rules)
+            if not executed_mask >> idx & 1
+            and self._evaluate_condition(rule, working_memory)
+        ]
     
     def _resolve_conflict(self, applicable_rules: List[Rule]) -> Optional[Rule]:
         """
@@ -167,10 +740,11 @@ class ForwardChainingEngine:
         # Ya están ordenadas por prioridad, tomar la primera
         selected = applicable_rules[0]
         
-        logger.debug(
-            f"Regla seleccionada: {selected.id} ({selected.name}) "
-            f"- Prioridad: {selected.priority.name}"
-        )
+        if self._debug_on:
+            logger.debug(
+                "Regla seleccionada: %s (%s) - Prioridad: %s",
+                selected.id, selected.name, selected.priority.name
+            )
         
         return selected
     
@@ -178,7 +752,8 @@ class ForwardChainingEngine:
         self,
         rule: Rule,
         working_memory: Dict,
-        enable_trace: bool
+        state: _InferState,
+        action: Optional[Callable[[Dict], Optional[Dict]]] = None
     ) -> Dict:
         """
         EXECUTE: Ejecutar acción de la regla
@@ -186,41 +761,162 @@ class ForwardChainingEngine:
         Args:
             rule: Regla a ejecutar
             working_memory: Memoria de trabajo
-            enable_trace: Si guardar traza
+            state: Estado de la inferencia en curso (iteración y traza)
+            action: Acción ya resuelta desde la tabla de despacho
+                (None = usar rule.action)
             
         Returns:
             Dict: Memoria de trabajo actualizada
         """
-        logger.info(f"Ejecutando regla: {rule.id} - {rule.name}")
+        logger.info("Ejecutando regla: %s - %s", rule.id, rule.name)
         
         try:
-            # Ejecutar acción
-            wm = rule.action(working_memory)
+            # Ejecutar acción (las de la base modifican la memoria en su
+            # lugar y devuelven None; una acción externa puede devolver otra)
+            wm = (action or rule.action)(working_memory)
+            if wm is None:
+                wm = working_memory
             
             # Guardar traza si está habilitada
-            if enable_trace and wm.get('inference_metadata', {}).get('execution_trace') is not None:
-                wm['inference_metadata']['execution_trace'].append({
-                    'iteration': self.iteration_count,
+            if state.trace is not None:
+                state.trace.append({
+                    'iteration': state.iterations,
                     'rule_id': rule.id,
                     'rule_name': rule.name,
                     'rule_category': rule.category,
                     'priority': rule.priority.name
                 })
             
-            logger.debug(f"Regla {rule.id} ejecutada exitosamente")
+            if self._debug_on:
+                logger.debug("Regla %s ejecutada exitosamente", rule.id)
             
             return wm
         
         except Exception as e:
-            logger.error(f"Error ejecutando regla {rule.id}: {str(e)}")
-            # Retornar working memory sin cambios en caso de error
+            logger.error("Error ejecutando regla %s: %s", rule.id, e)
+            # Deshacer lo que la acción alcanzó a modificar y retornar la
+            # working memory sin cambios
+            if isinstance(working_memory, TrackingMemory) and working_memory.undo is not None:
+                working_memory.rollback()
             return working_memory
     
+    def infer_incremental(
+        self,
+        working_memory: Dict,
+        prior_conditions: Dict[str, Tuple[bool, FrozenSet[str]]],
+        changed_facts: Set[str],
+        enable_trace: bool = False,
+        with_metadata: bool = True
+    ) -> Tuple[Dict, Dict[str, Tuple[bool, FrozenSet[str]]]]:
+        """
+        Inferencia reutilizando resultados de condición de una ejecución previa
+        
+        Los resultados de `prior_conditions` (ver el segundo valor devuelto)
+        cuyos campos leídos no están en `changed_facts` siguen valiendo para
+        esta memoria y entran como alpha_seed; solo las condiciones que leen
+        hechos cambiados se vuelven a evaluar. El disparo es el de `infer`.
+        
+        Args:
+            working_memory: Memoria de trabajo (contexto inicial)
+            prior_conditions: {rule.id: (resultado, campos leídos)} previos
+            changed_facts: Claves de la memoria inicial que cambiaron
+            enable_trace: Si True, guarda traza de ejecución
+            with_metadata: Si escribir 'inference_metadata' en el resultado
+            
+        Returns:
+            Tuple[Dict, Dict]: Memoria enriquecida y resultados de condición
+                sobre esta memoria inicial, para la siguiente llamada
+        """
+        seed = {
+            rule_id: hit for rule_id, hit in prior_conditions.items()
+            if ALL_FIELDS not in hit[1] and hit[1].isdisjoint(changed_facts)
+        }
+        
+        logger.info(f"Inferencia incremental: {len(seed)} condiciones reutilizadas")
+        
+        result = self.infer(working_memory, enable_trace, with_metadata, alpha_seed=seed)
+        
+        # Los resultados memoizados valen para la memoria inicial solo si no
+        # leen campos que tocaron las acciones (copy-on-write: otro objeto)
+        touched = {
+            key for key in result.keys() | working_memory.keys()
+            if result.get(key, ALL_FIELDS) is not working_memory.get(key, ALL_FIELDS)
+        }
+        conditions = {
+            rule_id: hit for rule_id, hit in self._alpha_cache.items()
+            if ALL_FIELDS not in hit[1] and hit[1].isdisjoint(touched)
+        }
+        
+        return result, conditions
+    
+    def infer_batch(
+        self,
+        working_memories: List[Dict],
+        enable_trace: bool = False,
+        with_metadata: bool = True
+    ) -> List[Dict]:
+        """
+        Ejecutar inferencia sobre varias memorias de trabajo
+        
+        Si las reglas compiladas son todas de la base, sus condiciones se
+        evalúan para todo el lote con RulesBase.vectorized_eval; las
+        vectorizables (cond_jit) también se evalúan una sola vez con NumPy.
+        Los resultados se cargan en la memoria alfa de cada fila y el resto
+        del ciclo (acciones, bits desconocidos y reglas no numéricas) se
+        ejecuta por fila como en `infer`.
+        
+        Args:
+            working_memories: Memorias de trabajo (contextos iniciales)
+            enable_trace: Si True, guarda traza de ejecución
+            with_metadata: Si escribir 'inference_metadata' en cada resultado
+            
+        Returns:
+            List[Dict]: Memorias de trabajo enriquecidas, en el mismo orden
+        """
+        if not working_memories:
+            return []
+        
+        seeds: List[Dict[str, Tuple[bool, FrozenSet[str]]]]
+        if self._use_condition_memo and self._compiled_bits:
+            # Máscaras por código de operación para todo el lote; las filas
+            # con bits desconocidos quedan sin esas reglas y `infer` las evalúa
+            batch_mask, batch_unknown = RulesBase.vectorized_eval(working_memories)
+            seeds = [
+                self._mask_seed(*self._engine_bits(base_mask, base_unknown))
+                for base_mask, base_unknown in zip(batch_mask.tolist(), batch_unknown.tolist())
+            ]
+        else:
+            seeds = [{} for _ in working_memories]
+        
+        for rule in self.rules:
+            vector_condition = getattr(rule.condition, '_vector', None)
+            if vector_condition is None:
+                continue
+            
+            reads = rule.reads if rule.reads is not None else self._jit_reads[rule.id]
+            try:
+                mask = vector_condition(working_memories)
+            except Exception as e:
+                # Algún valor no numérico: la regla se evalúa fila por fila
+                logger.warning("Condición de %s no vectorizable en el lote: %s", rule.id, e)
+                continue
+            
+            for seed, is_applicable in zip(seeds, mask.tolist()):
+                seed[rule.id] = (is_applicable, reads)
+        
+        logger.info(f"Inferencia por lote: {len(working_memories)} memorias de trabajo")
+        
+        return [
+            self.infer(working_memory, enable_trace, with_metadata, alpha_seed=seed)
+            for working_memory, seed in zip(working_memories, seeds)
+        ]
+    
     def infer_by_category(
         self,
         working_memory: Dict,
         category: str,
-        enable_trace: bool = False
+        enable_trace: bool = False,
+        with_metadata: bool = True
     ) -> Dict:
         """
         Ejecutar inferencia solo con reglas de una categoría específica
@@ -229,22 +925,84 @@ class ForwardChainingEngine:
             working_memory: Memoria de trabajo
             category: Categoría de reglas (profile, temporal, weather, validation)
             enable_trace: Si guardar traza
+            with_metadata: Si escribir 'inference_metadata' en el resultado
             
         Returns:
             Dict: Memoria de trabajo enriquecida
         """
-        # Filtrar reglas por categoría
-        category_rules = [r for r in self.rules if r.category == category]
+        category_engine = self._get_category_engine(category)
+        
+        logger.info(f"Inferencia por categoría '{category}': {len(self._rules_by_category.get(category, ()))} reglas")
+        
+        return category_engine.infer(working_memory, enable_trace, with_metadata)
+    
+    def infer_incremental_by_category(
+        self,
+        working_memory: Dict,
+        category: str,
+        prior_conditions: Dict[str, Tuple[bool, FrozenSet[str]]],
+        changed_facts: Set[str],
+        enable_trace: bool = False,
+        with_metadata: bool = True
+    ) -> Tuple[Dict, Dict[str, Tuple[bool, FrozenSet[str]]]]:
+        """
+        Inferencia incremental (ver infer_incremental) con reglas de una categoría
         
-        logger.info(f"Inferencia por categoría '{category}': {len(category_rules)} reglas")
+        Returns:
+            Tuple[Dict, Dict]: Memoria enriquecida y resultados de condición
+        """
+        category_engine = self._get_category_engine(category)
         
-        # Crear motor temporal con solo esas reglas
-        temp_engine = ForwardChainingEngine(
-            rules=category_rules,
-            max_iterations=self.max_iterations
+        return category_engine.infer_incremental(
+            working_memory, prior_conditions, changed_facts, enable_trace, with_metadata
         )
+    
+    def infer_batch_by_category(
+        self,
+        working_memories: List[Dict],
+        category: str,
+        enable_trace: bool = False,
+        with_metadata: bool = True
+    ) -> List[Dict]:
+        """
+        Ejecutar inferencia por lote solo con reglas de una categoría
         
-        return temp_engine.infer(working_memory, enable_trace)
+        Args:
+            working_memories: Memorias de trabajo
+            category: Categoría de reglas (profile, temporal, weather, validation)
+            enable_trace: Si guardar traza
+            with_metadata: Si escribir 'inference_metadata' en cada resultado
+            
+        Returns:
+            List[Dict]: Memorias de trabajo enriquecidas, en el mismo orden
+        """
+        category_engine = self._get_category_engine(category)
+        
+        logger.info(
+            f"Inferencia por categoría '{category}' (lote de {len(working_memories)}): "
+            f"{len(self._rules_by_category.get(category, ()))} reglas"
+        )
+        
+        return category_engine.infer_batch(working_memories, enable_trace, with_metadata)
+    
+    def _get_category_engine(self, category: str) -> 'ForwardChainingEngine':
+        """Obtener (o crear en el primer uso) el motor de una categoría"""
+        category_engine = self._engines_by_category.get(category)
+        
+        if category_engine is None:
+            # Reglas de la categoría desde el índice (ya ordenadas por prioridad)
+            category_rules = list(self._rules_by_category.get(category, ()))
+            
+            # Motor con solo esas reglas; infer reinicia su estado en cada llamada
+            category_engine = ForwardChainingEngine(
+                rules=category_rules,
+                max_iterations=self.max_iterations,
+                force_sequential=self.force_sequential,
+                stop_on_error=self.stop_on_error
+            )
+            self._engines_by_category[category] = category_engine
+        
+        return category_engine
     
     def explain_rules(self, working_memory: Dict) -> List[Dict]:
         """
@@ -256,24 +1014,25 @@ class ForwardChainingEngine:
         Returns:
             List[Dict]: Lista de reglas aplicables con explicaciones
         """
-        explanations = []
+        executed_mask = self.executed_mask
         
-        for rule in self.rules:
+        def explain(idx: int) -> Dict:
+            rule = self.rules[idx]
             try:
                 is_applicable = rule.condition(working_memory)
                 
-                explanations.append({
+                return {
                     'rule_id': rule.id,
                     'rule_name': rule.name,
                     'description': rule.description,
                     'priority': rule.priority.name,
                     'category': rule.category,
                     'is_applicable': is_applicable,
-                    'already_executed': rule.id in self.executed_rules
-                })
+                    'already_executed': bool(executed_mask >> idx & 1)
+                }
             
             except Exception as e:
-                explanations.append({
+                return {
                     'rule_id': rule.id,
                     'rule_name': rule.name,
                     'description': rule.description,
@@ -281,7 +1040,16 @@ class ForwardChainingEngine:
                     'category': rule.category,
                     'is_applicable': False,
                     'error': str(e)
-                })
+                }
+        
+        # Las condiciones solo leen la memoria: se evalúan en paralelo cuando
+        # hay suficientes reglas para compensar el costo del pool
+        if len(self.rules) < self.EXPLAIN_PARALLEL_MIN_RULES:
+            return [explain(idx) for idx in range(len(self.rules))]
+        
+        max_workers = min(len(self.rules), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            explanations = list(pool.map(explain, range(len(self.rules))))
         
         return explanations
     
@@ -299,13 +1067,19 @@ class ForwardChainingEngine:
     
     def reset(self):
         """Reiniciar motor (limpiar reglas ejecutadas)"""
-        self.executed_rules = set()
-        self.iteration_count = 0
+        self._state = _InferState()
         logger.info("Motor de inferencia reiniciado")
 
 
 class InferenceResult:
-    """Resultado de la inferencia con metadatos"""
+    """
+    Resultado de la inferencia con metadatos
+    
+    Vista de solo lectura sobre la memoria de trabajo final: las propiedades
+    devuelven los objetos de la memoria tal cual (sin copiar).
+    """
+    
+    __slots__ = ('working_memory', 'metadata')
     
     def __init__(self, working_memory: Dict):
         """
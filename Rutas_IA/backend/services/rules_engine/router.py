@@ -2,7 +2,8 @@
 Router para el motor de reglas (Forward Chaining)
 Expone endpoints para enriquecimiento de perfiles y validación
 """
-from fastapi import APIRouter, Depends, HTTPException, Body, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, Path, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional, List
 from datetime import datetime, time
@@ -12,7 +13,14 @@ from shared.database.base import get_db
 from shared. database.models import UserProfile
 from . service import RulesEngineService
 
-router = APIRouter(prefix="/rules", tags=["Rules Engine"])
+router = APIRouter(
+    prefix="/rules",
+    tags=["Rules Engine"],
+    default_response_class=ORJSONResponse
+)
+
+# Las definiciones de reglas solo cambian entre despliegues
+RULES_LISTING_MAX_AGE = 3600
 
 
 # ============================================================================
@@ -87,6 +95,20 @@ class EnrichmentContext(BaseModel):
         }
 
 
+class BulkEnrichmentRequest(BaseModel):
+    """Request para enriquecimiento de varios perfiles"""
+    user_profile_ids: List[int] = Field(
+        ...,
+        description="IDs de los perfiles de usuario",
+        min_length=1,
+        example=[1, 2, 3]
+    )
+    context: Optional[EnrichmentContext] = Field(
+        None,
+        description="Contexto compartido para todos los perfiles"
+    )
+
+
 class ItineraryValidationRequest(BaseModel):
     """Request para validación de itinerario"""
     itinerary: Dict[str, Any] = Field(
@@ -182,17 +204,7 @@ async def enrich_user_profile(
     ```
     """
     # Convertir contexto Pydantic → dict
-    context_dict = None
-    if context:
-        context_dict = {}
-        if context.current_date:
-            context_dict['current_date'] = context.current_date
-        if context.current_time:
-            context_dict['current_time'] = context.current_time
-        if context.weather:
-            context_dict['weather'] = context.weather
-        if context. location:
-            context_dict['location'] = context.location
+    context_dict = _context_to_dict(context)
     
     # Llamar al servicio (método REAL: enrich_user_profile)
     result = RulesEngineService. enrich_user_profile(
@@ -205,6 +217,48 @@ async def enrich_user_profile(
     return result
 
 
+@router.post("/enrich-profiles")
+async def enrich_user_profiles_bulk(
+    request: BulkEnrichmentRequest = Body(
+        ...,
+        description="Perfiles a enriquecer y contexto compartido"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Enriquece varios perfiles de usuario en una sola pasada
+    
+    Carga los perfiles con una consulta, aplica las reglas en lote con el
+    mismo contexto y guarda todos los computed_profile con un único commit.
+    Los IDs inexistentes se devuelven en `not_found`.
+    """
+    result = RulesEngineService.enrich_user_profiles_bulk(
+        db=db,
+        user_profile_ids=request.user_profile_ids,
+        context=_context_to_dict(request.context)
+    )
+    
+    return result
+
+
+def _context_to_dict(context: Optional[EnrichmentContext]) -> Optional[Dict]:
+    """Convertir el contexto Pydantic a dict (solo campos presentes)"""
+    if not context:
+        return None
+    
+    context_dict = {}
+    if context.current_date:
+        context_dict['current_date'] = context.current_date
+    if context.current_time:
+        context_dict['current_time'] = context.current_time
+    if context.weather:
+        context_dict['weather'] = context.weather
+    if context.location:
+        context_dict['location'] = context.location
+    
+    return context_dict
+
+
 @router.post("/validate-itinerary/{user_profile_id}")
 async def validate_itinerary(
     user_profile_id: int = Path(... , description="ID del perfil de usuario", ge=1, example=1),
@@ -360,7 +414,7 @@ async def get_recommendations(
 
 
 @router.get("/rules")
-async def list_all_rules():
+async def list_all_rules(response: Response):
     """
     Lista todas las reglas disponibles en el motor
     
@@ -390,4 +444,6 @@ async def list_all_rules():
     # Llamar al servicio
     result = RulesEngineService.list_all_rules()
     
+    response.headers["Cache-Control"] = f"public, max-age={RULES_LISTING_MAX_AGE}"
+    
     return result
\ No newline at end of file
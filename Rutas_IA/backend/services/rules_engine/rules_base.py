@@ -2,13 +2,65 @@
 """
 Base de conocimiento: Definición de reglas de negocio
 """
-from typing import Dict, List, Callable
-from dataclasses import dataclass
+from typing import Dict, List, Callable, FrozenSet, Optional, Tuple
+from dataclasses import dataclass, replace
 from datetime import datetime, time
-from enum import Enum
+from enum import IntEnum
+from time import monotonic
+import sys
+import numpy as np
 
+from ._jit import cond_jit
 
-class RulePriority(Enum):
+
+# Valores constantes de las acciones (se copian a lista al asignarlos)
+_FAMILY_AMENITIES = ('wheelchair', 'stroller_friendly', 'restrooms')
+_ACCESS_AMENITIES = ('wheelchair', 'elevator', 'accessible_bathroom')
+_ACCESS_TRANSPORT = ('car', 'taxi')
+_LOW_BUDGET_PRICE_RANGES = ('gratis', 'bajo')
+_HIGH_BUDGETS = frozenset(('alto', 'lujo'))
+_FAMILY_CATS = ('entretenimiento', 'naturaleza', 'educativo')
+_CULTURAL_CATS = ('cultural', 'historico', 'museos')
+_OUTDOOR_CATS = ('naturaleza', 'parques', 'aventura')
+_DINING_CATS = ('gastronomia', 'restaurantes')
+_INDOOR_CATS = ('museos', 'cultural', 'compras')
+_RAIN_AVOID_CATS = ('naturaleza', 'parques')
+_HEAT_AVOID_CATS = ('naturaleza', 'aventura')
+
+# Marca de campo ausente en la clave de condiciones
+_KEY_MISSING = object()
+
+# Máximo de claves memorizadas en la tabla de predicados base
+_CONDITION_MEMO_SIZE = 1024
+
+# Clave de condición equivalente -> número (ver RulesBase.condition_fingerprint)
+_CONDITION_NUMBERS: Dict[Tuple, int] = {}
+
+# Reloj de respaldo para memorias sin 'current_time'/'current_date':
+# datetime.now() se consulta como mucho cada _CLOCK_TTL segundos
+_CLOCK_TTL = 30.0
+_clock_cache = [float('-inf'), None]  # [instante monotonic, datetime]
+
+# Límites de las franjas horarias
+_T_06 = time(6, 0)
+_T_12 = time(12, 0)
+_T_18 = time(18, 0)
+_T_23 = time(23, 0)
+
+# Advertencias fijas: se agregan por referencia a 'warnings', que los
+# consumidores tratan como de solo lectura (no modificar sus elementos)
+_CROWDS_WARNING = {
+    'type': 'crowds',
+    'message': 'Es fin de semana. Las atracciones populares pueden estar concurridas.',
+    'recommendation': 'Considere visitar temprano o reservar con anticipación.'
+}
+
+# Advertencia de calor: solo varía la temperatura
+_HEAT_MESSAGE = 'Temperatura alta ({}°C)'.format
+_HEAT_RECOMMENDATION = 'Prefiera lugares con aire acondicionado.'
+
+
+class RulePriority(IntEnum):
     """Prioridad de ejecución de reglas"""
     CRITICAL = 1
     HIGH = 2
@@ -16,7 +68,7 @@ class RulePriority(Enum):
     LOW = 4
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Rule:
     """Definición de una regla de producción"""
     id: str
@@ -24,13 +76,45 @@ class Rule:
     description: str
     priority: RulePriority
     condition: Callable[[Dict], bool]  # IF (condición)
-    action: Callable[[Dict], Dict]     # THEN (acción)
+    action: Callable[[Dict], Optional[Dict]]  # THEN (acción; None = modificó ctx en su lugar)
     category: str  # Categoría: profile, temporal, weather, validation
+    reads: Optional[FrozenSet[str]] = None  # Campos que lee la condición (None = detectar al evaluar)
+    required_facts: FrozenSet[str] = frozenset()  # Claves sin las cuales la condición es falsa
+    cond_op: int = -1    # Código de operación: posición en la base (-1 = regla externa)
+    action_op: int = -1  # Bit de la acción en la máscara de aplicadas (-1 = regla externa)
 
 
 class RulesBase:
     """Base de conocimiento con todas las reglas"""
     
+    # Marca que dejan las validaciones con error para que el motor (con
+    # stop_on_error) descarte las reglas MEDIUM/LOW pendientes
+    HALT_FLAG = '_halt_low_priority'
+    
+    # Reglas aplicadas como máscara de bits (bit = código de operación); el
+    # motor la convierte en 'applied_rules' al terminar cada inferencia
+    APPLIED_IDS = '_applied_rule_ids'
+    
+    # Texto que se agrega a 'applied_rules' por cada regla aplicada
+    _APPLIED_DESCRIPTIONS = {
+        'PROFILE_001': 'PROFILE_001: Preferencias familiares agregadas',
+        'PROFILE_002': 'PROFILE_002: Filtros de presupuesto bajo aplicados',
+        'PROFILE_003': 'PROFILE_003: Experiencias premium priorizadas',
+        'PROFILE_004': 'PROFILE_004: Requisitos de accesibilidad aplicados',
+        'PROFILE_005': 'PROFILE_005: Ritmo relajado - máx 3 atracciones/día',
+        'PROFILE_006': 'PROFILE_006: Ritmo intenso - hasta 7 atracciones/día',
+        'TIME_001': 'TIME_001: Sitios culturales priorizados (mañana)',
+        'TIME_002': 'TIME_002: Actividades al aire libre priorizadas (tarde)',
+        'TIME_003': 'TIME_003: Gastronomía priorizada (noche)',
+        'TIME_004': 'TIME_004: Advertencia de aglomeraciones (fin de semana)',
+        'WEATHER_001': 'WEATHER_001: Atracciones de interior priorizadas (lluvia)',
+        'WEATHER_002': 'WEATHER_002: Actividades exteriores evitadas (calor)',
+        'ITINERARY_001': 'ITINERARY_001: Horarios validados',
+        'ITINERARY_002': 'ITINERARY_002: Tiempo de viaje validado',
+        'ITINERARY_003': 'ITINERARY_003: Presupuesto validado',
+        'ITINERARY_004': 'ITINERARY_004: Límite diario verificado',
+    }
+    
     # ================================================================
     # REGLAS DE PERFIL DE USUARIO
     # ================================================================
@@ -44,6 +128,8 @@ class RulesBase:
             description="Si tourism_type='familiar' ENTONCES agregar preferencias family-friendly",
             priority=RulePriority.HIGH,
             condition=lambda ctx: ctx.get('preferences', {}).get('tourism_type') == 'familiar',
+            reads=frozenset({'preferences'}),
+            required_facts=frozenset({'preferences'}),
             action=RulesBase._action_add_family_preferences,
             category="profile"
         )
@@ -57,6 +143,8 @@ class RulesBase:
             description="Si budget_range='bajo' ENTONCES filtrar solo gratis/bajo",
             priority=RulePriority.HIGH,
             condition=lambda ctx: ctx.get('budget_range', '').lower() == 'bajo',
+            reads=frozenset({'budget_range'}),
+            required_facts=frozenset({'budget_range'}),
             action=RulesBase._action_filter_low_budget,
             category="profile"
         )
@@ -69,7 +157,9 @@ class RulesBase:
             name="Presupuesto Alto",
             description="Si budget_range in ['alto','lujo'] ENTONCES priorizar premium",
             priority=RulePriority.MEDIUM,
-            condition=lambda ctx: ctx.get('budget_range', '').lower() in ['alto', 'lujo'],
+            condition=lambda ctx: ctx.get('budget_range', '').lower() in _HIGH_BUDGETS,
+            reads=frozenset({'budget_range'}),
+            required_facts=frozenset({'budget_range'}),
             action=RulesBase._action_prioritize_premium,
             category="profile"
         )
@@ -82,7 +172,8 @@ class RulesBase:
             name="Movilidad Reducida",
             description="Si max_walking_distance < 1000m ENTONCES requerir accesibilidad",
             priority=RulePriority.CRITICAL,
-            condition=lambda ctx: ctx.get('mobility_constraints', {}).get('max_walking_distance', 10000) < 1000,
+            condition=RulesBase._has_reduced_mobility,
+            required_facts=frozenset({'mobility_constraints'}),
             action=RulesBase._action_require_accessibility,
             category="profile"
         )
@@ -96,6 +187,8 @@ class RulesBase:
             description="Si pace='relaxed' ENTONCES max 3 atracciones/día",
             priority=RulePriority.MEDIUM,
             condition=lambda ctx: ctx.get('preferences', {}).get('pace') == 'relaxed',
+            reads=frozenset({'preferences'}),
+            required_facts=frozenset({'preferences'}),
             action=RulesBase._action_reduce_daily_attractions,
             category="profile"
         )
@@ -109,6 +202,8 @@ class RulesBase:
             description="Si pace='intense' ENTONCES hasta 7 atracciones/día",
             priority=RulePriority.MEDIUM,
             condition=lambda ctx: ctx.get('preferences', {}).get('pace') == 'intense',
+            reads=frozenset({'preferences'}),
+            required_facts=frozenset({'preferences'}),
             action=RulesBase._action_increase_daily_attractions,
             category="profile"
         )
@@ -126,6 +221,7 @@ class RulesBase:
             description="Si 6am-12pm ENTONCES priorizar museos y cultura",
             priority=RulePriority.MEDIUM,
             condition=RulesBase._is_morning,
+            reads=frozenset({'current_time'}),
             action=RulesBase._action_prioritize_cultural,
             category="temporal"
         )
@@ -139,6 +235,7 @@ class RulesBase:
             description="Si 12pm-6pm ENTONCES priorizar parques y naturaleza",
             priority=RulePriority.MEDIUM,
             condition=RulesBase._is_afternoon,
+            reads=frozenset({'current_time'}),
             action=RulesBase._action_prioritize_outdoor,
             category="temporal"
         )
@@ -152,6 +249,7 @@ class RulesBase:
             description="Si 6pm-11pm ENTONCES priorizar restaurantes",
             priority=RulePriority.MEDIUM,
             condition=RulesBase._is_evening,
+            reads=frozenset({'current_time'}),
             action=RulesBase._action_prioritize_dining,
             category="temporal"
         )
@@ -165,6 +263,7 @@ class RulesBase:
             description="Si sábado/domingo ENTONCES advertir sobre aglomeraciones",
             priority=RulePriority.LOW,
             condition=RulesBase._is_weekend,
+            reads=frozenset({'current_date'}),
             action=RulesBase._action_warn_crowds,
             category="temporal"
         )
@@ -182,6 +281,8 @@ class RulesBase:
             description="Si weather='rain' ENTONCES preferir atracciones de interior",
             priority=RulePriority.HIGH,
             condition=lambda ctx: ctx.get('weather', {}).get('condition') == 'rain',
+            reads=frozenset({'weather'}),
+            required_facts=frozenset({'weather'}),
             action=RulesBase._action_prefer_indoor,
             category="weather"
         )
@@ -194,7 +295,8 @@ class RulesBase:
             name="Calor Extremo",
             description="Si temperature > 30°C ENTONCES evitar exteriores",
             priority=RulePriority.HIGH,
-            condition=lambda ctx: ctx.get('weather', {}).get('temperature', 25) > 30,
+            condition=RulesBase._is_extreme_heat,
+            required_facts=frozenset({'weather'}),
             action=RulesBase._action_avoid_outdoor,
             category="weather"
         )
@@ -212,6 +314,8 @@ class RulesBase:
             description="Si existe itinerario ENTONCES verificar horarios de apertura",
             priority=RulePriority.CRITICAL,
             condition=lambda ctx: 'itinerary' in ctx,
+            reads=frozenset({'itinerary'}),
+            required_facts=frozenset({'itinerary'}),
             action=RulesBase._action_validate_opening_hours,
             category="validation"
         )
@@ -225,6 +329,8 @@ class RulesBase:
             description="Si existe itinerario ENTONCES verificar tiempo de viaje",
             priority=RulePriority.HIGH,
             condition=lambda ctx: 'itinerary' in ctx,
+            reads=frozenset({'itinerary'}),
+            required_facts=frozenset({'itinerary'}),
             action=RulesBase._action_validate_travel_time,
             category="validation"
         )
@@ -238,6 +344,8 @@ class RulesBase:
             description="Si existe itinerario Y budget_max ENTONCES verificar costo total",
             priority=RulePriority.HIGH,
             condition=lambda ctx: 'itinerary' in ctx and 'budget_max' in ctx,
+            reads=frozenset({'itinerary', 'budget_max'}),
+            required_facts=frozenset({'itinerary', 'budget_max'}),
             action=RulesBase._action_validate_budget,
             category="validation"
         )
@@ -251,6 +359,8 @@ class RulesBase:
             description="Si >5 atracciones/día ENTONCES advertir fatiga",
             priority=RulePriority.MEDIUM,
             condition=lambda ctx: 'itinerary' in ctx,
+            reads=frozenset({'itinerary'}),
+            required_facts=frozenset({'itinerary'}),
             action=RulesBase._action_check_daily_limit,
             category="validation"
         )
@@ -260,13 +370,44 @@ class RulesBase:
     # ================================================================
     
     @staticmethod
-    def get_all_rules() -> List[Rule]:
+    def get_all_rules() -> Tuple[Rule, ...]:
         """
         Obtener todas las reglas definidas
         
+        Las reglas se construyen una sola vez al importar el módulo y se
+        comparten (no modificar la tupla ni las reglas).
+        
         Returns:
-            List[Rule]: Lista completa de reglas
+            Tuple[Rule, ...]: Lista completa de reglas
+        """
+        return _ALL_RULES
+    
+    @staticmethod
+    def get_all_rules_soa() -> Dict[str, Tuple]:
         """
+        Obtener los datos descriptivos de todas las reglas por columnas
+        
+        Tuplas paralelas (mismo orden que get_all_rules) para listados que
+        recorren todas las reglas sin acceder a cada objeto Rule.
+        
+        Returns:
+            Dict[str, Tuple]: {'ids', 'names', 'descriptions', 'priorities', 'categories'}
+        """
+        return _RULES_SOA
+    
+    @staticmethod
+    def get_all_rules_sorted() -> Tuple[Rule, ...]:
+        """
+        Obtener todas las reglas ordenadas por prioridad (CRITICAL primero)
+        
+        Returns:
+            Tuple[Rule, ...]: Reglas ordenadas (orden estable dentro de cada prioridad)
+        """
+        return _ALL_RULES_SORTED
+    
+    @staticmethod
+    def _build_all_rules() -> List[Rule]:
+        """Construir todas las reglas (una vez, ver _ALL_RULES)"""
         return [
             # Reglas de perfil
             RulesBase.rule_family_tourism(),
@@ -294,7 +435,7 @@ class RulesBase:
         ]
     
     @staticmethod
-    def get_rules_by_category(category: str) -> List[Rule]:
+    def get_rules_by_category(category: str) -> Tuple[Rule, ...]:
         """
         Obtener reglas por categoría
         
@@ -302,339 +443,641 @@ class RulesBase:
             category: Categoría (profile, temporal, weather, validation)
             
         Returns:
-            List[Rule]: Reglas de esa categoría
+            Tuple[Rule, ...]: Reglas de esa categoría
         """
-        all_rules = RulesBase.get_all_rules()
-        return [rule for rule in all_rules if rule.category == category]
+        return _RULES_BY_CATEGORY.get(category, ())
+    
+    @staticmethod
+    def get_all_categories() -> Tuple[str, ...]:
+        """
+        Obtener las categorías con al menos una regla
+        
+        Returns:
+            Tuple[str, ...]: Categorías en orden de definición
+        """
+        return tuple(_RULES_BY_CATEGORY)
+    
+    # ================================================================
+    # TABLA DE PREDICADOS COMPILADA
+    # ================================================================
+    
+    # Campos de la working memory extraídos una sola vez por evaluación
+    _CONDITION_FIELDS = (
+        ('preferences', "ctx.get('preferences', {})"),
+        ('budget_range', "ctx.get('budget_range', '')"),
+        # En minúsculas una sola vez; None si no es texto (la condición
+        # entonces llama a .lower() y falla igual que la lambda)
+        ('budget_lower', "budget_range.lower() if budget_range.__class__ is str else None"),
+        ('weather', "ctx.get('weather', {})"),
+        ('has_itinerary', "'itinerary' in ctx"),
+    )
+    
+    # Condiciones simples escritas sobre esos campos (deben equivaler a las
+    # lambdas de cada regla); el resto se llama directamente
+    _CONDITION_EXPRESSIONS = {
+        'PROFILE_001': "preferences.get('tourism_type') == 'familiar'",
+        'PROFILE_002': "(budget_lower if budget_lower is not None else budget_range.lower()) == 'bajo'",
+        'PROFILE_003': "(budget_lower if budget_lower is not None else budget_range.lower()) in _HIGH_BUDGETS",
+        'PROFILE_005': "preferences.get('pace') == 'relaxed'",
+        'PROFILE_006': "preferences.get('pace') == 'intense'",
+        'WEATHER_001': "weather.get('condition') == 'rain'",
+        'ITINERARY_001': "has_itinerary",
+        'ITINERARY_002': "has_itinerary",
+        'ITINERARY_003': "has_itinerary and 'budget_max' in ctx",
+        'ITINERARY_004': "has_itinerary",
+    }
+    
+    @staticmethod
+    def condition_fingerprint(condition: Callable) -> Tuple:
+        """
+        Identificador de condiciones equivalentes
+        
+        Dos funciones sin closure con el mismo bytecode, constantes, nombres
+        y globales dan siempre el mismo resultado sobre la misma memoria
+        (p. ej. varias reglas con `lambda ctx: 'itinerary' in ctx`); el resto
+        se identifica por el objeto.
+        
+        Returns:
+            Tuple: (número corto para nombres generados, clave comparable)
+        """
+        code = getattr(condition, '__code__', None)
+        if code is None or getattr(condition, '__closure__', None) or getattr(condition, '__defaults__', None):
+            key = ('id', id(condition))
+        else:
+            key = (code.co_code, code.co_consts, code.co_names, id(condition.__globals__))
+        
+        number = _CONDITION_NUMBERS.setdefault(key, len(_CONDITION_NUMBERS))
+        return number, key
+    
+    @staticmethod
+    def compile_conditions(rules: List[Rule]) -> Tuple[Optional[Callable], int]:
+        """
+        Generar una función que evalúa todas las condiciones en una pasada
+        
+        La función generada recibe ctx y devuelve (mask, unknown): el bit i de
+        `mask` indica que rules[i] es aplicable y el de `unknown` que su
+        condición falló (se deja para la evaluación normal). Los campos
+        comunes se leen una vez y las condiciones simples van en línea; las
+        cond_jit reciben sus valores de esas mismas secciones ya extraídas.
+        
+        Solo se incluyen reglas con campos leídos conocidos (`reads` o
+        cond_jit); las demás no tienen bit.
+        
+        Args:
+            rules: Reglas en el orden del motor
+            
+        Returns:
+            Tuple[Optional[Callable], int]: (función o None, bits incluidos)
+        """
+        namespace = {'_HIGH_BUDGETS': _HIGH_BUDGETS}
+        # Expresión -> bits de las reglas que la comparten (se evalúa una vez)
+        expression_bits: Dict[str, int] = {}
+        compiled_bits = 0
+        
+        # Sección de ctx -> variable local que ya la contiene
+        section_vars = {
+            source: name for name, source in RulesBase._CONDITION_FIELDS
+        }
+        extra_fields = []
+        
+        for idx, rule in enumerate(rules):
+            if rule.reads is None and not getattr(rule.condition, '_jitted', False):
+                continue
+            
+            bit = 1 << idx
+            compiled_bits |= bit
+            
+            expression = RulesBase._CONDITION_EXPRESSIONS.get(rule.id)
+            if expression is not None and _RULES_BY_ID.get(rule.id) is not rule:
+                expression = None
+            
+            jit_fields = getattr(rule.condition, '_jit_fields', None)
+            if expression is None and jit_fields:
+                # Llamar al kernel con los valores leídos de las secciones
+                namespace[f'_k{idx}'] = rule.condition._jit_kernel
+                args = []
+                for section, key, default in jit_fields:
+                    source = f"ctx.get({section!r}, {{}})"
+                    if source not in section_vars:
+                        section_vars[source] = f'_s{len(extra_fields)}'
+                        extra_fields.append((section_vars[source], source))
+                    args.append(f"float({section_vars[source]}.get({key!r}, {float(default)!r}))")
+                expression = f"_k{idx}({', '.join(args)})"
+            
+            if expression is None:
+                # Condiciones equivalentes comparten nombre (y expresión)
+                name = f'_c{RulesBase.condition_fingerprint(rule.condition)[0]}'
+                namespace.setdefault(name, rule.condition)
+                expression = f'{name}(ctx)'
+            
+            expression_bits[expression] = expression_bits.get(expression, 0) | bit
+        
+        body = []
+        for expression, bits in expression_bits.items():
+            body += [
+                "    try:",
+                f"        if {expression}:",
+                f"            mask |= {bits}",
+                "    except Exception:",
+                f"        unknown |= {bits}",
+            ]
+        
+        if not compiled_bits:
+            return None, 0
+        
+        lines = ["def _eval_conditions(ctx):"]
+        lines += [
+            f"    {name} = {source}"
+            for name, source in RulesBase._CONDITION_FIELDS + tuple(extra_fields)
+        ]
+        lines += ["    mask = 0", "    unknown = 0"] + body + ["    return mask, unknown"]
+        
+        exec("\n".join(lines), namespace)
+        return namespace['_eval_conditions'], compiled_bits
+    
+    @staticmethod
+    def is_base_rule(rule: Rule) -> bool:
+        """Indica si la regla es la instancia registrada en la base (no una copia modificada)"""
+        return 0 <= rule.cond_op < len(_ALL_RULES) and _ALL_RULES[rule.cond_op] is rule
+    
+    @staticmethod
+    def condition_key(ctx: Dict) -> Tuple:
+        """
+        Clave hashable con todo lo que leen las condiciones de las reglas base
+        
+        Dos memorias con la misma clave dan el mismo resultado en todas esas
+        condiciones. La hora entra como franja y la fecha como fin de semana
+        o no, para que peticiones del mismo perfil compartan clave.
+        
+        Raises:
+            Exception: Si algún campo no tiene la forma esperada
+        """
+        preferences = ctx.get('preferences', {})
+        weather = ctx.get('weather', {})
+        current_time = RulesBase._current_time(ctx)
+        
+        return (
+            preferences.get('tourism_type'),
+            preferences.get('pace'),
+            ctx.get('budget_range', ''),
+            weather.get('condition'),
+            weather.get('temperature', _KEY_MISSING),
+            ctx.get('mobility_constraints', {}).get('max_walking_distance', _KEY_MISSING),
+            # Franja: 0 madrugada, 1 mañana, 2 tarde, 3 noche, 4 después de las 23
+            (_T_06 <= current_time) + (_T_12 <= current_time)
+            + (_T_18 <= current_time) + (_T_23 <= current_time),
+            RulesBase._is_weekend(ctx),
+            'itinerary' in ctx,
+            'budget_max' in ctx,
+        )
+    
+    @staticmethod
+    def vectorized_eval(contexts: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluar las condiciones base sobre un lote con operaciones NumPy
+        
+        Cada memoria se reduce a su clave de condiciones (condition_key) y
+        con ella se arman columnas numéricas; cada condición es entonces una
+        comparación sobre columnas y no una llamada Python por fila y regla.
+        Solo conviene con lotes; para una sola memoria usar
+        match_base_conditions.
+        
+        Args:
+            contexts: Working memories del lote
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (mask, unknown) int64 por fila con
+                el bit i = código de operación i; los bits de `unknown` son
+                condiciones que fallarían (o filas sin clave) y deben
+                evaluarse de forma normal
+        """
+        n = len(contexts)
+        familiar = np.zeros(n, dtype=bool)
+        relaxed = np.zeros(n, dtype=bool)
+        intense = np.zeros(n, dtype=bool)
+        budget_low = np.zeros(n, dtype=bool)
+        budget_high = np.zeros(n, dtype=bool)
+        rain = np.zeros(n, dtype=bool)
+        walking = np.full(n, 10000.0)
+        temperature = np.full(n, 25.0)
+        band = np.zeros(n, dtype=np.int64)
+        weekend = np.zeros(n, dtype=bool)
+        has_itinerary = np.zeros(n, dtype=bool)
+        has_budget_max = np.zeros(n, dtype=bool)
+        
+        all_bits = (1 << len(_ALL_RULES)) - 1
+        unknown = np.zeros(n, dtype=np.int64)
+        
+        for row, ctx in enumerate(contexts):
+            try:
+                key = RulesBase.condition_key(ctx)
+            except Exception:
+                unknown[row] = all_bits
+                continue
+            
+            (tourism_type, pace, budget_range, condition, temp,
+             max_walking, band[row], weekend[row],
+             has_itinerary[row], has_budget_max[row]) = key
+            
+            familiar[row] = tourism_type == 'familiar'
+            relaxed[row] = pace == 'relaxed'
+            intense[row] = pace == 'intense'
+            rain[row] = condition == 'rain'
+            
+            if budget_range.__class__ is str:
+                budget_range = budget_range.lower()
+                budget_low[row] = budget_range == 'bajo'
+                budget_high[row] = budget_range in _HIGH_BUDGETS
+            else:
+                unknown[row] |= _VECTOR_BITS['PROFILE_002'] | _VECTOR_BITS['PROFILE_003']
+            
+            try:
+                if max_walking is not _KEY_MISSING:
+                    walking[row] = float(max_walking)
+            except (TypeError, ValueError):
+                unknown[row] |= _VECTOR_BITS['PROFILE_004']
+            
+            try:
+                if temp is not _KEY_MISSING:
+                    temperature[row] = float(temp)
+            except (TypeError, ValueError):
+                unknown[row] |= _VECTOR_BITS['WEATHER_002']
+        
+        columns = {
+            'PROFILE_001': familiar,
+            'PROFILE_002': budget_low,
+            'PROFILE_003': budget_high,
+            'PROFILE_004': walking < 1000,
+            'PROFILE_005': relaxed,
+            'PROFILE_006': intense,
+            'TIME_001': band == 1,
+            'TIME_002': band == 2,
+            'TIME_003': band == 3,
+            'TIME_004': weekend,
+            'WEATHER_001': rain,
+            'WEATHER_002': temperature > 30,
+            'ITINERARY_001': has_itinerary,
+            'ITINERARY_002': has_itinerary,
+            'ITINERARY_003': has_itinerary & has_budget_max,
+            'ITINERARY_004': has_itinerary,
+        }
+        
+        mask = np.zeros(n, dtype=np.int64)
+        for rule_id, column in columns.items():
+            mask |= column.astype(np.int64) * _VECTOR_BITS[rule_id]
+        
+        return mask & ~unknown, unknown
+    
+    @staticmethod
+    def match_base_conditions(ctx: Dict) -> Optional[Tuple[int, int]]:
+        """
+        Evaluar las condiciones de las reglas base, memorizando por clave
+        
+        Solo se memoriza la evaluación de condiciones (funciones puras de la
+        clave); las acciones se siguen ejecutando en cada inferencia.
+        
+        Args:
+            ctx: Working memory
+            
+        Returns:
+            Optional[Tuple[int, int]]: (mask, unknown) con el bit i = código
+                de operación i, o None si la memoria no admite clave
+        """
+        try:
+            key = RulesBase.condition_key(ctx)
+            result = _CONDITION_MEMO.get(key)
+        except Exception:
+            return None
+        
+        if result is None:
+            result = _BASE_EVAL(ctx)
+            if len(_CONDITION_MEMO) >= _CONDITION_MEMO_SIZE:
+                _CONDITION_MEMO.clear()
+            _CONDITION_MEMO[key] = result
+        
+        return result
     
     # ================================================================
     # FUNCIONES DE CONDICIÓN (IF)
     # ================================================================
     
+    # Contrato: quien arma la working memory (UserProfiler) fija
+    # 'current_time' y 'current_date' una vez por petición; el reloj del
+    # sistema queda solo como respaldo si faltan (resolución de 30 s,
+    # suficiente para franjas de varias horas).
+    
+    @staticmethod
+    def _now() -> datetime:
+        """Hora del sistema, reutilizada durante _CLOCK_TTL segundos"""
+        checked_at, now = _clock_cache
+        current = monotonic()
+        if now is None or current - checked_at > _CLOCK_TTL:
+            now = datetime.now()
+            _clock_cache[:] = (current, now)
+        return now
+    
+    @staticmethod
+    def _current_time(ctx: Dict) -> time:
+        """Hora actual del contexto (o la del sistema si no viene)"""
+        current_time = ctx.get('current_time')
+        if current_time is None:
+            return RulesBase._now().time()
+        if isinstance(current_time, datetime):
+            return current_time.time()
+        return current_time
+    
     @staticmethod
     def _is_morning(ctx: Dict) -> bool:
         """Verificar si es mañana (6am-12pm)"""
-        current_time = ctx.get('current_time', datetime.now().time())
-        if isinstance(current_time, datetime):
-            current_time = current_time.time()
-        return time(6, 0) <= current_time < time(12, 0)
+        return _T_06 <= RulesBase._current_time(ctx) < _T_12
     
     @staticmethod
     def _is_afternoon(ctx: Dict) -> bool:
         """Verificar si es tarde (12pm-6pm)"""
-        current_time = ctx.get('current_time', datetime.now().time())
-        if isinstance(current_time, datetime):
-            current_time = current_time.time()
-        return time(12, 0) <= current_time < time(18, 0)
+        return _T_12 <= RulesBase._current_time(ctx) < _T_18
     
     @staticmethod
     def _is_evening(ctx: Dict) -> bool:
         """Verificar si es noche (6pm-11pm)"""
-        current_time = ctx.get('current_time', datetime.now().time())
-        if isinstance(current_time, datetime):
-            current_time = current_time.time()
-        return time(18, 0) <= current_time < time(23, 0)
+        return _T_18 <= RulesBase._current_time(ctx) < _T_23
     
     @staticmethod
     def _is_weekend(ctx: Dict) -> bool:
         """Verificar si es fin de semana"""
-        current_date = ctx.get('current_date', datetime.now())
+        current_date = ctx.get('current_date')
+        if current_date is None:
+            current_date = RulesBase._now()
         if isinstance(current_date, datetime):
             return current_date.weekday() in [5, 6]  # Sábado=5, Domingo=6
         return False
     
+    @staticmethod
+    @cond_jit(('mobility_constraints', 'max_walking_distance', 10000.0))
+    def _has_reduced_mobility(max_walking_distance: float) -> bool:
+        """Verificar si la distancia máxima a pie es menor a 1 km"""
+        return max_walking_distance < 1000
+    
+    @staticmethod
+    @cond_jit(('weather', 'temperature', 25.0))
+    def _is_extreme_heat(temperature: float) -> bool:
+        """Verificar si la temperatura supera los 30°C"""
+        return temperature > 30
+    
     # ================================================================
     # FUNCIONES DE ACCIÓN (THEN)
     # ================================================================
     
     @staticmethod
-    def _action_add_family_preferences(ctx: Dict) -> Dict:
-        """Agregar preferencias family-friendly"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
+    def _mark_applied(ctx: Dict, rule_id: str):
+        """Marcar la regla como aplicada (un OR de enteros, sin crear el texto)"""
+        ctx[RulesBase.APPLIED_IDS] = ctx.get(RulesBase.APPLIED_IDS, 0) | _APPLIED_BITS[rule_id]
+    
+    @staticmethod
+    def applied_rules(ctx: Dict, action_order: Optional[List[Callable]] = None) -> List[str]:
+        """
+        Expandir la máscara de reglas aplicadas a sus textos
         
-        ctx['computed_profile']['family_friendly'] = True
-        ctx['computed_profile']['required_amenities'] = ['wheelchair', 'stroller_friendly', 'restrooms']
+        Args:
+            ctx: Working memory con la máscara APPLIED_IDS
+            action_order: Acciones en el orden en que se ejecutaron (opcional);
+                sin él se sigue el orden de los códigos de operación
+            
+        Returns:
+            List[str]: Textos de las reglas aplicadas
+        """
+        mask = ctx.get(RulesBase.APPLIED_IDS, 0)
+        applied = []
         
-        if 'recommended_categories' not in ctx['computed_profile']:
-            ctx['computed_profile']['recommended_categories'] = []
+        for action in action_order or ():
+            op = _OP_BY_ACTION.get(action)
+            if op is not None and mask >> op & 1:
+                applied.append(_RULE_DESCRIPTIONS[op])
+                mask &= ~(1 << op)
         
-        ctx['computed_profile']['recommended_categories'].extend([
-            'entretenimiento', 'naturaleza', 'educativo'
-        ])
+        applied.extend(
+            _RULE_DESCRIPTIONS[op] for op in range(len(_RULE_DESCRIPTIONS))
+            if mask >> op & 1
+        )
+        return applied
+    
+    @staticmethod
+    def _action_add_family_preferences(ctx: Dict) -> None:
+        """Agregar preferencias family-friendly"""
+        profile = ctx.setdefault('computed_profile', {})
+        
+        profile['family_friendly'] = True
+        profile['required_amenities'] = list(_FAMILY_AMENITIES)
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_001: Preferencias familiares agregadas')
+        profile.setdefault('recommended_categories', []).extend(_FAMILY_CATS)
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_001')
     
     @staticmethod
-    def _action_filter_low_budget(ctx: Dict) -> Dict:
+    def _action_filter_low_budget(ctx: Dict) -> None:
         """Filtrar por presupuesto bajo"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
+        profile = ctx.setdefault('computed_profile', {})
         
-        ctx['computed_profile']['allowed_price_ranges'] = ['gratis', 'bajo']
-        ctx['computed_profile']['max_daily_cost'] = 50.0
-        ctx['computed_profile']['prefer_free'] = True
+        profile['allowed_price_ranges'] = list(_LOW_BUDGET_PRICE_RANGES)
+        profile['max_daily_cost'] = 50.0
+        profile['prefer_free'] = True
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_002: Filtros de presupuesto bajo aplicados')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_002')
     
     @staticmethod
-    def _action_prioritize_premium(ctx: Dict) -> Dict:
+    def _action_prioritize_premium(ctx: Dict) -> None:
         """Priorizar experiencias premium"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        ctx['computed_profile']['min_rating'] = 4.0
-        ctx['computed_profile']['prefer_verified'] = True
-        ctx['computed_profile']['allow_exclusive'] = True
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_003: Experiencias premium priorizadas')
+        profile['min_rating'] = 4.0
+        profile['prefer_verified'] = True
+        profile['allow_exclusive'] = True
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_003')
     
     @staticmethod
-    def _action_require_accessibility(ctx: Dict) -> Dict:
+    def _action_require_accessibility(ctx: Dict) -> None:
         """Requerir accesibilidad"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
+        profile = ctx.setdefault('computed_profile', {})
         
-        ctx['computed_profile']['require_accessibility'] = True
-        ctx['computed_profile']['max_walking_distance'] = ctx.get('mobility_constraints', {}).get('max_walking_distance', 500)
-        ctx['computed_profile']['required_amenities'] = ['wheelchair', 'elevator', 'accessible_bathroom']
-        ctx['computed_profile']['preferred_transport'] = ['car', 'taxi']
+        profile['require_accessibility'] = True
+        profile['max_walking_distance'] = ctx.get('mobility_constraints', {}).get('max_walking_distance', 500)
+        profile['required_amenities'] = list(_ACCESS_AMENITIES)
+        profile['preferred_transport'] = list(_ACCESS_TRANSPORT)
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_004: Requisitos de accesibilidad aplicados')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_004')
     
     @staticmethod
-    def _action_reduce_daily_attractions(ctx: Dict) -> Dict:
+    def _action_reduce_daily_attractions(ctx: Dict) -> None:
         """Reducir atracciones por día (ritmo relajado)"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        ctx['computed_profile']['max_daily_attractions'] = 3
-        ctx['computed_profile']['min_time_per_attraction'] = 120  # 2 horas
-        ctx['computed_profile']['include_rest_time'] = True
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_005: Ritmo relajado - máx 3 atracciones/día')
+        profile['max_daily_attractions'] = 3
+        profile['min_time_per_attraction'] = 120  # 2 horas
+        profile['include_rest_time'] = True
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_005')
     
     @staticmethod
-    def _action_increase_daily_attractions(ctx: Dict) -> Dict:
+    def _action_increase_daily_attractions(ctx: Dict) -> None:
         """Aumentar atracciones por día (ritmo intenso)"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        ctx['computed_profile']['max_daily_attractions'] = 7
-        ctx['computed_profile']['min_time_per_attraction'] = 45
-        ctx['computed_profile']['include_rest_time'] = False
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('PROFILE_006: Ritmo intenso - hasta 7 atracciones/día')
+        profile['max_daily_attractions'] = 7
+        profile['min_time_per_attraction'] = 45
+        profile['include_rest_time'] = False
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'PROFILE_006')
     
     @staticmethod
-    def _action_prioritize_cultural(ctx: Dict) -> Dict:
+    def _action_prioritize_cultural(ctx: Dict) -> None:
         """Priorizar sitios culturales"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        if 'priority_categories' not in ctx['computed_profile']:
-            ctx['computed_profile']['priority_categories'] = []
-        
-        ctx['computed_profile']['priority_categories'].extend(['cultural', 'historico', 'museos'])
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('TIME_001: Sitios culturales priorizados (mañana)')
+        profile.setdefault('priority_categories', []).extend(_CULTURAL_CATS)
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'TIME_001')
     
     @staticmethod
-    def _action_prioritize_outdoor(ctx: Dict) -> Dict:
+    def _action_prioritize_outdoor(ctx: Dict) -> None:
         """Priorizar actividades al aire libre"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'priority_categories' not in ctx['computed_profile']:
-            ctx['computed_profile']['priority_categories'] = []
+        profile.setdefault('priority_categories', []).extend(_OUTDOOR_CATS)
         
-        ctx['computed_profile']['priority_categories'].extend(['naturaleza', 'parques', 'aventura'])
-        
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('TIME_002: Actividades al aire libre priorizadas (tarde)')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'TIME_002')
     
     @staticmethod
-    def _action_prioritize_dining(ctx: Dict) -> Dict:
+    def _action_prioritize_dining(ctx: Dict) -> None:
         """Priorizar restaurantes"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        if 'priority_categories' not in ctx['computed_profile']:
-            ctx['computed_profile']['priority_categories'] = []
+        profile = ctx.setdefault('computed_profile', {})
         
-        ctx['computed_profile']['priority_categories'].extend(['gastronomia', 'restaurantes'])
+        profile.setdefault('priority_categories', []).extend(_DINING_CATS)
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('TIME_003: Gastronomía priorizada (noche)')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'TIME_003')
     
     @staticmethod
-    def _action_warn_crowds(ctx: Dict) -> Dict:
+    def _action_warn_crowds(ctx: Dict) -> None:
         """Advertir sobre aglomeraciones"""
-        if 'warnings' not in ctx:
-            ctx['warnings'] = []
-        
-        ctx['warnings'].append({
-            'type': 'crowds',
-            'message': 'Es fin de semana. Las atracciones populares pueden estar concurridas.',
-            'recommendation': 'Considere visitar temprano o reservar con anticipación.'
-        })
-        
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('TIME_004: Advertencia de aglomeraciones (fin de semana)')
+        ctx.setdefault('warnings', []).append(_CROWDS_WARNING)
         
-        return ctx
+        RulesBase._mark_applied(ctx, 'TIME_004')
     
     @staticmethod
-    def _action_prefer_indoor(ctx: Dict) -> Dict:
+    def _action_prefer_indoor(ctx: Dict) -> None:
         """Preferir interior cuando llueve"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        ctx['computed_profile']['prefer_indoor'] = True
-        ctx['computed_profile']['avoid_categories'] = ['naturaleza', 'parques']
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'priority_categories' not in ctx['computed_profile']:
-            ctx['computed_profile']['priority_categories'] = []
+        profile['prefer_indoor'] = True
+        profile['avoid_categories'] = list(_RAIN_AVOID_CATS)
         
-        ctx['computed_profile']['priority_categories'].extend(['museos', 'cultural', 'compras'])
+        profile.setdefault('priority_categories', []).extend(_INDOOR_CATS)
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('WEATHER_001: Atracciones de interior priorizadas (lluvia)')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'WEATHER_001')
     
     @staticmethod
-    def _action_avoid_outdoor(ctx: Dict) -> Dict:
+    def _action_avoid_outdoor(ctx: Dict) -> None:
         """Evitar exteriores con calor extremo"""
-        if 'computed_profile' not in ctx:
-            ctx['computed_profile'] = {}
-        
-        ctx['computed_profile']['avoid_outdoor'] = True
-        ctx['computed_profile']['avoid_categories'] = ['naturaleza', 'aventura']
+        profile = ctx.setdefault('computed_profile', {})
         
-        if 'warnings' not in ctx:
-            ctx['warnings'] = []
+        profile['avoid_outdoor'] = True
+        profile['avoid_categories'] = list(_HEAT_AVOID_CATS)
         
-        ctx['warnings'].append({
+        ctx.setdefault('warnings', []).append({
             'type': 'heat',
-            'message': f"Temperatura alta ({ctx.get('weather', {}).get('temperature')}°C)",
-            'recommendation': 'Prefiera lugares con aire acondicionado.'
+            'message': _HEAT_MESSAGE(ctx.get('weather', {}).get('temperature')),
+            'recommendation': _HEAT_RECOMMENDATION
         })
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('WEATHER_002: Actividades exteriores evitadas (calor)')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'WEATHER_002')
     
     @staticmethod
-    def _action_validate_opening_hours(ctx: Dict) -> Dict:
+    def _action_validate_opening_hours(ctx: Dict) -> None:
         """Validar horarios de apertura (placeholder)"""
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('ITINERARY_001: Horarios validados')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'ITINERARY_001')
     
     @staticmethod
-    def _action_validate_travel_time(ctx: Dict) -> Dict:
+    def _action_validate_travel_time(ctx: Dict) -> None:
         """Validar tiempo de viaje"""
         itinerary = ctx.get('itinerary', {})
         total_travel_time = sum([seg.get('travel_time_minutes', 0) for seg in itinerary.get('segments', [])])
         
         if total_travel_time > 240:
-            if 'warnings' not in ctx:
-                ctx['warnings'] = []
-            
-            ctx['warnings'].append({
+            ctx.setdefault('warnings', []).append({
                 'type': 'travel_time',
                 'message': f'Tiempo de viaje total alto: {total_travel_time} minutos',
                 'recommendation': 'Considere reducir atracciones o agrupar por zona.'
             })
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('ITINERARY_002: Tiempo de viaje validado')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'ITINERARY_002')
     
     @staticmethod
-    def _action_validate_budget(ctx: Dict) -> Dict:
+    def _action_validate_budget(ctx: Dict) -> None:
         """Validar presupuesto"""
         itinerary = ctx.get('itinerary', {})
         total_cost = itinerary.get('total_cost', 0)
         budget_max = ctx.get('budget_max', float('inf'))
         
         if total_cost > budget_max:
-            if 'validation_errors' not in ctx:
-                ctx['validation_errors'] = []
-            
-            ctx['validation_errors'].append({
+            ctx.setdefault('validation_errors', []).append({
                 'type': 'budget',
                 'message': f'Costo total (${total_cost}) excede presupuesto (${budget_max})',
                 'severity': 'high'
             })
+            ctx[RulesBase.HALT_FLAG] = True
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('ITINERARY_003: Presupuesto validado')
-        
-        return ctx
+        RulesBase._mark_applied(ctx, 'ITINERARY_003')
     
     @staticmethod
-    def _action_check_daily_limit(ctx: Dict) -> Dict:
+    def _action_check_daily_limit(ctx: Dict) -> None:
         """Verificar límite diario"""
         itinerary = ctx.get('itinerary', {})
         daily_count = len(itinerary.get('attractions', []))
         
         if daily_count > 5:
-            if 'warnings' not in ctx:
-                ctx['warnings'] = []
-            
-            ctx['warnings'].append({
+            ctx.setdefault('warnings', []).append({
                 'type': 'fatigue',
                 'message': f'Muchas atracciones en un día ({daily_count})',
                 'recommendation': 'Distribuir en más días para evitar fatiga.'
             })
         
-        if 'applied_rules' not in ctx:
-            ctx['applied_rules'] = []
-        ctx['applied_rules'].append('ITINERARY_004: Límite diario verificado')
-        
-        return ctx
\ No newline at end of file
+        RulesBase._mark_applied(ctx, 'ITINERARY_004')
+
+
+# Reglas construidas una sola vez al importar el módulo; cada una recibe
+# como código de operación su posición en la base (los IDs se internan:
+# son claves de la memoria alfa y de los índices)
+_ALL_RULES: Tuple[Rule, ...] = tuple(
+    replace(rule, id=sys.intern(rule.id), cond_op=op, action_op=op)
+    for op, rule in enumerate(RulesBase._build_all_rules())
+)
+
+_ALL_RULES_SORTED: Tuple[Rule, ...] = tuple(sorted(_ALL_RULES, key=lambda r: r.priority))
+
+_RULES_BY_ID: Dict[str, Rule] = {rule.id: rule for rule in _ALL_RULES}
+
+# Reglas por columnas (ver get_all_rules_soa); prioridad por nombre
+_RULES_SOA: Dict[str, Tuple] = {
+    'ids': tuple(rule.id for rule in _ALL_RULES),
+    'names': tuple(rule.name for rule in _ALL_RULES),
+    'descriptions': tuple(rule.description for rule in _ALL_RULES),
+    'priorities': tuple(rule.priority.name for rule in _ALL_RULES),
+    'categories': tuple(rule.category for rule in _ALL_RULES),
+}
+
+# Máscara de reglas aplicadas: bit y texto por código de operación
+_RULE_DESCRIPTIONS: Tuple[str, ...] = tuple(
+    sys.intern(RulesBase._APPLIED_DESCRIPTIONS[rule.id]) for rule in _ALL_RULES
+)
+_APPLIED_BITS: Dict[str, int] = {rule.id: 1 << rule.action_op for rule in _ALL_RULES}
+_VECTOR_BITS: Dict[str, int] = {rule.id: 1 << rule.cond_op for rule in _ALL_RULES}
+_OP_BY_ACTION: Dict[Callable, int] = {rule.action: rule.action_op for rule in _ALL_RULES}
+
+# Tabla de predicados de la base completa (bit i = código de operación i) y
+# memoria de sus resultados por clave de condiciones
+_BASE_EVAL, _BASE_COMPILED_BITS = RulesBase.compile_conditions(list(_ALL_RULES))
+_CONDITION_MEMO: Dict[Tuple, Tuple[int, int]] = {}
+
+_RULES_BY_CATEGORY: Dict[str, Tuple[Rule, ...]] = {
+    category: tuple(rule for rule in _ALL_RULES if rule.category == category)
+    for category in dict.fromkeys(rule.category for rule in _ALL_RULES)
+}
@@ -2,23 +2,76 @@
 """
 Servicio para motor de reglas y procesamiento de perfiles
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from collections import defaultdict
+from functools import lru_cache
+import threading
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from .forward_chaining import ForwardChainingEngine, InferenceResult
-from .user_profiler import UserProfiler
+from .user_profiler import UserProfiler, ProfileFacts
 from .rules_base import RulesBase
 from shared.database.models import UserProfile
+from shared.cache import rules_cache
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Un UserProfiler por hilo: el conjunto de reglas es fijo en el proceso, así
+# que el motor (índices, tabla de predicados, MATCH generado) se construye
+# una sola vez; es por hilo porque el motor guarda estado de la inferencia
+_profilers = threading.local()
+
+
+def _get_profiler() -> UserProfiler:
+    """Obtener el UserProfiler del hilo actual (se crea en el primer uso)"""
+    profiler = getattr(_profilers, 'profiler', None)
+    if profiler is None:
+        profiler = _profilers.profiler = UserProfiler()
+    return profiler
+
+
+def _default_context() -> Dict:
+    """
+    Contexto temporal por defecto (fecha y hora actuales)
+    
+    Un solo datetime.now() truncado al minuto: las reglas temporales solo
+    miran la hora y el día, y así peticiones cercanas comparten la clave
+    de caché de enrich_profile.
+    """
+    now = datetime.now().replace(second=0, microsecond=0)
+    return {
+        'current_date': now,
+        'current_time': now.time()
+    }
+
 
 class RulesEngineService:
     """Servicio de motor de reglas"""
     
+    @staticmethod
+    def _load_profile_facts(db: Session, user_profile_id: int) -> Optional[ProfileFacts]:
+        """
+        Cargar solo las columnas de UserProfile que usan las reglas
+        
+        Args:
+            db: Sesión de base de datos
+            user_profile_id: ID del perfil de usuario
+            
+        Returns:
+            Optional[ProfileFacts]: Datos del perfil, o None si no existe
+        """
+        row = db.query(
+            *(getattr(UserProfile, column) for column in ProfileFacts.COLUMNS)
+        ).filter(
+            UserProfile.id == user_profile_id
+        ).first()
+        
+        return ProfileFacts.from_orm(row) if row is not None else None
+    
     @staticmethod
     def enrich_user_profile(
         db: Session,
@@ -40,9 +93,7 @@ class RulesEngineService:
         """
         try:
             # Obtener perfil de usuario
-            user_profile = db.query(UserProfile).filter(
-                UserProfile.id == user_profile_id
-            ).first()
+            user_profile = RulesEngineService._load_profile_facts(db, user_profile_id)
             
             if not user_profile:
                 raise HTTPException(
@@ -51,57 +102,50 @@ class RulesEngineService:
                 )
             
             # Convertir a diccionario
-            profile_dict = {
-                'user_id': str(user_profile.user_id),
-                'name': user_profile.name,
-                'preferences': user_profile.preferences or {},
-                'budget_range': user_profile.budget_range,
-                'budget_min': user_profile.budget_min,
-                'budget_max': user_profile.budget_max,
-                'mobility_constraints': user_profile.mobility_constraints or {}
-            }
+            profile_dict = user_profile.as_dict
             
             # Agregar contexto por defecto si no se proporciona
             if context is None:
-                context = {
-                    'current_date': datetime.now(),
-                    'current_time': datetime.now().time()
-                }
+                context = _default_context()
             
-            # Procesar con UserProfiler
-            profiler = UserProfiler()
-            result = profiler.enrich_profile(
-                user_profile=profile_dict,
-                context=context,
-                enable_trace=enable_trace
-            )
+            profiler = _get_profiler()
+            original_profile = {
+                'name': user_profile.name,
+                'preferences': user_profile.preferences,
+                'budget_range': user_profile.budget_range
+            }
             
-            logger.info(
-                f"Perfil {user_profile_id} enriquecido: "
-                f"{result.rules_fired_count} reglas aplicadas"
+            # Resultado cacheado para este perfil y franja de contexto
+            bucket = profiler.cache_bucket(profile_dict, context, enable_trace)
+            rules_result = (
+                rules_cache.get_cached(user_profile_id, 'enrich', bucket)
+                if bucket is not None else None
             )
             
-            # Actualizar computed_profile en BD
-            user_profile.computed_profile = result.computed_profile # type: ignore
+            if rules_result is None:
+                rules_result = RulesEngineService._run_enrichment(
+                    profiler, user_profile_id, profile_dict, context, enable_trace
+                )
+                if bucket is not None:
+                    rules_cache.set_cached(user_profile_id, 'enrich', bucket, rules_result)
+            else:
+                logger.info(f"Perfil {user_profile_id} enriquecido desde caché")
+            
+            # Actualizar computed_profile en BD, también con resultado cacheado
+            # (otra franja pudo escribir otro entretanto); UPDATE de una sola
+            # columna, sin cargar la entidad en la sesión
+            db.execute(
+                update(UserProfile)
+                .where(UserProfile.id == user_profile_id)
+                .values(computed_profile=rules_result['computed_profile'])
+            )
             db.commit()
             
             # Construir respuesta
             return {
                 'user_profile_id': user_profile_id,
-                'original_profile': {
-                    'name': user_profile.name,
-                    'preferences': user_profile.preferences,
-                    'budget_range': user_profile.budget_range
-                },
-                'computed_profile': result.computed_profile,
-                'warnings': result.warnings,
-                'validation_errors': result.validation_errors,
-                'applied_rules': result.applied_rules,
-                'metadata': {
-                    'rules_fired': result.rules_fired_count,
-                    'iterations': result.iterations_count
-                },
-                'execution_trace': result.execution_trace if enable_trace else None
+                'original_profile': original_profile,
+                **rules_result
             }
             
         except HTTPException:
@@ -113,6 +157,133 @@ class RulesEngineService:
                 detail=f"Error al enriquecer perfil: {str(e)}"
             )
     
+    @staticmethod
+    def _run_enrichment(
+        profiler: UserProfiler,
+        user_profile_id: int,
+        profile_dict: Dict,
+        context: Dict,
+        enable_trace: bool
+    ) -> Dict:
+        """
+        Ejecutar la inferencia de enrich_user_profile
+        
+        Returns:
+            Dict: Parte de la respuesta que sale de las reglas (cacheable)
+        """
+        result = profiler.enrich_profile(
+            user_profile=profile_dict,
+            context=context,
+            enable_trace=enable_trace,
+            incremental=True
+        )
+        
+        logger.info(
+            f"Perfil {user_profile_id} enriquecido: "
+            f"{result.rules_fired_count} reglas aplicadas"
+        )
+        
+        return {
+            'computed_profile': result.computed_profile,
+            'warnings': result.warnings,
+            'validation_errors': result.validation_errors,
+            'applied_rules': result.applied_rules,
+            'metadata': {
+                'rules_fired': result.rules_fired_count,
+                'iterations': result.iterations_count
+            },
+            'execution_trace': result.execution_trace if enable_trace else None
+        }
+    
+    @staticmethod
+    def enrich_user_profiles_bulk(
+        db: Session,
+        user_profile_ids: List[int],
+        context: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Enriquecer varios perfiles de usuario en una sola pasada
+        
+        Los perfiles se cargan con una sola consulta, se procesan en lote con
+        el mismo contexto y los computed_profile se guardan con un único
+        commit.
+        
+        Args:
+            db: Sesión de base de datos
+            user_profile_ids: IDs de los perfiles de usuario
+            context: Contexto compartido (fecha, hora, clima)
+            
+        Returns:
+            Dict: Resultados por perfil e IDs no encontrados
+        """
+        try:
+            requested_ids = list(dict.fromkeys(user_profile_ids))
+            
+            # Obtener todos los perfiles en una consulta
+            user_profiles = db.query(
+                *(getattr(UserProfile, column) for column in ProfileFacts.COLUMNS)
+            ).filter(
+                UserProfile.id.in_(requested_ids)
+            ).all() if requested_ids else []
+            
+            profiles_by_id = {row.id: ProfileFacts.from_orm(row) for row in user_profiles}
+            found_ids = [profile_id for profile_id in requested_ids if profile_id in profiles_by_id]
+            not_found = [profile_id for profile_id in requested_ids if profile_id not in profiles_by_id]
+            
+            profile_dicts = [
+                profiles_by_id[profile_id].as_dict
+                for profile_id in found_ids
+            ]
+            
+            # Agregar contexto por defecto si no se proporciona
+            if context is None:
+                context = _default_context()
+            
+            # Procesar en lote con UserProfiler
+            profiler = _get_profiler()
+            results = profiler.enrich_profiles_batch(
+                user_profiles=profile_dicts,
+                context=context
+            )
+            
+            # Actualizar computed_profile en BD con un solo commit
+            if results:
+                db.bulk_update_mappings(UserProfile, [
+                    {'id': profile_id, 'computed_profile': result.computed_profile}
+                    for profile_id, result in zip(found_ids, results)
+                ])
+                db.commit()
+            
+            logger.info(
+                f"{len(results)} perfiles enriquecidos en lote "
+                f"({len(not_found)} no encontrados)"
+            )
+            
+            return {
+                'results': [
+                    {
+                        'user_profile_id': profile_id,
+                        'computed_profile': result.computed_profile,
+                        'warnings': result.warnings,
+                        'validation_errors': result.validation_errors,
+                        'applied_rules': result.applied_rules,
+                        'metadata': {
+                            'rules_fired': result.rules_fired_count,
+                            'iterations': result.iterations_count
+                        }
+                    }
+                    for profile_id, result in zip(found_ids, results)
+                ],
+                'not_found': not_found
+            }
+            
+        except Exception as e:
+            logger.error(f"Error enriqueciendo perfiles en lote: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al enriquecer perfiles: {str(e)}"
+            )
+    
     @staticmethod
     def validate_itinerary(
         db: Session,
@@ -134,9 +305,7 @@ class RulesEngineService:
         """
         try:
             # Obtener perfil de usuario
-            user_profile = db.query(UserProfile).filter(
-                UserProfile.id == user_profile_id
-            ).first()
+            user_profile = RulesEngineService._load_profile_facts(db, user_profile_id)
             
             if not user_profile:
                 raise HTTPException(
@@ -145,13 +314,10 @@ class RulesEngineService:
                 )
             
             # Convertir a diccionario
-            profile_dict = {
-                'preferences': user_profile.preferences or {},
-                'budget_max': user_profile.budget_max
-            }
+            profile_dict = user_profile.as_dict
             
             # Validar con UserProfiler
-            profiler = UserProfiler()
+            profiler = _get_profiler()
             result = profiler.validate_itinerary(
                 itinerary=itinerary,
                 user_profile=profile_dict,
@@ -205,9 +371,7 @@ class RulesEngineService:
         """
         try:
             # Obtener perfil
-            user_profile = db.query(UserProfile).filter(
-                UserProfile.id == user_profile_id
-            ).first()
+            user_profile = RulesEngineService._load_profile_facts(db, user_profile_id)
             
             if not user_profile:
                 raise HTTPException(
@@ -216,35 +380,22 @@ class RulesEngineService:
                 )
             
             # Convertir a diccionario
-            profile_dict = {
-                'preferences': user_profile.preferences or {},
-                'budget_range': user_profile.budget_range,
-                'budget_min': user_profile.budget_min,
-                'budget_max': user_profile.budget_max,
-                'mobility_constraints': user_profile.mobility_constraints or {}
-            }
+            profile_dict = user_profile.as_dict
             
             # Agregar contexto
             if context is None:
-                context = {
-                    'current_date': datetime.now(),
-                    'current_time': datetime.now().time()
-                }
+                context = _default_context()
             
             # Explicar reglas
-            profiler = UserProfiler()
+            profiler = _get_profiler()
             explanations = profiler.explain_profile_rules(profile_dict, context)
             
             # Agrupar por categoría
-            by_category = {}
+            by_category = defaultdict(list)
             applicable_count = 0
             
             for exp in explanations:
-                category = exp['category']
-                if category not in by_category:
-                    by_category[category] = []
-                
-                by_category[category].append(exp)
+                by_category[exp['category']].append(exp)
                 
                 if exp['is_applicable']:
                     applicable_count += 1
@@ -258,7 +409,7 @@ class RulesEngineService:
                 'user_profile_id': user_profile_id,
                 'total_rules': len(explanations),
                 'applicable_rules': applicable_count,
-                'rules_by_category': by_category,
+                'rules_by_category': dict(by_category),
                 'all_rules': explanations
             }
             
@@ -290,9 +441,7 @@ class RulesEngineService:
         """
         try:
             # Obtener perfil
-            user_profile = db.query(UserProfile).filter(
-                UserProfile.id == user_profile_id
-            ).first()
+            user_profile = RulesEngineService._load_profile_facts(db, user_profile_id)
             
             if not user_profile:
                 raise HTTPException(
@@ -301,26 +450,29 @@ class RulesEngineService:
                 )
             
             # Convertir a diccionario
-            profile_dict = {
-                'preferences': user_profile.preferences or {},
-                'budget_range': user_profile.budget_range,
-                'budget_min': user_profile.budget_min,
-                'budget_max': user_profile.budget_max,
-                'mobility_constraints': user_profile.mobility_constraints or {}
-            }
+            profile_dict = user_profile.as_dict
             
             # Agregar contexto
             if context is None:
-                context = {
-                    'current_date': datetime.now(),
-                    'current_time': datetime.now().time()
-                }
+                context = _default_context()
             
-            # Obtener recomendaciones
-            profiler = UserProfiler()
-            recommendations = profiler.get_recommendations(profile_dict, context)
+            profiler = _get_profiler()
+            bucket = profiler.cache_bucket(profile_dict, context)
+            recommendations = (
+                rules_cache.get_cached(user_profile_id, 'recommendations', bucket)
+                if bucket is not None else None
+            )
             
-            logger.info(f"Recomendaciones generadas para perfil {user_profile_id}")
+            if recommendations is None:
+                # Obtener recomendaciones
+                recommendations = profiler.get_recommendations(profile_dict, context)
+                
+                if bucket is not None:
+                    rules_cache.set_cached(user_profile_id, 'recommendations', bucket, recommendations)
+                
+                logger.info(f"Recomendaciones generadas para perfil {user_profile_id}")
+            else:
+                logger.info(f"Recomendaciones para perfil {user_profile_id} desde caché")
             
             return {
                 'user_profile_id': user_profile_id,
@@ -340,6 +492,43 @@ class RulesEngineService:
                 detail=f"Error al generar recomendaciones: {str(e)}"
             )
     
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _rules_listing() -> Dict:
+        """
+        Construir el listado de reglas (una vez por proceso)
+        
+        Las reglas son fijas tras importar rules_base, así que el listado se
+        comparte entre peticiones (no modificar el resultado).
+        """
+        soa = RulesBase.get_all_rules_soa()
+        
+        rules_info = [
+            {
+                'id': rule_id,
+                'name': name,
+                'description': description,
+                'priority': priority,
+                'category': category
+            }
+            for rule_id, name, description, priority, category in zip(
+                soa['ids'], soa['names'], soa['descriptions'],
+                soa['priorities'], soa['categories']
+            )
+        ]
+        
+        # Agrupar por categoría en una pasada
+        by_category = defaultdict(list)
+        for rule_info in rules_info:
+            by_category[rule_info['category']].append(rule_info)
+        
+        return {
+            'total_rules': len(rules_info),
+            'categories': list(by_category.keys()),
+            'rules_by_category': dict(by_category),
+            'all_rules': rules_info
+        }
+    
     @staticmethod
     def list_all_rules() -> Dict:
         """
@@ -349,33 +538,7 @@ class RulesEngineService:
             Dict: Lista de reglas
         """
         try:
-            all_rules = RulesBase.get_all_rules()
-            
-            rules_info = []
-            by_category = {}
-            
-            for rule in all_rules:
-                rule_info = {
-                    'id': rule.id,
-                    'name': rule.name,
-                    'description': rule.description,
-                    'priority': rule.priority.name,
-                    'category': rule.category
-                }
-                
-                rules_info.append(rule_info)
-                
-                # Agrupar por categoría
-                if rule.category not in by_category:
-                    by_category[rule.category] = []
-                by_category[rule.category].append(rule_info)
-            
-            return {
-                'total_rules': len(all_rules),
-                'categories': list(by_category.keys()),
-                'rules_by_category': by_category,
-                'all_rules': rules_info
-            }
+            return RulesEngineService._rules_listing()
             
         except Exception as e:
             logger.error(f"Error listando reglas: {str(e)}")
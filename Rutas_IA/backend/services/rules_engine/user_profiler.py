@@ -3,8 +3,12 @@
 Procesador de perfiles de usuario usando el motor de reglas
 Enriquece perfiles con inferencias basadas en contexto
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from datetime import datetime
+import hashlib
+import sys
 
 from .forward_chaining import ForwardChainingEngine, InferenceResult
 from .rules_base import RulesBase
@@ -12,6 +16,82 @@ from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Listas de la working memory a las que las reglas solo agregan elementos
+_APPEND_ONLY_FIELDS = ('warnings', 'validation_errors', 'applied_rules')
+
+# Resultados de enrich_profile por clave (ver _result_cache_key): campos que
+# produjo la inferencia, para aplicarlos sobre la memoria de la petición
+_RESULT_CACHE: Dict[Tuple, Dict] = {}
+_RESULT_CACHE_SIZE = 4096
+
+# Última inferencia por user_id (ver enrich_profile con incremental=True):
+# (hechos de la memoria inicial, {categoría: resultados de condición})
+_INFERENCE_STATE: Dict[str, Tuple[Dict, Dict[str, Dict]]] = {}
+_INFERENCE_STATE_SIZE = 4096
+
+
+def _intern_keys(data: Dict) -> Dict:
+    """
+    Copiar un dict con sus claves de texto internadas
+    
+    Las claves que llegan de JSON (contexto de la petición, preferencias
+    guardadas en BD) no están internadas; así las búsquedas de las reglas
+    con claves literales comparan por identidad.
+    """
+    if not isinstance(data, dict):
+        return data
+    return {sys.intern(key) if isinstance(key, str) else key: value for key, value in data.items()}
+
+
+class ProfileFacts:
+    """
+    Datos de un perfil de usuario que consumen las reglas
+    
+    Se leen una sola vez de la fila (objeto ORM o fila de columnas) y el
+    dict para la working memory se construye en el primer uso.
+    """
+    
+    __slots__ = (
+        'id', 'user_id', 'name', 'preferences', 'budget_range',
+        'budget_min', 'budget_max', 'mobility_constraints', '_dict'
+    )
+    
+    # Columnas de UserProfile necesarias (para consultas sin hidratar la fila)
+    COLUMNS = (
+        'id', 'user_id', 'name', 'preferences', 'budget_range',
+        'budget_min', 'budget_max', 'mobility_constraints'
+    )
+    
+    def __init__(self, **fields):
+        for column in self.COLUMNS:
+            setattr(self, column, fields.get(column))
+        self._dict = None
+    
+    @classmethod
+    def from_orm(cls, row) -> 'ProfileFacts':
+        """
+        Crear desde un UserProfile o una fila de db.query(*columnas)
+        
+        Args:
+            row: Objeto con los atributos de COLUMNS
+        """
+        return cls(**{column: getattr(row, column) for column in cls.COLUMNS})
+    
+    @property
+    def as_dict(self) -> Dict:
+        """Perfil como dict para UserProfiler (se construye una vez)"""
+        if self._dict is None:
+            self._dict = {
+                'user_id': str(self.user_id),
+                'name': self.name,
+                'preferences': self.preferences,
+                'budget_range': self.budget_range,
+                'budget_min': self.budget_min,
+                'budget_max': self.budget_max,
+                'mobility_constraints': self.mobility_constraints
+            }
+        return self._dict
+
 
 class UserProfiler:
     """Procesador de perfiles de usuario con reglas de negocio"""
@@ -24,7 +104,9 @@ class UserProfiler:
         self,
         user_profile: Dict,
         context: Optional[Dict] = None,
-        enable_trace: bool = False
+        enable_trace: bool = False,
+        parallel: bool = False,
+        incremental: bool = False
     ) -> InferenceResult:
         """
         Enriquecer perfil de usuario aplicando reglas
@@ -33,6 +115,12 @@ class UserProfiler:
             user_profile: Perfil del usuario
             context: Contexto adicional (fecha, hora, clima, etc.)
             enable_trace: Si guardar traza de ejecución
+            parallel: Si ejecutar las categorías en hilos y combinar los
+                resultados (vuelve a secuencial si dos categorías escriben
+                la misma clave)
+            incremental: Si reutilizar los resultados de condición de la
+                inferencia anterior del mismo user_id (solo se reevalúan
+                las reglas que leen hechos que cambiaron)
             
         Returns:
             InferenceResult: Perfil enriquecido con metadatos
@@ -42,28 +130,42 @@ class UserProfiler:
         # Construir working memory inicial
         working_memory = self._build_working_memory(user_profile, context)
         
-        # Ejecutar inferencia solo con reglas de perfil
-        wm_enriched = self.engine.infer_by_category(
-            working_memory=working_memory,
-            category='profile',
-            enable_trace=enable_trace
-        )
+        categories = self._categories_for(context)
         
-        # Aplicar también reglas temporales si hay contexto de tiempo
-        if context and ('current_time' in context or 'current_date' in context):
-            wm_enriched = self.engine.infer_by_category(
-                working_memory=wm_enriched,
-                category='temporal',
-                enable_trace=enable_trace
-            )
+        # Mismo perfil y contexto equivalente: reutilizar lo inferido
+        cache_key = self._result_cache_key(working_memory, context, categories, enable_trace)
+        cached = _RESULT_CACHE.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            working_memory.update(deepcopy(cached))
+            result = InferenceResult(working_memory)
+            logger.info(f"Perfil enriquecido desde caché: {result.rules_fired_count} reglas aplicadas")
+            return result
         
-        # Aplicar reglas de clima si hay información meteorológica
-        if context and 'weather' in context:
-            wm_enriched = self.engine.infer_by_category(
-                working_memory=wm_enriched,
-                category='weather',
-                enable_trace=enable_trace
-            )
+        wm_enriched = None
+        if parallel and len(categories) > 1:
+            wm_enriched = self._infer_categories_parallel(working_memory, categories, enable_trace)
+        
+        if wm_enriched is None and incremental and working_memory.get('user_id') is not None:
+            wm_enriched = self._infer_incremental(working_memory, categories, enable_trace)
+        
+        if wm_enriched is None:
+            # Solo la última pasada deja metadatos (las anteriores se sobrescribían)
+            wm_enriched = working_memory
+            for position, category in enumerate(categories, start=1):
+                wm_enriched = self.engine.infer_by_category(
+                    working_memory=wm_enriched,
+                    category=category,
+                    enable_trace=enable_trace,
+                    with_metadata=(position == len(categories))
+                )
+        
+        if cache_key is not None:
+            if len(_RESULT_CACHE) >= _RESULT_CACHE_SIZE:
+                _RESULT_CACHE.clear()
+            _RESULT_CACHE[cache_key] = deepcopy({
+                key: value for key, value in wm_enriched.items()
+                if key not in working_memory or working_memory[key] is not value
+            })
         
         result = InferenceResult(wm_enriched)
         
@@ -74,6 +176,259 @@ class UserProfiler:
         
         return result
     
+    @staticmethod
+    def _result_cache_key(
+        working_memory: Dict,
+        context: Optional[Dict],
+        categories: List[str],
+        enable_trace: bool
+    ) -> Optional[Tuple]:
+        """
+        Clave de caché de enrich_profile (None = no cachear)
+        
+        Parte de RulesBase.condition_key, que agrupa la hora en franjas y la
+        fecha en fin de semana o no, así que peticiones del mismo perfil con
+        horas cercanas comparten resultado. Se agregan los tipos de los
+        valores que las acciones copian o formatean tal cual.
+        """
+        if context and any(field in context for field in ('computed_profile', *_APPEND_ONLY_FIELDS)):
+            return None
+        
+        try:
+            cache_key = (
+                RulesBase.condition_key(working_memory),
+                type(working_memory.get('weather', {}).get('temperature')),
+                type(working_memory.get('mobility_constraints', {}).get('max_walking_distance')),
+                tuple(categories),
+                enable_trace,
+            )
+            hash(cache_key)
+        except Exception:
+            return None
+        
+        return cache_key
+    
+    @staticmethod
+    def clear_cache():
+        """Vaciar la caché de resultados (p. ej. tras cambiar las reglas)"""
+        _RESULT_CACHE.clear()
+    
+    def cache_bucket(
+        self,
+        user_profile: Dict,
+        context: Optional[Dict] = None,
+        enable_trace: bool = False
+    ) -> Optional[str]:
+        """
+        Franja estable entre procesos para cachear resultados fuera del proceso
+        
+        Resume la misma clave que usa la caché local de enrich_profile (ver
+        _result_cache_key) en un hash hexadecimal; los valores que no son
+        escalares se representan por su tipo para que el texto no dependa
+        del proceso.
+        
+        Returns:
+            Optional[str]: Franja, o None si el resultado no se debe cachear
+        """
+        working_memory = self._build_working_memory(user_profile, context)
+        cache_key = self._result_cache_key(
+            working_memory, context, self._categories_for(context), enable_trace
+        )
+        if cache_key is None:
+            return None
+        
+        condition_key, *rest = cache_key
+        stable_key = (
+            tuple(
+                value if isinstance(value, (str, int, float, type(None))) else ('~', type(value).__name__)
+                for value in condition_key
+            ),
+            *(part.__name__ if isinstance(part, type) else part for part in rest),
+        )
+        return hashlib.blake2b(repr(stable_key).encode(), digest_size=8).hexdigest()
+    
+    def _infer_incremental(
+        self,
+        working_memory: Dict,
+        categories: List[str],
+        enable_trace: bool
+    ) -> Dict:
+        """
+        Ejecutar las categorías en secuencia reutilizando la inferencia previa
+        
+        Compara la memoria inicial con la de la última inferencia del mismo
+        user_id; cada categoría recibe como cambiados esos hechos y los que
+        escribieron las categorías anteriores (su memoria de entrada no es la
+        inicial), y guarda solo resultados que no dependen de estos últimos.
+        
+        Returns:
+            Dict: Memoria de trabajo enriquecida
+        """
+        state_key = str(working_memory['user_id'])
+        prior_facts, prior_conditions = _INFERENCE_STATE.get(state_key, ({}, {}))
+        changed_facts = self._changed_facts(prior_facts, working_memory)
+        
+        conditions = {}
+        wm_enriched = working_memory
+        for position, category in enumerate(categories, start=1):
+            upstream = {
+                key for key in wm_enriched
+                if key not in working_memory or wm_enriched[key] is not working_memory[key]
+            }
+            wm_enriched, category_conditions = self.engine.infer_incremental_by_category(
+                working_memory=wm_enriched,
+                category=category,
+                prior_conditions=prior_conditions.get(category, {}),
+                changed_facts=changed_facts | upstream,
+                enable_trace=enable_trace,
+                with_metadata=(position == len(categories))
+            )
+            conditions[category] = {
+                rule_id: hit for rule_id, hit in category_conditions.items()
+                if hit[1].isdisjoint(upstream)
+            }
+        
+        if len(_INFERENCE_STATE) >= _INFERENCE_STATE_SIZE:
+            _INFERENCE_STATE.clear()
+        _INFERENCE_STATE[state_key] = (deepcopy(working_memory), conditions)
+        
+        return wm_enriched
+    
+    @staticmethod
+    def _changed_facts(prior_facts: Dict, working_memory: Dict) -> Set[str]:
+        """Claves de la memoria inicial distintas a las de la inferencia previa"""
+        if not prior_facts:
+            return set(working_memory)
+        
+        changed = set()
+        for key in prior_facts.keys() | working_memory.keys():
+            try:
+                if key not in prior_facts or key not in working_memory or prior_facts[key] != working_memory[key]:
+                    changed.add(key)
+            except Exception:
+                changed.add(key)
+        return changed
+    
+    def _infer_categories_parallel(
+        self,
+        working_memory: Dict,
+        categories: List[str],
+        enable_trace: bool
+    ) -> Optional[Dict]:
+        """
+        Ejecutar cada categoría en un hilo sobre la misma memoria inicial
+        
+        Las condiciones de cada categoría solo leen datos de entrada, así que
+        los resultados se pueden combinar si las categorías escriben claves
+        distintas de computed_profile: las listas de solo agregar se
+        concatenan en el orden de las categorías y los metadatos son los de
+        la última (como en la ejecución secuencial).
+        
+        Returns:
+            Optional[Dict]: Memoria combinada, o None si hay conflicto
+        """
+        last = len(categories)
+        with ThreadPoolExecutor(max_workers=last) as executor:
+            results = list(executor.map(
+                lambda item: self.engine.infer_by_category(
+                    working_memory=working_memory,
+                    category=item[1],
+                    enable_trace=enable_trace,
+                    with_metadata=(item[0] == last)
+                ),
+                enumerate(categories, start=1)
+            ))
+        
+        initial_profile = working_memory.get('computed_profile', {})
+        merged = dict(working_memory)
+        merged_profile = dict(initial_profile)
+        written_by = {}
+        
+        for category, wm_category in zip(categories, results):
+            for key, value in wm_category.items():
+                if key in _APPEND_ONLY_FIELDS:
+                    initial = working_memory.get(key, [])
+                    if value[:len(initial)] != initial:
+                        return None
+                    merged[key] = list(merged.get(key, initial)) + value[len(initial):]
+                elif key == 'computed_profile':
+                    for profile_key, profile_value in value.items():
+                        if profile_key in initial_profile and initial_profile[profile_key] == profile_value:
+                            continue
+                        if written_by.setdefault(profile_key, category) != category:
+                            logger.info(
+                                f"'{profile_key}' escrito por {written_by[profile_key]} y {category}: "
+                                f"se ejecuta en secuencia"
+                            )
+                            return None
+                        merged_profile[profile_key] = profile_value
+                elif key == 'inference_metadata':
+                    merged[key] = value
+                elif key not in working_memory or working_memory[key] is not value:
+                    if written_by.setdefault(key, category) != category:
+                        return None
+                    merged[key] = value
+        
+        merged['computed_profile'] = merged_profile
+        return merged
+    
+    def enrich_profiles_batch(
+        self,
+        user_profiles: List[Dict],
+        context: Optional[Dict] = None,
+        enable_trace: bool = False
+    ) -> List[InferenceResult]:
+        """
+        Enriquecer varios perfiles con el mismo contexto
+        
+        Cada perfil conserva su propia working memory (las reglas razonan
+        sobre un solo usuario), pero cada categoría se ejecuta una vez para
+        todo el lote con infer_batch, que evalúa las condiciones numéricas
+        de todas las filas a la vez.
+        
+        Args:
+            user_profiles: Perfiles de usuario
+            context: Contexto compartido (fecha, hora, clima, etc.)
+            enable_trace: Si guardar traza de ejecución
+            
+        Returns:
+            List[InferenceResult]: Resultados en el mismo orden que los perfiles
+        """
+        logger.info(f"Enriqueciendo {len(user_profiles)} perfiles de usuario")
+        
+        working_memories = [
+            self._build_working_memory(user_profile, context)
+            for user_profile in user_profiles
+        ]
+        
+        categories = self._categories_for(context)
+        
+        for position, category in enumerate(categories, start=1):
+            working_memories = self.engine.infer_batch_by_category(
+                working_memories=working_memories,
+                category=category,
+                enable_trace=enable_trace,
+                with_metadata=(position == len(categories))
+            )
+        
+        return [InferenceResult(wm_enriched) for wm_enriched in working_memories]
+    
+    @staticmethod
+    def _categories_for(context: Optional[Dict]) -> List[str]:
+        """Categorías de reglas a aplicar según el contexto disponible"""
+        # Siempre reglas de perfil
+        categories = ['profile']
+        
+        # Aplicar también reglas temporales si hay contexto de tiempo
+        if context and ('current_time' in context or 'current_date' in context):
+            categories.append('temporal')
+        
+        # Aplicar reglas de clima si hay información meteorológica
+        if context and 'weather' in context:
+            categories.append('weather')
+        
+        return categories
+    
     def _build_working_memory(
         self,
         user_profile: Dict,
@@ -93,7 +448,7 @@ class UserProfiler:
             # Datos del perfil
             'user_id': user_profile.get('user_id'),
             'name': user_profile.get('name'),
-            'preferences': user_profile.get('preferences', {}),
+            'preferences': _intern_keys(user_profile.get('preferences', {})),
             'budget_range': user_profile.get('budget_range'),
             'budget_min': user_profile.get('budget_min'),
             'budget_max': user_profile.get('budget_max'),
@@ -108,14 +463,14 @@ class UserProfiler:
         
         # Agregar contexto si existe
         if context:
-            wm.update(context)
-        
-        # Agregar timestamp si no existe
-        if 'current_date' not in wm:
-            wm['current_date'] = datetime.now()
+            wm.update(_intern_keys(context))
         
-        if 'current_time' not in wm:
-            wm['current_time'] = datetime.now().time()
+        # Agregar timestamp si no existe (un solo datetime.now() por petición,
+        # truncado al minuto; las reglas temporales lo leen de aquí)
+        if 'current_date' not in wm or 'current_time' not in wm:
+            now = datetime.now().replace(second=0, microsecond=0)
+            wm.setdefault('current_date', now)
+            wm.setdefault('current_time', now.time())
         
         return wm
     
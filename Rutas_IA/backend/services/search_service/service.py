@@ -8,7 +8,7 @@ from fastapi import HTTPException, status
 
 from .bfs_algorithm import BFSAlgorithm, BFSResult
 from shared.database.models import Attraction, UserProfile
-from shared.schemas.attraction import AttractionRead
+from shared.schemas import ATTRACTION_LIST_ADAPTER
 from shared.utils.logger import setup_logger
 from shared.config.constants import(
     get_categories_from_interests,
@@ -73,7 +73,7 @@ class SearchService:
                 ).first()
                 
                 if user_profile:
-                    preferences = user_profile.preferences or {}
+                    preferences = user_profile.preferences
                     
                     # Extraer intereses para filtro de categorías
                     interests = preferences.get('interests', [])
@@ -148,12 +148,18 @@ class SearchService:
             )
             
             # Formatear resultados
+            # Todas las atracciones en una sola validación/serialización
+            attractions_data = ATTRACTION_LIST_ADAPTER.dump_python(
+                ATTRACTION_LIST_ADAPTER.validate_python(
+                    [candidate['attraction'] for candidate in result.candidates],
+                    from_attributes=True
+                )
+            )
+            
             candidates_formatted = []
-            for candidate in result.candidates:
-                attraction = candidate['attraction']
-                
+            for candidate, attraction_data in zip(result.candidates, attractions_data):
                 candidates_formatted.append({
-                    'attraction': AttractionRead.model_validate(attraction).model_dump(),
+                    'attraction': attraction_data,
                     'depth': candidate['depth'],
                     'distance_from_start_meters': candidate['distance_from_start'],
                     'time_from_start_minutes': candidate['time_from_start'],
@@ -4,11 +4,11 @@ Endpoints REST para gestión de perfiles de usuario
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from services.auth.dependencies import get_current_user
 from shared.database.models import User
 
-from shared.database.base import get_db
+from shared.database.base import get_async_db
 from shared.schemas.user_profile import (
     UserProfileCreate,
     UserProfileUpdate,
@@ -16,6 +16,7 @@ from shared.schemas.user_profile import (
     UserProfileWithStats
 )
 from shared.schemas.base import MessageResponse
+from shared.schemas import USER_PROFILE_LIST_ADAPTER, dump_orm_list
 from .service import UserProfileService
 
 router = APIRouter(
@@ -31,17 +32,17 @@ router = APIRouter(
     summary="Crear un perfil de usuario",
     description="Crea un nuevo perfil vinculado a un usuario existente"
 )
-def create_user_profile(
+async def create_user_profile(
     data: UserProfileCreate,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Crear un nuevo perfil de usuario.
     
     Requiere el ID del usuario registrado (user_id).
     """
-    return UserProfileService.create(db, current_user.id, data)  
+    return await UserProfileService.create(db, current_user.id, data)  
 
 
 @router.get(
@@ -50,16 +51,16 @@ def create_user_profile(
     summary="Listar perfiles de usuario",
     description="Obtiene una lista paginada de perfiles"
 )
-def list_user_profiles(
+async def list_user_profiles(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     budget_range: Optional[str] = Query(None, description="Filtrar por rango de presupuesto"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Listar perfiles de usuario con paginación.
     """
-    profiles, total = UserProfileService.get_all(
+    profiles, total = await UserProfileService.get_all(
         db=db,
         skip=skip,
         limit=limit,
@@ -70,7 +71,7 @@ def list_user_profiles(
         "total": total,
         "skip": skip,
         "limit": limit,
-        "items": [UserProfileRead.model_validate(p) for p in profiles]
+        "items": dump_orm_list(USER_PROFILE_LIST_ADAPTER, profiles)
     }
 
 
@@ -80,14 +81,14 @@ def list_user_profiles(
     summary="Obtener un perfil",
     description="Obtiene los detalles de un perfil específico"
 )
-def get_user_profile(
+async def get_user_profile(
     profile_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener perfil por ID.
     """
-    return UserProfileService.get_or_404(db, profile_id)
+    return await UserProfileService.get_or_404(db, profile_id)
 
 
 @router.get(
@@ -96,14 +97,14 @@ def get_user_profile(
     summary="Obtener perfil por User ID",
     description="Obtiene el perfil asociado a un ID de usuario de login"
 )
-def get_profile_by_user_id(
+async def get_profile_by_user_id(
     user_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener el perfil vinculado a un usuario específico.
     """
-    profile = UserProfileService.get_by_user_id(db, user_id)
+    profile = await UserProfileService.get_by_user_id(db, user_id)
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,14 +119,14 @@ def get_profile_by_user_id(
     summary="Obtener perfil con estadísticas",
     description="Perfil con estadísticas de actividad (itinerarios, ratings)"
 )
-def get_user_profile_with_stats(
+async def get_user_profile_with_stats(
     profile_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener perfil con estadísticas completas.
     """
-    stats = UserProfileService.get_with_statistics(db, profile_id)
+    stats = await UserProfileService.get_with_statistics(db, profile_id)
     if isinstance(stats, dict) and '_sa_instance_state' in stats:
         stats.pop('_sa_instance_state', None)
     return stats
@@ -137,16 +138,16 @@ def get_user_profile_with_stats(
     summary="Obtener recomendaciones personalizadas",
     description="Recomendaciones de atracciones basadas en preferencias del usuario"
 )
-def get_recommendations(
+async def get_recommendations(
     profile_id: int = Path(..., gt=0),
     destination_id: Optional[int] = Query(None, description="Filtrar por destino"),
     limit: int = Query(10, ge=1, le=50, description="Número de recomendaciones"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtener recomendaciones personalizadas.
     """
-    return UserProfileService.get_recommendations(
+    return await UserProfileService.get_recommendations(
         db=db,
         profile_id=profile_id,
         destination_id=destination_id,
@@ -160,15 +161,15 @@ def get_recommendations(
     summary="Actualizar un perfil",
     description="Actualiza las preferencias y datos del perfil"
 )
-def update_user_profile(
+async def update_user_profile(
     profile_id: int = Path(..., gt=0),
     data: UserProfileUpdate = ..., # type: ignore
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Actualizar perfil de usuario.
     """
-    return UserProfileService.update(db, profile_id, data)
+    return await UserProfileService.update(db, profile_id, data)
 
 
 @router.delete(
@@ -177,11 +178,11 @@ def update_user_profile(
     summary="Eliminar un perfil",
     description="Elimina un perfil y todos sus datos asociados"
 )
-def delete_user_profile(
+async def delete_user_profile(
     profile_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Eliminar perfil de usuario.
     """
-    return UserProfileService.delete(db, profile_id)
\ No newline at end of file
+    return await UserProfileService.delete(db, profile_id)
\ No newline at end of file
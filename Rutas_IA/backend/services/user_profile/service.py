@@ -4,9 +4,11 @@ Servicio CRUD para gestión de perfiles de usuario
 Incluye preferencias para personalización de recomendaciones
 """
 from typing import List, Optional, Tuple, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.orm.attributes import flag_modified
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from shared.database.models.attraction import Attraction
 from shared.database.models import UserProfile, AttractionRating, Itinerary
@@ -16,16 +18,26 @@ from shared.schemas.user_profile import (
     UserProfileUpdate,
     PreferencesSchema
 )
+from shared.cache import rules_cache
+from shared.utils.numbers import optional_float
 from shared.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Columnas JSONB NOT NULL: un null explícito se guarda como objeto vacío
+_JSON_OBJECT_FIELDS = ('preferences', 'mobility_constraints')
+
 
 class UserProfileService:
-    """Servicio para operaciones CRUD de perfiles de usuario"""
+    """
+    Servicio para operaciones CRUD de perfiles de usuario
+    
+    Los métodos son corrutinas sobre AsyncSession: mientras esperan a la
+    base de datos el event loop atiende otras peticiones.
+    """
     
     @staticmethod
-    def create(db: Session, user_id: int, data: UserProfileCreate) -> UserProfile:
+    async def create(db: AsyncSession, user_id: int, data: UserProfileCreate) -> UserProfile:
         """
         Crear un nuevo perfil de usuario vinculado a un User ID
         
@@ -39,7 +51,7 @@ class UserProfileService:
         """
         try:
             # 1. Verificar que el usuario no tenga ya un perfil (Relación 1 a 1)
-            existing_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+            existing_profile = await UserProfileService.get_by_user_id(db, user_id)
             if existing_profile:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -48,9 +60,7 @@ class UserProfileService:
 
             # 2. Verificar si el email opcional ya existe en otro perfil
             if data.email:
-                existing_email = db.query(UserProfile).filter(
-                    UserProfile.email == data.email
-                ).first()
+                existing_email = await UserProfileService.get_by_email(db, data.email)
                 
                 if existing_email:
                     raise HTTPException(
@@ -63,12 +73,16 @@ class UserProfileService:
             if isinstance(profile_data.get('preferences'), PreferencesSchema):
                 profile_data['preferences'] = profile_data['preferences'].model_dump()
             
+            for field in _JSON_OBJECT_FIELDS:
+                if profile_data.get(field) is None:
+                    profile_data[field] = {}
+            
             # 3. Crear el perfil inyectando el user_id
             profile = UserProfile(user_id=user_id, **profile_data)
             
             db.add(profile)
-            db.commit()
-            db.refresh(profile)
+            await db.commit()
+            await db.refresh(profile)
             
             logger.info(f"Perfil creado para User ID {user_id}: {profile.name} (ID: {profile.id})")
             return profile
@@ -76,7 +90,7 @@ class UserProfileService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             # Capturar errores de integridad de FK (si el usuario no existe)
             if "foreign key constraint" in str(e).lower():
                 raise HTTPException(
@@ -91,24 +105,26 @@ class UserProfileService:
             )
     
     @staticmethod
-    def get(db: Session, profile_id: int) -> Optional[UserProfile]:
+    async def get(db: AsyncSession, profile_id: int) -> Optional[UserProfile]:
         """Obtener un perfil por ID"""
-        return db.query(UserProfile).filter(UserProfile.id == profile_id).first()
+        return await db.get(UserProfile, profile_id)
     
     @staticmethod
-    def get_by_user_id(db: Session, user_id: int) -> Optional[UserProfile]:
+    async def get_by_user_id(db: AsyncSession, user_id: int) -> Optional[UserProfile]:
         """Obtener un perfil por user_id (Integer)"""
-        return db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        result = await db.execute(select(UserProfile).where(UserProfile.user_id == user_id))
+        return result.scalars().first()
     
     @staticmethod
-    def get_by_email(db: Session, email: str) -> Optional[UserProfile]:
+    async def get_by_email(db: AsyncSession, email: str) -> Optional[UserProfile]:
         """Obtener un perfil por email"""
-        return db.query(UserProfile).filter(UserProfile.email == email).first()
+        result = await db.execute(select(UserProfile).where(UserProfile.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def get_or_404(db: Session, profile_id: int) -> UserProfile:
+    async def get_or_404(db: AsyncSession, profile_id: int) -> UserProfile:
         """Obtener un perfil por ID o lanzar 404"""
-        profile = UserProfileService.get(db, profile_id)
+        profile = await UserProfileService.get(db, profile_id)
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -117,8 +133,8 @@ class UserProfileService:
         return profile
     
     @staticmethod
-    def get_all(
-        db: Session,
+    async def get_all(
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
         budget_range: Optional[str] = None
@@ -126,38 +142,44 @@ class UserProfileService:
         """
         Obtener lista de perfiles con filtros y paginación
         """
-        query = db.query(UserProfile)
+        filters = []
         
         if budget_range:
-            query = query.filter(UserProfile.budget_range == budget_range.lower())
+            filters.append(UserProfile.budget_range == budget_range.lower())
         
-        total = query.count()
+        total = await db.scalar(
+            select(func.count(UserProfile.id)).where(*filters)
+        )
         
-        profiles = query.order_by(
-            UserProfile.created_at.desc()
-        ).offset(skip).limit(limit).all()
+        result = await db.execute(
+            select(UserProfile).where(*filters).order_by(
+                UserProfile.created_at.desc()
+            ).offset(skip).limit(limit)
+        )
         
-        return profiles, total
+        return list(result.scalars().all()), total
     
     @staticmethod
-    def update(
-        db: Session,
+    async def update(
+        db: AsyncSession,
         profile_id: int,
         data: UserProfileUpdate
     ) -> UserProfile:
         """
         Actualizar un perfil existente
         """
-        profile = UserProfileService.get_or_404(db, profile_id)
+        profile = await UserProfileService.get_or_404(db, profile_id)
         
         try:
             update_data = data.model_dump(exclude_unset=True)
             
             if 'email' in update_data and update_data['email']:
-                existing = db.query(UserProfile).filter(
-                    UserProfile.email == update_data['email'],
-                    UserProfile.id != profile_id
-                ).first()
+                existing = await db.scalar(
+                    select(UserProfile.id).where(
+                        UserProfile.email == update_data['email'],
+                        UserProfile.id != profile_id
+                    ).limit(1)
+                )
                 
                 if existing:
                     raise HTTPException(
@@ -166,10 +188,16 @@ class UserProfileService:
                     )
             
             for field, value in update_data.items():
+                if value is None and field in _JSON_OBJECT_FIELDS:
+                    value = {}
                 setattr(profile, field, value)
             
-            db.commit()
-            db.refresh(profile)
+            await db.commit()
+            await db.refresh(profile)
+            
+            # Los resultados del motor de reglas cacheados ya no aplican
+            # (cliente Redis síncrono: fuera del event loop)
+            await run_in_threadpool(rules_cache.invalidate_profile, profile_id)
             
             logger.info(f"Perfil actualizado: {profile.name} (ID: {profile.id})")
             return profile
@@ -177,7 +205,7 @@ class UserProfileService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error al actualizar perfil {profile_id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -185,22 +213,24 @@ class UserProfileService:
             )
     
     @staticmethod
-    def delete(db: Session, profile_id: int) -> dict:
+    async def delete(db: AsyncSession, profile_id: int) -> dict:
         """
         Eliminar un perfil
         """
-        profile = UserProfileService.get_or_404(db, profile_id)
+        profile = await UserProfileService.get_or_404(db, profile_id)
         
         try:
             profile_name = profile.name
-            db.delete(profile)
-            db.commit()
+            await db.delete(profile)
+            await db.commit()
+            
+            await run_in_threadpool(rules_cache.invalidate_profile, profile_id)
             
             logger.info(f"Perfil eliminado: {profile_name} (ID: {profile_id})")
             return {"message": f"Perfil '{profile_name}' eliminado exitosamente"}
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error al eliminar perfil {profile_id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -208,30 +238,36 @@ class UserProfileService:
             )
     
     @staticmethod
-    def get_with_statistics(db: Session, profile_id: int) -> Dict:
+    async def get_with_statistics(db: AsyncSession, profile_id: int) -> Dict:
         """
         Obtener perfil con estadísticas de actividad
         """
-        profile = UserProfileService.get_or_404(db, profile_id)
+        profile = await UserProfileService.get_or_404(db, profile_id)
         
-        total_itineraries = db.query(Itinerary).filter(
-            Itinerary.user_profile_id == profile_id
-        ).count()
+        total_itineraries = await db.scalar(
+            select(func.count(Itinerary.id)).where(
+                Itinerary.user_profile_id == profile_id
+            )
+        )
         
-        total_ratings = db.query(AttractionRating).filter(
-            AttractionRating.user_profile_id == profile_id
-        ).count()
+        total_ratings = await db.scalar(
+            select(func.count(AttractionRating.id)).where(
+                AttractionRating.user_profile_id == profile_id
+            )
+        )
         
-        avg_rating_given = db.query(
-            func.avg(AttractionRating.rating)
-        ).filter(
-            AttractionRating.user_profile_id == profile_id
-        ).scalar()
+        avg_rating_given = await db.scalar(
+            select(func.avg(AttractionRating.rating)).where(
+                AttractionRating.user_profile_id == profile_id
+            )
+        )
         
-        completed_itineraries = db.query(Itinerary).filter(
-            Itinerary.user_profile_id == profile_id,
-            Itinerary.status == 'completed'
-        ).count()
+        completed_itineraries = await db.scalar(
+            select(func.count(Itinerary.id)).where(
+                Itinerary.user_profile_id == profile_id,
+                Itinerary.status == 'completed'
+            )
+        )
         
         
         return {
@@ -239,13 +275,13 @@ class UserProfileService:
             "total_itineraries": total_itineraries,
             "completed_itineraries": completed_itineraries,
             "total_ratings": total_ratings,
-            "avg_rating_given": float(avg_rating_given) if avg_rating_given else None,
+            "avg_rating_given": optional_float(avg_rating_given),
             "_sa_instance_state": None
         }
     
     @staticmethod
-    def get_recommendations(
-        db: Session,
+    async def get_recommendations(
+        db: AsyncSession,
         profile_id: int,
         destination_id: Optional[int] = None,
         limit: int = 10
@@ -253,19 +289,21 @@ class UserProfileService:
         """
         Obtener recomendaciones personalizadas basadas en preferencias
         """
-        profile = UserProfileService.get_or_404(db, profile_id)
-        preferences = profile.preferences or {}
+        profile = await UserProfileService.get_or_404(db, profile_id)
+        preferences = profile.preferences
         interests = preferences.get('interests', [])
         
         # Lógica de fallback si no hay intereses
         if not interests:
-            query = db.query(Attraction)
+            query = select(Attraction)
             if destination_id:
-                query = query.filter(Attraction.destination_id == destination_id)
+                query = query.where(Attraction.destination_id == destination_id)
             
-            attractions = query.order_by(
-                Attraction.popularity_score.desc()
-            ).limit(limit).all()
+            attractions = (await db.execute(
+                query.order_by(
+                    Attraction.popularity_score.desc()
+                ).limit(limit)
+            )).scalars().all()
             
             return [
                 {
@@ -277,9 +315,9 @@ class UserProfileService:
                 for attr in attractions
             ]
         
-        query = db.query(Attraction)
+        query = select(Attraction)
         if destination_id:
-            query = query.filter(Attraction.destination_id == destination_id)
+            query = query.where(Attraction.destination_id == destination_id)
         
         # Mapeo simple de intereses
         interest_categories = []
@@ -296,7 +334,7 @@ class UserProfileService:
                 interest_categories.append(cat)
         
         if interest_categories:
-            query = query.filter(Attraction.category.in_(interest_categories))
+            query = query.where(Attraction.category.in_(interest_categories))
         
         # Filtrar por presupuesto
         price_map = {
@@ -310,13 +348,15 @@ class UserProfileService:
         if budget_range and budget_range.lower() in price_map:
              allowed = price_map[budget_range.lower()]
              # Solo filtrar si tenemos datos de precio en las atracciones
-             query = query.filter(Attraction.price_range.in_(allowed))
+             query = query.where(Attraction.price_range.in_(allowed))
              pass 
 
-        attractions = query.order_by(
-            Attraction.rating.desc(),
-            Attraction.popularity_score.desc()
-        ).limit(limit).all()
+        attractions = (await db.execute(
+            query.order_by(
+                Attraction.rating.desc(),
+                Attraction.popularity_score.desc()
+            ).limit(limit)
+        )).scalars().all()
         
         recommendations = []
         for attr in attractions:
@@ -346,42 +386,41 @@ class UserProfileService:
         return recommendations
 
     @staticmethod
-    def update_computed_profile(
-        db: Session,
+    async def update_computed_profile(
+        db: AsyncSession,
         profile_id: int,
         computed_data: Dict
     ) -> UserProfile:
         """Actualizar el perfil computado (usado por ML)"""
-        profile = UserProfileService.get_or_404(db, profile_id)
+        profile = await UserProfileService.get_or_404(db, profile_id)
         try:
             profile.computed_profile = computed_data
-            db.commit()
-            db.refresh(profile)
+            await db.commit()
+            await db.refresh(profile)
             return profile
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     @staticmethod
-    def add_historical_rating(
-        db: Session,
+    async def add_historical_rating(
+        db: AsyncSession,
         profile_id: int,
         attraction_id: int,
         rating: int
     ) -> UserProfile:
         """Agregar rating histórico al perfil"""
-        profile = UserProfileService.get_or_404(db, profile_id)
+        profile = await UserProfileService.get_or_404(db, profile_id)
         try:
             historical_ratings = dict(profile.historical_ratings or {})
             historical_ratings[str(attraction_id)] = rating
             profile.historical_ratings = historical_ratings
             
-            from sqlalchemy.orm.attributes import flag_modified
             flag_modified(profile, "historical_ratings")
             
-            db.commit()
-            db.refresh(profile)
+            await db.commit()
+            await db.refresh(profile)
             return profile
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,93 @@
+# shared/cache/rules_cache.py
+"""
+Caché en Redis de resultados del motor de reglas
+
+Las claves tienen la forma rules:{user_profile_id}:{tipo}:{franja}, así que
+todos los resultados de un perfil se invalidan con un solo SCAN. Si Redis no
+está disponible la caché se ignora: las peticiones siguen calculando.
+"""
+from typing import Any, Optional
+import orjson
+import redis  # type: ignore
+
+from shared.config.settings import get_settings
+from shared.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+_client: Optional[redis.Redis] = None
+
+
+def _get_client() -> redis.Redis:
+    """Obtener el cliente de Redis (se crea en el primer uso)"""
+    global _client
+    if _client is None:
+        _client = redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+    return _client
+
+
+def _key(user_profile_id: int, kind: str, bucket: str) -> str:
+    """Clave de Redis de un resultado cacheado"""
+    return f"rules:{user_profile_id}:{kind}:{bucket}"
+
+
+def get_cached(user_profile_id: int, kind: str, bucket: str) -> Optional[Any]:
+    """
+    Leer un resultado cacheado
+    
+    Args:
+        user_profile_id: ID del perfil de usuario
+        kind: Tipo de resultado (enrich, recommendations)
+        bucket: Franja del contexto (ver UserProfiler.cache_bucket)
+    
+    Returns:
+        Optional[Any]: Resultado, o None si no está (o Redis falla)
+    """
+    try:
+        cached = _get_client().get(_key(user_profile_id, kind, bucket))
+    except redis.RedisError as e:
+        logger.warning(f"Caché de reglas no disponible: {str(e)}")
+        return None
+    
+    return orjson.loads(cached) if cached is not None else None
+
+
+def set_cached(user_profile_id: int, kind: str, bucket: str, payload: Any):
+    """
+    Guardar un resultado con expiración RULES_CACHE_TTL
+    
+    Args:
+        user_profile_id: ID del perfil de usuario
+        kind: Tipo de resultado (enrich, recommendations)
+        bucket: Franja del contexto (ver UserProfiler.cache_bucket)
+        payload: Resultado serializable a JSON
+    """
+    try:
+        _get_client().set(
+            _key(user_profile_id, kind, bucket),
+            orjson.dumps(payload),
+            ex=settings.RULES_CACHE_TTL
+        )
+    except (redis.RedisError, TypeError) as e:
+        logger.warning(f"No se pudo cachear resultado de reglas: {str(e)}")
+
+
+def invalidate_profile(user_profile_id: int):
+    """
+    Eliminar todos los resultados cacheados de un perfil
+    
+    Args:
+        user_profile_id: ID del perfil de usuario
+    """
+    try:
+        client = _get_client()
+        keys = list(client.scan_iter(match=f"rules:{user_profile_id}:*", count=100))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"No se pudo invalidar caché del perfil {user_profile_id}: {str(e)}")
@@ -1,4 +1,5 @@
 # shared/config/settings.py
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -11,9 +12,16 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    RULES_CACHE_TTL: int = 300  # segundos (resultados del motor de reglas)
+    GRAPH_CACHE_TTL: int = 300  # segundos (grafos de destino en memoria)
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10  # por engine (síncrono y asyncpg)
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 5  # segundos esperando conexión libre
+    DB_POOL_RECYCLE: int = 1800  # segundos
+    DB_POOL_PRE_PING: bool = True
     
     # JWT
     SECRET_KEY: str  # SIN valor por defecto
@@ -35,19 +43,27 @@ class Settings(BaseSettings):
         extra="ignore"
     )
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        
-        # Validar que SECRET_KEY exista y sea seguro
-        if not self.SECRET_KEY:
+    @field_validator("SECRET_KEY")
+    @classmethod
+    def validate_secret_key(cls, value: str) -> str:
+        """Validar que SECRET_KEY exista y sea seguro (parte de la validación del modelo)"""
+        if not value:
             raise ValueError("SECRET_KEY must be set in .env file")
         
-        if len(self.SECRET_KEY) < 32:
+        if len(value) < 32:
             raise ValueError("SECRET_KEY must be at least 32 characters long")
         
-        if self.SECRET_KEY in ["secret", "changeme"]:
+        if value in ["secret", "changeme"]:
             raise ValueError("SECRET_KEY must not be a default/example value")
+        
+        return value
+
 
 @lru_cache()
 def get_settings() -> Settings:
+    """
+    Configuración del proceso (se construye una sola vez)
+    
+    En tests, get_settings.cache_clear() fuerza a releer el entorno.
+    """
     return Settings()
\ No newline at end of file
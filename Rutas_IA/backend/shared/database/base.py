@@ -1,16 +1,43 @@
+from functools import lru_cache
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from shared.config.settings import get_settings
 
 settings = get_settings()
 
+
+def _pool_options() -> dict:
+    """Parámetros del pool de conexiones (ver DB_POOL_* en Settings)"""
+    return {
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING
+    }
+
+
+def _json_dumps(value) -> str:
+    """Serializar columnas JSON/JSONB con orjson (el driver espera str)"""
+    return orjson.dumps(value).decode()
+
+
+def _engine_options() -> dict:
+    """Opciones comunes de ambos engines: pool y (de)serialización JSON con orjson"""
+    return {
+        **_pool_options(),
+        'json_serializer': _json_dumps,
+        'json_deserializer': orjson.loads
+    }
+
+
 # Engine síncrono para Alembic
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
+    **_engine_options()
 )
 
 SessionLocal = sessionmaker(
@@ -28,4 +55,34 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@lru_cache()
+def get_async_sessionmaker():
+    """
+    Fábrica de sesiones asíncronas (asyncpg)
+    
+    El engine se crea en el primer uso para que Alembic y los scripts, que
+    solo usan el engine síncrono, no abran otro pool ni importen asyncpg.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    
+    async_engine = create_async_engine(
+        make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        **_engine_options()
+    )
+    
+    # Sin expirar al hacer commit: en async no hay carga implícita de atributos
+    return async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Dependency para endpoints async
+async def get_async_db():
+    """Generador de sesión asíncrona de base de datos"""
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -4,11 +4,11 @@ Modelo para atracciones turísticas
 """
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, 
-    Boolean, Numeric, ForeignKey, func, Index
+    Boolean, Numeric, ForeignKey, func, Index, Computed, text
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
-from geoalchemy2 import Geography # type: ignore
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from geoalchemy2 import Geography, Geometry # type: ignore
 from shared.database.base import Base
 
 
@@ -38,11 +38,28 @@ class Attraction(Base):
     subcategory = Column(String(100), index=True)
     tags = Column(JSONB)  # Array de tags: ['museo', 'arte', 'historia']
     
+    # Texto de búsqueda precalculado (nombre > tags > descripción); diferido
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+            "setweight(jsonb_to_tsvector('spanish', coalesce(tags, '[]'::jsonb), '[\"string\"]'), 'B') || "
+            "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    ))
+    
     # Ubicación
     location = Column(
         Geography(geometry_type='POINT', srid=4326),
         nullable=False
     )
+    # Proyección Web Mercator (generada por la BD) para búsquedas por radio
+    # con distancia plana; diferida: solo la usa search_nearby
+    location_xy = deferred(Column(
+        Geometry(geometry_type='POINT', srid=3857, spatial_index=False),
+        Computed("ST_Transform(location::geometry, 3857)", persisted=True)
+    ))
     address = Column(String(500))
     
     # Tiempos y costos
@@ -82,40 +99,43 @@ class Attraction(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relaciones
-    destination = relationship("Destination", backref="attractions")
+    destination = relationship("Destination", back_populates="attractions")
+    reviews = relationship("Review", back_populates="attraction")
+    user_ratings = relationship("AttractionRating", back_populates="attraction")
+    outgoing_connections = relationship(
+        "AttractionConnection",
+        foreign_keys="AttractionConnection.from_attraction_id",
+        back_populates="from_attraction"
+    )
+    incoming_connections = relationship(
+        "AttractionConnection",
+        foreign_keys="AttractionConnection.to_attraction_id",
+        back_populates="to_attraction"
+    )
 
     # Índices compuestos
     __table_args__ = (
         Index('idx_attraction_location', 'location', postgresql_using='gist'),
+        Index('idx_attr_loc_xy', 'location_xy', postgresql_using='gist'),
+        Index('idx_attr_search_tsv', 'search_tsv', postgresql_using='gin'),
         Index('idx_attraction_category_rating', 'category', 'rating'),
+        # Top por categoría dentro de un destino (get_by_category con destino)
+        Index('idx_attr_dest_cat_rating', 'destination_id', 'category', rating.desc()),
+        # Parcial: listados con verified_only (filtro por categoría, orden por popularidad)
+        Index(
+            'idx_attr_verified_cat_pop', 'category', popularity_score.desc(),
+            postgresql_where=text('verified = true')
+        ),
+        # GIN (jsonb_path_ops) para filtros de contención: tags @> '["museo"]'
+        Index(
+            'idx_attraction_tags_gin', 'tags',
+            postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'}
+        ),
+        Index(
+            'idx_attraction_accessibility_gin', 'accessibility',
+            postgresql_using='gin', postgresql_ops={'accessibility': 'jsonb_path_ops'}
+        ),
     )
 
     def __repr__(self):
         return f"<Attraction(id={self.id}, name='{self.name}', category='{self.category}')>"
-
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "destination_id": self.destination_id,
-            "name": self.name,
-            "description": self.description,
-            "category": self.category,
-            "subcategory": self.subcategory,
-            "tags": self.tags,
-            "address": self.address,
-            "average_visit_duration": self.average_visit_duration,
-            "price_range": self.price_range,
-            "price_min": float(self.price_min) if self.price_min else None, # type: ignore
-            "price_max": float(self.price_max) if self.price_max else None, # type: ignore
-            "opening_hours": self.opening_hours,
-            "rating": float(self.rating) if self.rating else None, # type: ignore
-            "total_reviews": self.total_reviews,
-            "popularity_score": float(self.popularity_score) if self.popularity_score else None, # type: ignore
-            "verified": self.verified,
-            "accessibility": self.accessibility,
-            "extra_data": self.extra_data,
-            "images": self.images,
-            "created_at": self.created_at.isoformat() if self.created_at else None, # type: ignore
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None, # type: ignore
-        }
\ No newline at end of file
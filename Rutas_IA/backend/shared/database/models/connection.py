@@ -4,7 +4,7 @@ Modelo para conexiones entre atracciones (aristas del grafo)
 """
 from sqlalchemy import (
     Column, Integer, String, Numeric, 
-    ForeignKey, DateTime, func, Index
+    ForeignKey, DateTime, func, Index, Computed
 )
 from sqlalchemy.orm import relationship
 from geoalchemy2 import Geography # type: ignore
@@ -54,6 +54,12 @@ class AttractionConnection(Base):
     traffic_factor = Column(Numeric(3, 2), default=1.0)
     # Factor de tráfico: 1.0 = normal, >1.0 = más lento
     
+    # Tiempo ponderado por tráfico (columna generada: ordenable e indexable)
+    weighted_time = Column(
+        Numeric(10, 2),
+        Computed("travel_time_minutes * COALESCE(traffic_factor, 1.0)", persisted=True)
+    )
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -62,18 +68,20 @@ class AttractionConnection(Base):
     from_attraction = relationship(
         "Attraction",
         foreign_keys=[from_attraction_id],
-        backref="outgoing_connections"
+        back_populates="outgoing_connections"
     )
     to_attraction = relationship(
         "Attraction",
         foreign_keys=[to_attraction_id],
-        backref="incoming_connections"
+        back_populates="incoming_connections"
     )
 
     # Índices
     __table_args__ = (
         Index('idx_connection_from_to', 'from_attraction_id', 'to_attraction_id'),
         Index('idx_connection_transport', 'transport_mode'),
+        # Expansión de vecinos ordenada por peso
+        Index('idx_conn_from_weighted', 'from_attraction_id', 'weighted_time'),
     )
 
     def __repr__(self):
@@ -83,22 +91,3 @@ class AttractionConnection(Base):
             f"to={self.to_attraction_id}, "
             f"mode='{self.transport_mode}')>"
         )
-
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "from_attraction_id": self.from_attraction_id,
-            "to_attraction_id": self.to_attraction_id,
-            "distance_meters": float(self.distance_meters) if self.distance_meters else None, # type: ignore
-            "travel_time_minutes": self.travel_time_minutes,
-            "transport_mode": self.transport_mode,
-            "cost": float(self.cost) if self.cost else None, # type: ignore
-            "traffic_factor": float(self.traffic_factor) if self.traffic_factor else None, # type: ignore
-            "created_at": self.created_at.isoformat() if self.created_at else None, # type: ignore
-        }
-
-    @property
-    def weighted_time(self):
-        """Tiempo ponderado considerando el factor de tráfico"""
-        return self.travel_time_minutes * float(self.traffic_factor) # type: ignore
\ No newline at end of file
@@ -37,6 +37,8 @@ class Destination(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    attractions = relationship("Attraction", back_populates="destination")
+
     itineraries = relationship(
         "Itinerary",
         back_populates="destination",
@@ -45,17 +47,3 @@ class Destination(Base):
 
     def __repr__(self):
         return f"<Destination(id={self.id}, name='{self.name}', country='{self.country}')>"
-
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "country": self.country,
-            "state": self.state,
-            "timezone": self.timezone,
-            "description": self.description,
-            "population": self.population,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
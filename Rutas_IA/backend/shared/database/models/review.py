@@ -49,7 +49,7 @@ class Review(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relaciones
-    attraction = relationship("Attraction", backref="reviews")
+    attraction = relationship("Attraction", back_populates="reviews")
 
     # Constraints
     __table_args__ = (
@@ -61,22 +61,6 @@ class Review(Base):
     def __repr__(self):
         return f"<Review(id={self.id}, attraction={self.attraction_id}, source='{self.source}')>"
 
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "attraction_id": self.attraction_id,
-            "source": self.source,
-            "text": self.text,
-            "rating": self.rating,
-            "sentiment_score": float(self.sentiment_score) if self.sentiment_score else None,
-            "sentiment_label": self.sentiment_label,
-            "language": self.language,
-            "author": self.author,
-            "review_date": self.review_date.isoformat() if self.review_date else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
-
 
 class AttractionRating(Base):
     """
@@ -117,8 +101,8 @@ class AttractionRating(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relaciones
-    user_profile = relationship("UserProfile", backref="ratings")
-    attraction = relationship("Attraction", backref="user_ratings")
+    user_profile = relationship("UserProfile", back_populates="ratings")
+    attraction = relationship("Attraction", back_populates="user_ratings")
 
     # Constraints
     __table_args__ = (
@@ -134,16 +118,3 @@ class AttractionRating(Base):
             f"attraction={self.attraction_id}, "
             f"rating={self.rating})>"
         )
-
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "user_profile_id": self.user_profile_id,
-            "attraction_id": self.attraction_id,
-            "rating": self.rating,
-            "visit_date": self.visit_date.isoformat() if self.visit_date else None,
-            "feedback": self.feedback,
-            "visit_context": self.visit_context,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
\ No newline at end of file
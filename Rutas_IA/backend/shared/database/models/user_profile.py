@@ -3,7 +3,7 @@
 Modelo para perfiles de usuario
 """
 from sqlalchemy import (
-    Column, Integer, String, DateTime, func, Index, ForeignKey
+    Column, Integer, String, DateTime, func, Index, ForeignKey, text
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
@@ -32,7 +32,9 @@ class UserProfile(Base):
     email = Column(String(255)) # Ya no es unique aquí estricto, depende del User, pero sirve de contacto
     
     # Preferencias de turismo
-    preferences = Column(JSONB, nullable=False, default={})
+    preferences = Column(
+        JSONB, nullable=False, default={}, server_default=text("'{}'::jsonb")
+    )
     
     # Restricciones presupuestarias
     budget_range = Column(String(20))  # 'bajo', 'medio', 'alto', 'lujo'
@@ -40,7 +42,9 @@ class UserProfile(Base):
     budget_max = Column(Integer)  # Presupuesto máximo por día
     
     # Restricciones de movilidad
-    mobility_constraints = Column(JSONB, default={})
+    mobility_constraints = Column(
+        JSONB, nullable=False, default={}, server_default=text("'{}'::jsonb")
+    )
     
     # Historial de ratings (para el modelo ML)
     historical_ratings = Column(JSONB, default=[])
@@ -60,27 +64,16 @@ class UserProfile(Base):
         cascade="all, delete-orphan"
     )
 
+    ratings = relationship("AttractionRating", back_populates="user_profile")
+
     # Índices
     __table_args__ = (
-        Index('idx_user_preferences', 'preferences', postgresql_using='gin'),
+        # jsonb_path_ops: índice más pequeño, cubre la contención (@>)
+        Index(
+            'idx_user_prefs_path', 'preferences',
+            postgresql_using='gin', postgresql_ops={'preferences': 'jsonb_path_ops'}
+        ),
     )
 
     def __repr__(self):
         return f"<UserProfile(id={self.id}, user_id={self.user_id})>"
-
-    def to_dict(self):
-        """Convierte el modelo a diccionario"""
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "name": self.name,
-            "email": self.email,
-            "preferences": self.preferences,
-            "budget_range": self.budget_range,
-            "budget_min": self.budget_min,
-            "budget_max": self.budget_max,
-            "mobility_constraints": self.mobility_constraints,
-            "computed_profile": self.computed_profile,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
@@ -1,23 +1,32 @@
 # backend/services/shared/graph_loader.py
 from typing import Dict, List, Optional
+from functools import lru_cache
+from time import monotonic
+import numpy as np
 from sqlalchemy.orm import Session
 from geoalchemy2.shape import to_shape # type: ignore
 from shared.database.models import Attraction, AttractionConnection
+from shared.config.settings import get_settings
+
+settings = get_settings()
 
 class GraphDataManager:
     def __init__(self, db: Session, destination_id: int):
-        self.db = db
+        # La sesión solo se usa durante la carga: el grafo puede sobrevivirla en la caché
         self.destination_id = destination_id
         self.nodes: Dict[int, Dict] = {} 
         self.adjacency_list: Dict[int, List[Dict]] = {}
+        # Filas del cierre transitivo ya calculadas (posición de origen → alcanzables)
+        self._reachable_rows: Dict[int, np.ndarray] = {}
         
         # Debug
         print(f"🔧 GraphManager: Iniciando carga para Destination ID: {destination_id}")
-        self._load_data()
+        self._load_data(db)
+        self._build_arrays()
 
-    def _load_data(self):
+    def _load_data(self, db: Session):
         # 1. Cargar Nodos
-        attractions = self.db.query(Attraction).filter(
+        attractions = db.query(Attraction).filter(
             Attraction.destination_id == self.destination_id
         ).all()
         
@@ -67,7 +76,7 @@ class GraphDataManager:
             return
 
         # Carga masiva de conexiones
-        connections = self.db.query(AttractionConnection).filter(
+        connections = db.query(AttractionConnection).filter(
             AttractionConnection.from_attraction_id.in_(attr_ids)
         ).all()
 
@@ -89,6 +98,41 @@ class GraphDataManager:
         
         print(f"🔧 GraphManager: {valid_connections} conexiones válidas cargadas en RAM.")
 
+    def _build_arrays(self):
+        """
+        Construir la vista SoA del grafo: coordenadas en arrays contiguos y
+        aristas en formato CSR, todo indexado por la posición del nodo.
+        Las aristas del nodo i están en edge_*[edge_indptr[i]:edge_indptr[i + 1]].
+        """
+        self.node_ids: List[int] = list(self.nodes.keys())
+        self.id_to_idx: Dict[int, int] = {node_id: idx for idx, node_id in enumerate(self.node_ids)}
+
+        # Coordenadas (NaN si la atracción no tiene ubicación)
+        self.lats = np.array(
+            [node['lat'] if node['lat'] is not None else np.nan for node in self.nodes.values()],
+            dtype=np.float64
+        )
+        self.lons = np.array(
+            [node['lon'] if node['lon'] is not None else np.nan for node in self.nodes.values()],
+            dtype=np.float64
+        )
+
+        indptr = [0]
+        targets, distances, times, costs = [], [], [], []
+        for node_id in self.node_ids:
+            for edge in self.adjacency_list[node_id]:
+                targets.append(self.id_to_idx[edge['to_attraction_id']])
+                distances.append(edge['distance_meters'])
+                times.append(edge['travel_time_minutes'] or 0)
+                costs.append(edge['cost'])
+            indptr.append(len(targets))
+
+        self.edge_indptr = np.array(indptr, dtype=np.int64)
+        self.edge_targets = np.array(targets, dtype=np.int64)
+        self.edge_distances = np.array(distances, dtype=np.float64)
+        self.edge_times = np.array(times, dtype=np.float64)
+        self.edge_costs = np.array(costs, dtype=np.float64)
+
     def get_neighbors(self, attraction_id: int) -> List[Dict]:
         neighbors = self.adjacency_list.get(attraction_id, [])
         # Debug extra si piden vecinos del nodo 1
@@ -97,4 +141,75 @@ class GraphDataManager:
         return neighbors
 
     def get_node(self, attraction_id: int) -> Optional[Dict]:
-        return self.nodes.get(attraction_id)
\ No newline at end of file
+        return self.nodes.get(attraction_id)
+
+    def reachable_from(self, from_id: int) -> np.ndarray:
+        """
+        Fila del cierre transitivo: nodos (por posición) alcanzables desde
+        from_id. Se calcula con un BFS completo la primera vez y se guarda en
+        el grafo, que se recarga cuando se invalida la caché o vence su TTL
+        """
+        source = self.id_to_idx[from_id]
+        row = self._reachable_rows.get(source)
+        if row is not None:
+            return row
+
+        seen = np.zeros(len(self.node_ids), dtype=bool)
+        frontier = [source]
+        seen[source] = True
+
+        while frontier:
+            next_frontier = []
+            for idx in frontier:
+                neighbors = self.edge_targets[self.edge_indptr[idx]:self.edge_indptr[idx + 1]]
+                new = neighbors[~seen[neighbors]]
+                seen[new] = True
+                next_frontier.extend(new.tolist())
+            frontier = next_frontier
+
+        self._reachable_rows[source] = seen
+        return seen
+
+    def is_reachable(self, from_id: int, to_id: int) -> bool:
+        """
+        Indicar si existe algún camino from_id → to_id (consulta al cierre transitivo)
+        """
+        if from_id not in self.id_to_idx or to_id not in self.id_to_idx:
+            return False
+
+        return bool(self.reachable_from(from_id)[self.id_to_idx[to_id]])
+
+
+# Grafos cargados por (engine, destino, generación, ventana de TTL); se
+# comparten entre peticiones y deben tratarse como de solo lectura
+GRAPH_CACHE_SIZE = 8
+
+# Generación de la caché: invalidate_graph_cache la incrementa cuando esta API
+# escribe atracciones o conexiones
+_graph_generation = 0
+
+
+def invalidate_graph_cache() -> None:
+    """
+    Descartar los grafos cacheados. Llamar después del commit que escribe
+    atracciones o conexiones; las escrituras hechas fuera de este proceso
+    (scripts, otros workers) se ven al vencer GRAPH_CACHE_TTL
+    """
+    global _graph_generation
+    _graph_generation += 1
+    _load_graph.cache_clear()
+
+
+@lru_cache(maxsize=GRAPH_CACHE_SIZE)
+def _load_graph(engine, destination_id: int, generation: int, ttl_window: int) -> GraphDataManager:
+    with Session(bind=engine) as db:
+        return GraphDataManager(db, destination_id)
+
+
+def get_cached_graph(db: Session, destination_id: int) -> GraphDataManager:
+    """
+    Obtener el grafo del destino desde la caché del módulo, recargándolo
+    tras invalidate_graph_cache o cuando vence GRAPH_CACHE_TTL (sin consultar la BD)
+    """
+    ttl_window = int(monotonic() // settings.GRAPH_CACHE_TTL)
+    return _load_graph(db.get_bind(), destination_id, _graph_generation, ttl_window)
@@ -2,6 +2,9 @@
 """
 Schemas de Pydantic para validación y serialización de datos
 """
+import os
+from typing import Any, Iterable, List
+
 from .base import (
     TimestampMixin,
     ResponseBase,
@@ -23,6 +26,7 @@ from .attraction import (
     AttractionCreate,
     AttractionUpdate,
     AttractionRead,
+    AttractionListItem,
     AttractionWithDestination,
     AttractionWithDistance,
     AttractionSearchParams,
@@ -54,6 +58,7 @@ from .itinerary import (
     RouteSegment,
     DaySummary,
     DayData,
+    DAY_DATA_ADAPTER,
     ItineraryDayBase,
     ItineraryDayCreate,
     ItineraryDayRead,
@@ -63,7 +68,6 @@ from .itinerary import (
     ItineraryUpdate,
     ItineraryRead,
     ItineraryWithDays,
-    ItineraryWithDetails,
     ItineraryGenerationRequest,
     ItineraryGenerationResponse,
 )
@@ -77,13 +81,53 @@ from .review import (
     AttractionRatingRead
 )
 
-# Resolver forward references (importante para Pydantic v2)
 from pydantic import TypeAdapter
 
-# Esto fuerza la resolución de las forward references
-AttractionWithDestination.model_rebuild()
-ConnectionWithAttractions.model_rebuild()
-ItineraryWithDetails.model_rebuild()
+# Schemas con forward references: pydantic los completa en el primer uso.
+# La API los construye al arrancar (latencia predecible en la primera petición)
+if os.environ.get("PYDANTIC_EAGER_REBUILD"):
+    AttractionWithDestination.model_rebuild()
+    ConnectionWithAttractions.model_rebuild()
+
+# Adaptadores de listas: validan desde atributos ORM y serializan a JSON en
+# pydantic-core (una llamada por lista en lugar de model_validate por fila)
+ATTRACTION_LIST_ADAPTER = TypeAdapter(List[AttractionRead])
+ATTRACTION_ITEM_LIST_ADAPTER = TypeAdapter(List[AttractionListItem])
+CONNECTION_LIST_ADAPTER = TypeAdapter(List[ConnectionRead])
+DESTINATION_LIST_ADAPTER = TypeAdapter(List[DestinationRead])
+USER_PROFILE_LIST_ADAPTER = TypeAdapter(List[UserProfileRead])
+
+# Respuestas anidadas grandes: se serializan directo a bytes JSON
+ITINERARY_WITH_DAYS_ADAPTER = TypeAdapter(ItineraryWithDays)
+
+
+def dump_orm_list(adapter: TypeAdapter, rows: Iterable[Any]) -> List[dict]:
+    """
+    Serializar filas ORM con un adaptador de lista
+    
+    Args:
+        adapter: Uno de los *_LIST_ADAPTER
+        rows: Objetos ORM
+    
+    Returns:
+        List[dict]: Filas listas para JSON
+    """
+    items = adapter.validate_python(list(rows), from_attributes=True)
+    return adapter.dump_python(items, mode="json")
+
+
+def dump_orm_json(adapter: TypeAdapter, obj: Any) -> bytes:
+    """
+    Serializar un objeto ORM a JSON en pydantic-core (sin dict intermedio)
+    
+    Args:
+        adapter: Adaptador del schema de respuesta
+        obj: Objeto ORM
+    
+    Returns:
+        bytes: Cuerpo JSON para Response
+    """
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
 
 __all__ = [
     # Base
@@ -105,6 +149,7 @@ __all__ = [
     "AttractionCreate",
     "AttractionUpdate",
     "AttractionRead",
+    "AttractionListItem",
     "AttractionWithDestination",
     "AttractionWithDistance",
     "AttractionSearchParams",
@@ -133,7 +178,6 @@ __all__ = [
     "ItineraryCreate",
     "ItineraryUpdate",
     "ItineraryRead",
-    "ItineraryWithDetails",
     "ItineraryWithDays",
     "ItineraryDayBase",
     "ItineraryDayCreate",
@@ -153,4 +197,15 @@ __all__ = [
     "AttractionRatingBase",
     "AttractionRatingCreate",
     "AttractionRatingRead",
+    
+    # Serialización de listas
+    "ATTRACTION_LIST_ADAPTER",
+    "ATTRACTION_ITEM_LIST_ADAPTER",
+    "CONNECTION_LIST_ADAPTER",
+    "DESTINATION_LIST_ADAPTER",
+    "USER_PROFILE_LIST_ADAPTER",
+    "ITINERARY_WITH_DAYS_ADAPTER",
+    "DAY_DATA_ADAPTER",
+    "dump_orm_list",
+    "dump_orm_json",
 ]
\ No newline at end of file
@@ -2,17 +2,88 @@
 """
 Schemas para atracciones turísticas
 """
-from pydantic import BaseModel, Field, field_validator, ConfigDict, field_serializer
-from typing import TYPE_CHECKING, Optional, List, Dict, Any
+from pydantic import Field, field_validator, ConfigDict, field_serializer
+from typing import Optional, List, Dict, Any
 from datetime import datetime
-from .base import Location, ResponseBase, TimestampMixin
+from .base import Latitude, Longitude, PositiveId, Location, PaginatedResponse, ResponseBase, TimestampMixin, SchemaBase
 from geoalchemy2.elements import WKBElement # type: ignore
 from geoalchemy2.shape import to_shape # type: ignore
+import struct
 
-if TYPE_CHECKING:
-    from .destination import DestinationRead
+# (E)WKB: flag de SRID (PostGIS) y flags de dimensiones Z/M
+_EWKB_SRID_FLAG = 0x20000000
+_EWKB_ZM_FLAGS = 0xC0000000
+_WKB_POINT = 1
 
-class AttractionBase(BaseModel):
+_CATEGORY_NAMES = (
+    'cultural', 'aventura', 'gastronomia', 'naturaleza',
+    'entretenimiento', 'compras', 'religioso', 'historico', 'deportivo'
+)
+_VALID_CATEGORIES = frozenset(_CATEGORY_NAMES)
+_INVALID_CATEGORY_MESSAGE = f'Categoría debe ser una de: {", ".join(_CATEGORY_NAMES)}'
+
+
+def _wkb_point_text(data) -> Optional[str]:
+    """
+    Decodificar un POINT 2D (WKB o EWKB) a texto sin pasar por Shapely
+    
+    Args:
+        data: Bytes/memoryview del WKB, o su representación hexadecimal
+    
+    Returns:
+        Optional[str]: "POINT(x y)", o None si no es un POINT 2D
+    """
+    if isinstance(data, str):
+        data = bytes.fromhex(data)
+    
+    data = bytes(data)
+    if len(data) < 21:
+        return None
+    
+    endian = '<' if data[0] == 1 else '>'
+    geom_type, = struct.unpack_from(endian + 'I', data, 1)
+    if geom_type & _EWKB_ZM_FLAGS or (geom_type & 0xFFFF) != _WKB_POINT:
+        return None
+    
+    offset = 9 if geom_type & _EWKB_SRID_FLAG else 5
+    if len(data) < offset + 16:
+        return None
+    
+    x, y = struct.unpack_from(endian + 'dd', data, offset)
+    return f"POINT({x} {y})"
+
+
+def _serialize_location(value):
+    """Ubicación como texto WKT ("POINT(lon lat)")"""
+    try:
+        # 1. Si es un objeto de Base de Datos (WKBElement)
+        if hasattr(value, 'desc') or isinstance(value, WKBElement):
+            # POINT 2D: leer las coordenadas del WKB directamente
+            point_text = _wkb_point_text(value.data)
+            if point_text is not None:
+                return point_text
+            
+            # Otras geometrías: convertir con Shapely
+            point = to_shape(value)
+            # Retornamos formato texto: "POINT(-99.13 19.43)"
+            return f"POINT({point.x} {point.y})"
+        
+        # 2. Si ya es un string hexadecimal (el caso que te está pasando)
+        if isinstance(value, str) and value.startswith('01010000'):
+            # Es un hex WKB crudo. Como es difícil parsear aquí sin librerías extra,
+            # devolvemos None para que el frontend use el fallback o intentamos pasarlo.
+            # (Normalmente to_shape ya lo maneja antes de que sea string).
+            return value 
+
+        # 3. Si ya es texto o dict, lo dejamos pasar
+        return value
+        
+    except Exception as e:
+        # Si falla la conversión, retornamos string para debug
+        return str(value)
+
+
+class AttractionBase(SchemaBase):
     """Schema base de atracción"""
     name: str = Field(..., min_length=1, max_length=255, description="Nombre de la atracción")
     description: Optional[str] = Field(None, description="Descripción detallada")
@@ -24,20 +95,17 @@ class AttractionBase(BaseModel):
     @classmethod
     def validate_category(cls, v: str) -> str:
         """Validar que la categoría sea válida"""
-        valid_categories = [
-            'cultural', 'aventura', 'gastronomia', 'naturaleza',
-            'entretenimiento', 'compras', 'religioso', 'historico', 'deportivo'
-        ]
-        if v.lower() not in valid_categories:
-            raise ValueError(f'Categoría debe ser una de: {", ".join(valid_categories)}')
-        return v.lower()
+        category = v.lower()
+        if category not in _VALID_CATEGORIES:
+            raise ValueError(_INVALID_CATEGORY_MESSAGE)
+        return category
     
     
 
 
 class AttractionCreate(AttractionBase):
     """Schema para crear una atracción"""
-    destination_id: int = Field(..., gt=0, description="ID del destino")
+    destination_id: PositiveId = Field(..., description="ID del destino")
     location: Any = Field(..., description="Coordenadas (Lat/Lon dict o WKT string)")
     # Formato: {"lat": -12.0464, "lon": -77.0428}
     
@@ -64,6 +132,7 @@ class AttractionCreate(AttractionBase):
     
     
     model_config = ConfigDict(
+        defer_build=False,  # cuerpo de petición (ver SchemaBase)
         arbitrary_types_allowed=True,
         json_schema_extra={
             "example": {
@@ -97,7 +166,7 @@ class AttractionCreate(AttractionBase):
     )
 
 
-class AttractionUpdate(BaseModel):
+class AttractionUpdate(SchemaBase):
     """Schema para actualizar una atracción"""
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
@@ -114,6 +183,8 @@ class AttractionUpdate(BaseModel):
     accessibility: Optional[Dict[str, bool]] = None
     extra_data: Optional[Dict[str, Any]] = None
     images: Optional[List[Dict[str, str]]] = None
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
 
 class AttractionRead(AttractionBase, ResponseBase, TimestampMixin):
@@ -140,27 +211,23 @@ class AttractionRead(AttractionBase, ResponseBase, TimestampMixin):
 
     @field_serializer('location')
     def serialize_location(self, value, _info):
-        try:
-            # 1. Si es un objeto de Base de Datos (WKBElement)
-            if hasattr(value, 'desc') or isinstance(value, WKBElement):
-                # Convertimos el binario a objeto Python (Shapely)
-                point = to_shape(value)
-                # Retornamos formato texto: "POINT(-99.13 19.43)"
-                return f"POINT({point.x} {point.y})"
-            
-            # 2. Si ya es un string hexadecimal (el caso que te está pasando)
-            if isinstance(value, str) and value.startswith('01010000'):
-                # Es un hex WKB crudo. Como es difícil parsear aquí sin librerías extra,
-                # devolvemos None para que el frontend use el fallback o intentamos pasarlo.
-                # (Normalmente to_shape ya lo maneja antes de que sea string).
-                return value 
-
-            # 3. Si ya es texto o dict, lo dejamos pasar
-            return value
-            
-        except Exception as e:
-            # Si falla la conversión, retornamos string para debug
-            return str(value)
+        return _serialize_location(value)
+
+
+class AttractionListItem(SchemaBase):
+    """Schema reducido para listados (sin descripción ni columnas JSONB)"""
+    id: int
+    destination_id: int
+    name: str
+    category: str
+    rating: Optional[float] = None
+    location: Any = Field(..., description="Coordenadas (WKT string)")
+    
+    model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True, frozen=True)
+
+    @field_serializer('location')
+    def serialize_location(self, value, _info):
+        return _serialize_location(value)
 
 
 class AttractionWithDestination(AttractionRead):
@@ -173,7 +240,7 @@ class AttractionWithDistance(AttractionRead):
     distance_meters: float = Field(..., description="Distancia en metros desde un punto de referencia")
     travel_time_minutes: Optional[int] = Field(None, description="Tiempo estimado de viaje en minutos")
 
-class AttractionSearchParams(BaseModel):
+class AttractionSearchParams(SchemaBase):
     """Parámetros de búsqueda de atracciones (sin geolocalización)"""
     category: Optional[str] = None
     subcategory: Optional[str] = None
@@ -183,17 +250,18 @@ class AttractionSearchParams(BaseModel):
     tags: Optional[List[str]] = None
 
 
-class AttractionNearbyParams(BaseModel):
+class AttractionNearbyParams(SchemaBase):
     """Parámetros para búsqueda geoespacial"""
-    lat: float = Field(..., ge=-90, le=90, description="Latitud")
-    lon: float = Field(..., ge=-180, le=180, description="Longitud")
+    lat: Latitude = Field(..., description="Latitud")
+    lon: Longitude = Field(..., description="Longitud")
     radius_km: float = Field(5.0, gt=0, le=100, description="Radio en kilómetros")
     category: Optional[str] = None
 
 
-class AttractionListResponse(BaseModel):
+class AttractionListResponse(PaginatedResponse[AttractionRead]):
     """Respuesta de lista de atracciones"""
-    total: int
-    skip: int
-    limit: int
-    items: List[AttractionRead]
\ No newline at end of file
+
+
+# Al final del módulo (sin ciclo de imports): la forward reference 'DestinationRead'
+# queda resoluble desde este módulo y pydantic construye el schema en el primer uso
+from .destination import DestinationRead  # noqa: E402
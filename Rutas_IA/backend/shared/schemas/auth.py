@@ -1,13 +1,16 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import ConfigDict
+from .base import SchemaBase
 
-class Token(BaseModel):
+class Token(SchemaBase):
     access_token: str
     token_type: str
 
-class TokenData(BaseModel):
+class TokenData(SchemaBase):
     username: Optional[str] = None 
 
-class LoginRequest(BaseModel):
+class LoginRequest(SchemaBase):
     email: str
-    password: str
\ No newline at end of file
+    password: str
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
\ No newline at end of file
@@ -4,21 +4,39 @@ Schemas base y utilidades reutilizables
 """
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Generic, List, Optional, TypeVar
 
 
-class TimestampMixin(BaseModel):
+# Tipos restringidos comunes (un solo Annotated reutilizado por todos los schemas)
+PositiveId = Annotated[int, Field(gt=0)]
+RatingScore = Annotated[int, Field(ge=1, le=5)]
+NonNegDistance = Annotated[float, Field(ge=0)]
+Latitude = Annotated[float, Field(ge=-90, le=90)]
+Longitude = Annotated[float, Field(ge=-180, le=180)]
+
+
+class SchemaBase(BaseModel):
+    """
+    Base de los schemas: el validador se construye en el primer uso (defer_build).
+    Los schemas usados como cuerpo de petición lo desactivan: FastAPI envuelve el
+    modelo en un TypeAdapter con alias y, si se difiere, pydantic emite
+    UnsupportedFieldAttributeWarning al construirlo
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class TimestampMixin(SchemaBase):
     """Mixin para timestamps comunes"""
     created_at: datetime
     updated_at: Optional[datetime] = None
 
 
-class ResponseBase(BaseModel):
-    """Base para respuestas de API"""
-    model_config = ConfigDict(from_attributes=True)
+class ResponseBase(SchemaBase):
+    """Base para respuestas de API (inmutables: solo se construyen y serializan)"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
-class PaginationParams(BaseModel):
+class PaginationParams(SchemaBase):
     """Parámetros de paginación"""
     skip: int = 0
     limit: int = 100
@@ -33,19 +51,22 @@ class PaginationParams(BaseModel):
     )
 
 
-class PaginatedResponse(BaseModel):
-    """Respuesta paginada genérica"""
+T = TypeVar("T")
+
+
+class PaginatedResponse(SchemaBase, Generic[T]):
+    """Respuesta paginada genérica (PaginatedResponse[ItemSchema])"""
     total: int
     skip: int
     limit: int
-    items: list
+    items: List[T]
 
 
-class MessageResponse(BaseModel):
+class MessageResponse(SchemaBase):
     """Respuesta simple con mensaje"""
     message: str
     detail: Optional[str] = None
 
-class Location(BaseModel):
-    lat: float = Field(..., ge=-90, le=90)
-    lon: float = Field(..., ge=-180, le=180)
\ No newline at end of file
+class Location(SchemaBase):
+    lat: Latitude
+    lon: Longitude
\ No newline at end of file
@@ -2,47 +2,38 @@
 """
 Schemas para conexiones entre atracciones
 """
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, TYPE_CHECKING
+from pydantic import Field, ConfigDict, model_validator
+from typing import Literal, Optional
 from datetime import datetime
-from .base import ResponseBase, TimestampMixin
+from .base import NonNegDistance, PositiveId, ResponseBase, TimestampMixin, SchemaBase
 
-if TYPE_CHECKING:
-    from .attraction import AttractionRead
+# Modos de transporte válidos (validados en pydantic-core, sin validador Python)
+TransportMode = Literal['walking', 'car', 'public_transport', 'bicycle', 'taxi']
 
 
-class ConnectionBase(BaseModel):
+class ConnectionBase(SchemaBase):
     """Schema base de conexión"""
-    distance_meters: float = Field(..., ge=0, description="Distancia en metros")
+    distance_meters: NonNegDistance = Field(..., description="Distancia en metros")
     travel_time_minutes: int = Field(..., gt=0, description="Tiempo de viaje en minutos")
-    transport_mode: str = Field(..., description="Modo de transporte")
+    transport_mode: TransportMode = Field(..., description="Modo de transporte")
     cost: Optional[float] = Field(0.0, ge=0, description="Costo del desplazamiento")
     traffic_factor: Optional[float] = Field(1.0, ge=0.5, le=3.0, description="Factor de tráfico")
-    
-    @field_validator('transport_mode')
-    @classmethod
-    def validate_transport_mode(cls, v: str) -> str:
-        """Validar modo de transporte"""
-        valid_modes = ['walking', 'car', 'public_transport', 'bicycle', 'taxi']
-        if v.lower() not in valid_modes:
-            raise ValueError(f'transport_mode debe ser uno de: {", ".join(valid_modes)}')
-        return v.lower()
 
 
 class ConnectionCreate(ConnectionBase):
     """Schema para crear una conexión"""
-    from_attraction_id: int = Field(..., gt=0, description="ID de atracción origen")
-    to_attraction_id: int = Field(..., gt=0, description="ID de atracción destino")
+    from_attraction_id: PositiveId = Field(..., description="ID de atracción origen")
+    to_attraction_id: PositiveId = Field(..., description="ID de atracción destino")
     
-    @field_validator('to_attraction_id')
-    @classmethod
-    def validate_different_attractions(cls, v: int, info) -> int:
+    @model_validator(mode='after')
+    def validate_different_attractions(self) -> 'ConnectionCreate':
         """Validar que origen y destino sean diferentes"""
-        if 'from_attraction_id' in info.data and v == info.data['from_attraction_id']:
+        if self.from_attraction_id == self.to_attraction_id:
             raise ValueError('from_attraction_id y to_attraction_id deben ser diferentes')
-        return v
+        return self
     
     model_config = ConfigDict(
+        defer_build=False,  # cuerpo de petición (ver SchemaBase)
         json_schema_extra={
             "example": {
                 "from_attraction_id": 1,
@@ -57,13 +48,15 @@ class ConnectionCreate(ConnectionBase):
     )
 
 
-class ConnectionUpdate(BaseModel):
+class ConnectionUpdate(SchemaBase):
     """Schema para actualizar una conexión"""
-    distance_meters: Optional[float] = Field(None, ge=0)
+    distance_meters: Optional[NonNegDistance] = None
     travel_time_minutes: Optional[int] = Field(None, gt=0)
-    transport_mode: Optional[str] = None
+    transport_mode: Optional[TransportMode] = None
     cost: Optional[float] = Field(None, ge=0)
     traffic_factor: Optional[float] = Field(None, ge=0.5, le=3.0)
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
 
 class ConnectionRead(ConnectionBase, ResponseBase, TimestampMixin):
@@ -71,6 +64,7 @@ class ConnectionRead(ConnectionBase, ResponseBase, TimestampMixin):
     id: int
     from_attraction_id: int
     to_attraction_id: int
+    weighted_time: Optional[float] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -81,10 +75,15 @@ class ConnectionWithAttractions(ConnectionRead):
     to_attraction: 'AttractionRead'    # ← Forward reference
 
 
-class ConnectionSearchParams(BaseModel):
+class ConnectionSearchParams(SchemaBase):
     """Parámetros de búsqueda de conexiones"""
     from_attraction_id: Optional[int] = None
     to_attraction_id: Optional[int] = None
     transport_mode: Optional[str] = None
     max_distance_meters: Optional[float] = Field(None, gt=0)
-    max_travel_time_minutes: Optional[int] = Field(None, gt=0)
\ No newline at end of file
+    max_travel_time_minutes: Optional[int] = Field(None, gt=0)
+
+
+# Al final del módulo (sin ciclo de imports): la forward reference 'AttractionRead'
+# queda resoluble desde este módulo y pydantic construye el schema en el primer uso
+from .attraction import AttractionRead  # noqa: E402
@@ -2,13 +2,13 @@
 """
 Schemas para destinos turísticos
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import Field, ConfigDict
 from typing import Optional
 from datetime import datetime
-from .base import ResponseBase, TimestampMixin
+from .base import Location, ResponseBase, TimestampMixin, SchemaBase
 
 
-class DestinationBase(BaseModel):
+class DestinationBase(SchemaBase):
     """Schema base de destino"""
     name: str = Field(..., min_length=1, max_length=255, description="Nombre del destino")
     country: str = Field(..., min_length=1, max_length=100, description="País")
@@ -20,10 +20,10 @@ class DestinationBase(BaseModel):
 
 class DestinationCreate(DestinationBase):
     """Schema para crear un destino"""
-    location: dict = Field(..., description="Coordenadas geográficas")
-    # Formato: {"lat": -12.0464, "lon": -77.0428}
+    location: Location = Field(..., description="Coordenadas geográficas (WGS84)")
     
     model_config = ConfigDict(
+        defer_build=False,  # cuerpo de petición (ver SchemaBase)
         json_schema_extra={
             "example": {
                 "name": "Lima",
@@ -38,7 +38,7 @@ class DestinationCreate(DestinationBase):
     )
 
 
-class DestinationUpdate(BaseModel):
+class DestinationUpdate(SchemaBase):
     """Schema para actualizar un destino"""
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     country: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -46,6 +46,8 @@ class DestinationUpdate(BaseModel):
     timezone: Optional[str] = Field(None, max_length=50)
     description: Optional[str] = Field(None, max_length=1000)
     population: Optional[int] = Field(None, ge=0)
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
 
 class DestinationRead(DestinationBase, ResponseBase, TimestampMixin):
@@ -2,27 +2,38 @@
 """
 Schemas Pydantic para itinerarios (VERSIÓN MEJORADA)
 """
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date
+from pydantic import Field, ConfigDict, TypeAdapter, field_validator, field_serializer
+from .base import PositiveId, RatingScore, ResponseBase, SchemaBase
+from typing import Literal, Optional, List, Dict, Any
+from datetime import datetime, date, time
 from decimal import Decimal
 
 
+# Valores cerrados (validados en pydantic-core como Literal, sin regex)
+ItineraryStatus = Literal['draft', 'confirmed', 'in_progress', 'completed', 'cancelled']
+OptimizationMode = Literal['distance', 'time', 'cost', 'balanced', 'score']
+
+
 # ============================================================
 # SCHEMAS AUXILIARES
 # ============================================================
 
-class AttractionInDay(BaseModel):
+class AttractionInDay(SchemaBase):
     """Atracción dentro de un día del itinerario"""
     attraction_id: int
     order: int
-    arrival_time: Optional[str] = None  # "09:00"
-    departure_time: Optional[str] = None  # "10:30"
+    arrival_time: Optional[time] = None  # "09:00"
+    departure_time: Optional[time] = None  # "10:30"
     visit_duration_minutes: int
     score: Optional[float] = None
 
+    @field_serializer('arrival_time', 'departure_time')
+    def serialize_clock(self, value: Optional[time], _info) -> Optional[str]:
+        """Mantener el formato "HH:MM" en las respuestas"""
+        return value.strftime('%H:%M') if value is not None else None
+
 
-class RouteSegment(BaseModel):
+class RouteSegment(SchemaBase):
     """Segmento de ruta entre dos atracciones"""
     from_attraction_id: int
     to_attraction_id: int
@@ -32,7 +43,7 @@ class RouteSegment(BaseModel):
     cost: float
 
 
-class DaySummary(BaseModel):
+class DaySummary(SchemaBase):
     """Resumen de métricas de un día"""
     total_distance_meters: float
     total_time_minutes: int
@@ -41,17 +52,21 @@ class DaySummary(BaseModel):
     optimization_score: Optional[float] = None
 
 
-class DayData(BaseModel):
+class DayData(SchemaBase):
     """Estructura completa de datos de un día"""
     attractions: List[AttractionInDay]
     segments: List[RouteSegment]
 
 
+# day_data (JSONB) de un día de itinerario
+DAY_DATA_ADAPTER = TypeAdapter(DayData)
+
+
 # ============================================================
 # ITINERARY DAY SCHEMAS
 # ============================================================
 
-class ItineraryDayBase(BaseModel):
+class ItineraryDayBase(SchemaBase):
     """Schema base para días de itinerario"""
     day_number: int = Field(... , ge=1, description="Número del día (1, 2, 3...)")
     date: date
@@ -71,11 +86,11 @@ class ItineraryDayCreate(ItineraryDayBase):
     optimization_score: Optional[float] = None
 
 
-class ItineraryDayRead(ItineraryDayBase):
+class ItineraryDayRead(ItineraryDayBase, ResponseBase):
     """Schema para leer un día de itinerario"""
     id: int
     itinerary_id: int
-    day_data: Dict[str, Any]
+    day_data: DayData
     cluster_centroid_lat: Optional[float] = None
     cluster_centroid_lon: Optional[float] = None
     total_distance_meters: Optional[float] = None
@@ -86,10 +101,16 @@ class ItineraryDayRead(ItineraryDayBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    @field_validator('day_data', mode='before')
+    @classmethod
+    def parse_day_data(cls, v):
+        """Aceptar day_data como texto JSON (sin pasar por un dict intermedio)"""
+        if isinstance(v, (str, bytes)):
+            return DAY_DATA_ADAPTER.validate_json(v)
+        return v
 
 
-class ItineraryDayUpdate(BaseModel):
+class ItineraryDayUpdate(SchemaBase):
     """Schema para actualizar un día"""
     day_data: Optional[DayData] = None
     date: Optional[date] = None
@@ -99,7 +120,7 @@ class ItineraryDayUpdate(BaseModel):
 # ITINERARY SCHEMAS
 # ============================================================
 
-class ItineraryBase(BaseModel):
+class ItineraryBase(SchemaBase):
     """Schema base de itinerario"""
     name: Optional[str] = Field(None, max_length=255)
     description: Optional[str] = None
@@ -108,8 +129,8 @@ class ItineraryBase(BaseModel):
 
 class ItineraryCreate(ItineraryBase):
     """Schema para crear un itinerario"""
-    user_profile_id: int = Field(..., gt=0)
-    destination_id: int = Field(..., gt=0)
+    user_profile_id: PositiveId
+    destination_id: PositiveId
     start_point_id: Optional[int] = None
     num_days: int = Field(..., ge=1, le=14)
     generation_params: Optional[Dict[str, Any]] = None
@@ -140,20 +161,19 @@ class ItineraryCreate(ItineraryBase):
     )
 
 
-class ItineraryUpdate(BaseModel):
+class ItineraryUpdate(SchemaBase):
     """Schema para actualizar un itinerario"""
     name: Optional[str] = Field(None, max_length=255)
     description: Optional[str] = None
-    status: Optional[str] = Field(
-        None, 
-        pattern="^(draft|confirmed|in_progress|completed|cancelled)$"
-    )
-    user_rating: Optional[int] = Field(None, ge=1, le=5)
+    status: Optional[ItineraryStatus] = None
+    user_rating: Optional[RatingScore] = None
     user_feedback: Optional[str] = None
     manually_edited: Optional[bool] = None
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
 
-class ItineraryRead(ItineraryBase):
+class ItineraryRead(ItineraryBase, ResponseBase):
     """Schema para leer un itinerario"""
     id: int
     user_profile_id: int
@@ -175,38 +195,31 @@ class ItineraryRead(ItineraryBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
-
 
 class ItineraryWithDays(ItineraryRead):
     """Itinerario completo con días incluidos"""
     days: List[ItineraryDayRead]
 
 
-class ItineraryWithDetails(ItineraryWithDays):
-    """Itinerario con días y detalles de atracciones"""
-    destination_name: Optional[str] = None
-    start_point_name: Optional[str] = None
-
-
 # ============================================================
 # REQUEST/RESPONSE SCHEMAS
 # ============================================================
 
-class ItineraryGenerationRequest(BaseModel):
+class ItineraryGenerationRequest(SchemaBase):
     """Request para generar itinerario"""
-    user_profile_id: int = Field(..., gt=0)
-    city_center_id: int = Field(..., gt=0, description="ID de atracción céntrica")
-    hotel_id: Optional[int] = Field(None, gt=0, description="ID del hotel (opcional)")
+    user_profile_id: PositiveId
+    city_center_id: PositiveId = Field(..., description="ID de atracción céntrica")
+    hotel_id: Optional[PositiveId] = Field(None, description="ID del hotel (opcional)")
     num_days: int = Field(..., ge=1, le=14)
     start_date: datetime = Field(..., description="Fecha y hora de inicio")
     
     # Parámetros opcionales de generación
-    optimization_mode: str = Field(default="balanced", pattern="^(distance|time|cost|balanced|score)$")
+    optimization_mode: OptimizationMode = "balanced"
     max_radius_km: float = Field(default=10.0, gt=0, le=50)
     max_candidates: int = Field(default=50, ge=10, le=200)
     
     model_config = ConfigDict(
+        defer_build=False,  # cuerpo de petición (ver SchemaBase)
         json_schema_extra={
             "example": {
                 "user_profile_id": 1,
@@ -222,7 +235,7 @@ class ItineraryGenerationRequest(BaseModel):
     )
 
 
-class ItineraryGenerationResponse(BaseModel):
+class ItineraryGenerationResponse(SchemaBase):
     """Respuesta de generación de itinerario"""
     itinerary_id: int
     message: str
@@ -234,20 +247,20 @@ class ItineraryGenerationResponse(BaseModel):
 # EDIT SCHEMAS
 # ============================================================
 
-class ReorderAttractionsRequest(BaseModel):
+class ReorderAttractionsRequest(SchemaBase):
     """Request para reordenar atracciones de un día"""
     day_number: int = Field(..., ge=1)
     new_order: List[int] = Field(..., min_length=1, description="IDs de atracciones en nuevo orden")
 
 
-class AddAttractionRequest(BaseModel):
+class AddAttractionRequest(SchemaBase):
     """Request para agregar atracción a un día"""
     day_number: int = Field(..., ge=1)
-    attraction_id: int = Field(..., gt=0)
+    attraction_id: PositiveId
     position: int = Field(..., ge=1, description="Posición en el orden (1-indexed)")
 
 
-class RemoveAttractionRequest(BaseModel):
+class RemoveAttractionRequest(SchemaBase):
     """Request para eliminar atracción de un día"""
     day_number: int = Field(..., ge=1)
-    attraction_id: int = Field(..., gt=0)
\ No newline at end of file
+    attraction_id: PositiveId
\ No newline at end of file
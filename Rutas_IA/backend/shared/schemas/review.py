@@ -2,21 +2,21 @@
 """
 Schemas para reseñas y ratings
 """
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import Field, field_validator, ConfigDict
 from typing import Optional
 from datetime import datetime
-from .base import ResponseBase, TimestampMixin
+from .base import PositiveId, RatingScore, ResponseBase, TimestampMixin, SchemaBase
 
 
-class ReviewBase(BaseModel):
+class ReviewBase(SchemaBase):
     """Schema base de reseña"""
     text: str = Field(..., min_length=10, max_length=5000, description="Texto de la reseña")
-    rating: Optional[int] = Field(None, ge=1, le=5, description="Rating de 1 a 5")
+    rating: Optional[RatingScore] = Field(None, description="Rating de 1 a 5")
 
 
 class ReviewCreate(ReviewBase):
     """Schema para crear una reseña"""
-    attraction_id: int = Field(..., gt=0, description="ID de la atracción")
+    attraction_id: PositiveId = Field(..., description="ID de la atracción")
     source: str = Field(..., max_length=100, description="Fuente de la reseña")
     language: Optional[str] = Field("es", max_length=10, description="Idioma de la reseña")
     author: Optional[str] = Field(None, max_length=255, description="Autor de la reseña")
@@ -60,9 +60,9 @@ class ReviewRead(ReviewBase, ResponseBase, TimestampMixin):
     model_config = ConfigDict(from_attributes=True)
 
 
-class AttractionRatingBase(BaseModel):
+class AttractionRatingBase(SchemaBase):
     """Schema base de rating"""
-    rating: int = Field(..., ge=1, le=5, description="Rating de 1 a 5")
+    rating: RatingScore = Field(..., description="Rating de 1 a 5")
     feedback: Optional[str] = Field(None, max_length=1000, description="Comentario opcional")
     visit_context: Optional[str] = Field(None, description="Contexto de la visita")
     
@@ -79,8 +79,8 @@ class AttractionRatingBase(BaseModel):
 
 class AttractionRatingCreate(AttractionRatingBase):
     """Schema para crear un rating"""
-    user_profile_id: int = Field(..., gt=0, description="ID del perfil de usuario")
-    attraction_id: int = Field(..., gt=0, description="ID de la atracción")
+    user_profile_id: PositiveId = Field(..., description="ID del perfil de usuario")
+    attraction_id: PositiveId = Field(..., description="ID de la atracción")
     visit_date: Optional[datetime] = Field(None, description="Fecha de visita")
     
     model_config = ConfigDict(
@@ -1,18 +1,19 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import ConfigDict, EmailStr, Field
+from .base import ResponseBase, SchemaBase
 from datetime import datetime
 
-class UserBase(BaseModel):
+class UserBase(SchemaBase):
     email: EmailStr
     full_name: Optional[str] = None
     is_active: Optional[bool] = True
 
 class UserCreate(UserBase):
     password: str = Field(..., min_length=8, description="Contraseña del usuario")
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
-class UserRead(UserBase):
+class UserRead(UserBase, ResponseBase):
     id: int
     created_at: datetime
-    updated_at: Optional[datetime] = None
-
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    updated_at: Optional[datetime] = None
\ No newline at end of file
@@ -2,19 +2,19 @@
 """
 Schemas para perfiles de usuario
 """
-from pydantic import BaseModel, Field, EmailStr, field_validator, ConfigDict
+from pydantic import Field, EmailStr, field_validator, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from .base import ResponseBase, TimestampMixin
+from .base import ResponseBase, TimestampMixin, SchemaBase
 
 
-class UserProfileBase(BaseModel):
+class UserProfileBase(SchemaBase):
     """Schema base de perfil de usuario"""
     name: Optional[str] = Field(None, max_length=255, description="Nombre del usuario")
     email: Optional[EmailStr] = Field(None, description="Email del usuario")
 
 
-class PreferencesSchema(BaseModel):
+class PreferencesSchema(SchemaBase):
     """Schema para preferencias del usuario"""
     interests: List[str] = Field(..., min_length=1, description="Intereses principales")
     tourism_type: str = Field(..., description="Tipo de turismo preferido")
@@ -31,7 +31,7 @@ class PreferencesSchema(BaseModel):
         return v.lower()
 
 
-class MobilityConstraintsSchema(BaseModel):
+class MobilityConstraintsSchema(SchemaBase):
     """Schema para restricciones de movilidad"""
     max_walking_distance: Optional[int] = Field(None, gt=0, description="Distancia máxima a caminar en metros")
     preferred_transport: Optional[List[str]] = Field(default_factory=list)
@@ -57,6 +57,7 @@ class UserProfileCreate(UserProfileBase):
         return v
     
     model_config = ConfigDict(
+        defer_build=False,  # cuerpo de petición (ver SchemaBase)
         json_schema_extra={
             "example": {
                 "name": "Juan Pérez",
@@ -81,7 +82,7 @@ class UserProfileCreate(UserProfileBase):
     )
 
 
-class UserProfileUpdate(BaseModel):
+class UserProfileUpdate(SchemaBase):
     """Schema para actualizar un perfil de usuario"""
     name: Optional[str] = Field(None, max_length=255)
     email: Optional[EmailStr] = None
@@ -90,6 +91,8 @@ class UserProfileUpdate(BaseModel):
     budget_min: Optional[int] = Field(None, ge=0)
     budget_max: Optional[int] = Field(None, ge=0)
     mobility_constraints: Optional[Dict[str, Any]] = None
+    
+    model_config = ConfigDict(defer_build=False)  # cuerpo de petición (ver SchemaBase)
 
 
 class UserProfileRead(UserProfileBase, ResponseBase, TimestampMixin):
@@ -1,31 +1,42 @@
 import logging
 import sys
+from functools import lru_cache
 from shared.config.settings import get_settings
 
 settings = get_settings()
 
+# Nivel resuelto una sola vez
+_LEVEL = getattr(logging, settings.LOG_LEVEL)
+
+# Formato común de todos los loggers
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# El formato no usa hilo, proceso ni archivo/línea: no calcularlos en cada LogRecord
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging._srcfile = None
+
+@lru_cache(maxsize=None)
 def setup_logger(name: str) -> logging.Logger:
     """Configura y retorna un logger"""
-    
+
     logger = logging.getLogger(name)
-    
+
     # ✅ Evitar duplicar handlers
     if logger.handlers:
         return logger
-    
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
+
+    logger.setLevel(_LEVEL)
+
     # Handler para consola
     handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
-    # Formato
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    
+    handler.setLevel(_LEVEL)
+    handler.setFormatter(_FORMATTER)
+
     logger.addHandler(handler)
-    
-    return logger
\ No newline at end of file
+
+    return logger
@@ -0,0 +1,15 @@
+# shared/utils/numbers.py
+"""
+Conversión de valores numéricos de la BD (Decimal / NULL) para respuestas JSON
+"""
+from decimal import Decimal
+from typing import Optional, Union
+
+
+def optional_float(value: Optional[Union[Decimal, float, int]]) -> Optional[float]:
+    """
+    Convertir a float conservando NULL
+    
+    A diferencia de `float(x) if x else None`, un 0 se mantiene como 0.0.
+    """
+    return None if value is None else float(value)
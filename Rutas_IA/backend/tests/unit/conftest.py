@@ -0,0 +1,46 @@
+# backend/tests/unit/conftest.py
+"""
+Fixtures de las pruebas unitarias
+"""
+import random
+from datetime import datetime, time
+
+import pytest
+
+
+def _random_contexts(n: int, seed: int):
+    """Memorias de trabajo variadas, incluidas formas que hacen fallar condiciones"""
+    rng = random.Random(seed)
+    contexts = []
+    for _ in range(n):
+        ctx = {'computed_profile': {}, 'warnings': [], 'validation_errors': [], 'applied_rules': []}
+        ctx['preferences'] = rng.choice([
+            {},
+            {'tourism_type': rng.choice(['familiar', 'cultural']), 'pace': rng.choice(['relaxed', 'intense', 'moderate'])},
+            None,
+        ])
+        ctx['budget_range'] = rng.choice(['bajo', 'ALTO', 'lujo', 'medio', None])
+        ctx['weather'] = rng.choice([
+            {},
+            {'condition': 'rain', 'temperature': rng.choice([20, 31, 'x'])},
+            {'temperature': 35.5},
+        ])
+        if rng.random() < 0.5:
+            ctx['mobility_constraints'] = {'max_walking_distance': rng.choice([500, 3000, 'x'])}
+        ctx['current_time'] = time(rng.randint(0, 23), rng.randint(0, 59))
+        ctx['current_date'] = datetime(2024, 5, rng.randint(1, 30))
+        if rng.random() < 0.5:
+            ctx['itinerary'] = {'attractions': [
+                {'estimated_cost': rng.randint(0, 500), 'travel_time': rng.randint(0, 90)}
+                for _ in range(rng.randint(0, 8))
+            ]}
+        if rng.random() < 0.5:
+            ctx['budget_max'] = rng.choice([100, 1000])
+        contexts.append(ctx)
+    return contexts
+
+
+@pytest.fixture
+def random_contexts():
+    """Generador de memorias de trabajo aleatorias (reproducibles por semilla)"""
+    return _random_contexts
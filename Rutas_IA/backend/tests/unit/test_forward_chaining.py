@@ -0,0 +1,123 @@
+# backend/tests/unit/test_forward_chaining.py
+"""
+Motor de forward chaining: MATCH generado, tabla de predicados compilada
+e infer / infer_batch frente a resultados conocidos
+"""
+import random
+from datetime import datetime, time
+
+import pytest
+
+from services.rules_engine.forward_chaining import ForwardChainingEngine
+from services.rules_engine.rules_base import RulesBase
+
+
+def _context(**fields):
+    ctx = {'computed_profile': {}, 'applied_rules': [], 'warnings': [], 'validation_errors': []}
+    ctx.update(fields)
+    return ctx
+
+
+# Contextos fijos y las reglas que aplicaba el motor original (regla por regla)
+FIXED_CASES = [
+    (
+        _context(preferences={'tourism_type': 'familiar', 'pace': 'relaxed'}, budget_range='bajo',
+                 current_time=time(9, 30), current_date=datetime(2024, 5, 4)),
+        ['PROFILE_001', 'PROFILE_002', 'PROFILE_005', 'TIME_001', 'TIME_004'],
+    ),
+    (
+        _context(preferences={'tourism_type': 'cultural', 'pace': 'intense'}, budget_range='alto',
+                 weather={'condition': 'rain', 'temperature': 18},
+                 current_time=time(14, 0), current_date=datetime(2024, 5, 6)),
+        ['WEATHER_001', 'PROFILE_003', 'PROFILE_006', 'TIME_002'],
+    ),
+    (
+        _context(preferences={'pace': 'moderate'}, budget_range='lujo',
+                 mobility_constraints={'max_walking_distance': 500},
+                 weather={'condition': 'sunny', 'temperature': 34},
+                 current_time=time(19, 15), current_date=datetime(2024, 5, 5)),
+        ['PROFILE_004', 'WEATHER_002', 'PROFILE_003', 'TIME_003', 'TIME_004'],
+    ),
+    (
+        _context(preferences={'tourism_type': 'aventura'}, budget_range='medio',
+                 current_time=time(23, 30), current_date=datetime(2024, 5, 8)),
+        [],
+    ),
+    (
+        _context(budget_max=200, current_time=time(10, 0), current_date=datetime(2024, 5, 7),
+                 itinerary={'attractions': [{'estimated_cost': 80, 'travel_time': 40} for _ in range(7)]}),
+        ['ITINERARY_001', 'ITINERARY_002', 'ITINERARY_003', 'TIME_001', 'ITINERARY_004'],
+    ),
+    (
+        _context(budget_max=1000, current_time=time(16, 0), current_date=datetime(2024, 5, 7),
+                 itinerary={'attractions': [{'estimated_cost': 20, 'travel_time': 10}]}),
+        ['ITINERARY_001', 'ITINERARY_002', 'ITINERARY_003', 'TIME_002', 'ITINERARY_004'],
+    ),
+]
+
+
+def _plain_first_match(rules, ctx, executed_mask, start):
+    """MATCH de referencia: primera regla pendiente cuya condición se cumple (fallo = falsa)"""
+    for idx in range(start, len(rules)):
+        if executed_mask >> idx & 1:
+            continue
+        try:
+            if rules[idx].condition(ctx):
+                return idx
+        except Exception:
+            pass
+    return None
+
+
+def test_generated_match_matches_plain_evaluation(random_contexts):
+    """El MATCH generado elige la misma regla que evaluar las condiciones una a una"""
+    engine = ForwardChainingEngine()
+    rng = random.Random(1)
+    n_rules = len(engine.rules)
+
+    for ctx in random_contexts(1000, seed=4):
+        for _ in range(5):
+            executed_mask = rng.getrandbits(n_rules)
+            start = rng.randrange(n_rules + 1)
+            engine._invalidate_alpha(None)
+
+            assert engine._match_first_rule(ctx, executed_mask, start) == \
+                _plain_first_match(engine.rules, ctx, executed_mask, start)
+
+
+def test_compiled_conditions_match_plain_evaluation(random_contexts):
+    """La tabla de predicados compilada coincide con cada condición (y marca las que fallan)"""
+    rules = list(RulesBase.get_all_rules())
+    eval_conditions, compiled_bits = RulesBase.compile_conditions(rules)
+    assert eval_conditions is not None
+
+    for ctx in random_contexts(2000, seed=3):
+        mask, unknown = eval_conditions(ctx)
+        for idx, rule in enumerate(rules):
+            if not compiled_bits >> idx & 1:
+                continue
+            try:
+                expected = bool(rule.condition(ctx))
+            except Exception:
+                assert unknown >> idx & 1, rule.id
+                continue
+            assert not unknown >> idx & 1, rule.id
+            assert bool(mask >> idx & 1) == expected, rule.id
+
+
+@pytest.mark.parametrize("ctx, expected_rules", FIXED_CASES)
+def test_infer_fixed_contexts(ctx, expected_rules):
+    """infer aplica las mismas reglas que el motor original"""
+    result = ForwardChainingEngine().infer(ctx)
+
+    assert [entry.split(':')[0] for entry in result['applied_rules']] == expected_rules
+
+
+def test_infer_batch_matches_infer_fixed_contexts():
+    """infer_batch devuelve lo mismo que infer sobre cada contexto fijo"""
+    engine = ForwardChainingEngine()
+    contexts = [ctx for ctx, _ in FIXED_CASES]
+
+    assert engine.infer_batch(contexts, enable_trace=True) == [
+        engine.infer(ctx, enable_trace=True) for ctx in contexts
+    ]
@@ -0,0 +1,82 @@
+# backend/tests/unit/test_held_karp.py
+"""
+Orden de visita de Held-Karp frente a fuerza bruta
+"""
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from services.route_optimizer.service import RouterOptimizerService
+
+
+def _path_cost(weighted_matrix, start_idx, stop_columns, end_idx, order):
+    """Costo de visitar las paradas en `order` (0 al cerrar si la última ya es el destino)"""
+    columns = [int(stop_columns[i]) for i in order]
+    cost = weighted_matrix[start_idx, columns[0]]
+    for src, dst in zip(columns, columns[1:]):
+        cost += weighted_matrix[src, dst]
+    if columns[-1] != end_idx:
+        cost += weighted_matrix[columns[-1], end_idx]
+    return cost
+
+
+def _brute_force_order(weighted_matrix, start_idx, stop_columns, end_idx):
+    best_order, best_cost = None, np.inf
+    for order in permutations(range(len(stop_columns))):
+        cost = _path_cost(weighted_matrix, start_idx, stop_columns, end_idx, order)
+        if cost < best_cost:
+            best_order, best_cost = list(order), cost
+    return best_order
+
+
+def _random_matrix(rng, size, missing_fraction=0.0):
+    """Costos continuos (sin empates) y, opcionalmente, rutas inexistentes (inf)"""
+    weighted_matrix = rng.uniform(1.0, 100.0, size=(size, size))
+    if missing_fraction:
+        weighted_matrix[rng.random((size, size)) < missing_fraction] = np.inf
+    np.fill_diagonal(weighted_matrix, 0.0)
+    return weighted_matrix
+
+
+@pytest.mark.parametrize("n_stops", range(2, 9))
+def test_held_karp_matches_brute_force(n_stops):
+    """Inicio en la fila 0, paradas 1..n y destino final aparte"""
+    rng = np.random.default_rng(n_stops)
+    stop_columns = np.arange(1, n_stops + 1)
+    end_idx = n_stops + 1
+
+    for missing_fraction in (0.0, 0.3):
+        for _ in range(5):
+            weighted_matrix = _random_matrix(rng, n_stops + 2, missing_fraction)
+
+            expected = _brute_force_order(weighted_matrix, 0, stop_columns, end_idx)
+            got = RouterOptimizerService._held_karp_order(weighted_matrix, 0, stop_columns, end_idx)
+
+            assert got == expected
+
+
+@pytest.mark.parametrize("n_stops", range(2, 9))
+def test_held_karp_end_is_a_stop(n_stops):
+    """Si el destino final es una de las paradas, cerrar en ella no cuesta nada"""
+    rng = np.random.default_rng(100 + n_stops)
+    stop_columns = np.arange(1, n_stops + 1)
+    end_idx = int(stop_columns[-1])
+
+    for _ in range(5):
+        weighted_matrix = _random_matrix(rng, n_stops + 1)
+
+        expected = _brute_force_order(weighted_matrix, 0, stop_columns, end_idx)
+        got = RouterOptimizerService._held_karp_order(weighted_matrix, 0, stop_columns, end_idx)
+
+        assert got == expected
+
+
+def test_held_karp_without_complete_tour():
+    """Sin recorrido que pase por todas las paradas devuelve None"""
+    weighted_matrix = _random_matrix(np.random.default_rng(0), 5)
+    # La parada de la columna 3 no es alcanzable desde ningún nodo
+    weighted_matrix[:, 3] = np.inf
+    weighted_matrix[3, 3] = 0.0
+
+    assert RouterOptimizerService._held_karp_order(weighted_matrix, 0, np.arange(1, 4), 4) is None
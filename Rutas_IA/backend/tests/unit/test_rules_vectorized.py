@@ -0,0 +1,37 @@
+# backend/tests/unit/test_rules_vectorized.py
+"""
+RulesBase.vectorized_eval frente a la evaluación regla por regla
+"""
+import pytest
+
+from services.rules_engine.forward_chaining import ForwardChainingEngine
+from services.rules_engine.rules_base import RulesBase
+
+
+def test_vectorized_eval_matches_scalar_conditions(random_contexts):
+    """Cada bit conocido coincide con la condición; las que fallan quedan como desconocidas"""
+    contexts = random_contexts(2000, seed=7)
+    mask, unknown = RulesBase.vectorized_eval(contexts)
+
+    for row, ctx in enumerate(contexts):
+        for rule in RulesBase.get_all_rules():
+            bit = 1 << rule.cond_op
+            try:
+                expected = bool(rule.condition(ctx))
+            except Exception:
+                assert unknown[row] & bit, (row, rule.id)
+                continue
+            if not unknown[row] & bit:
+                assert bool(mask[row] & bit) == expected, (row, rule.id)
+
+
+@pytest.mark.parametrize("with_metadata", [True, False])
+def test_infer_batch_seeded_by_vectorized_eval_matches_infer(random_contexts, with_metadata):
+    """infer_batch (semilla vectorizada) da el mismo resultado que infer por fila"""
+    contexts = random_contexts(500, seed=11)
+    engine = ForwardChainingEngine()
+
+    batch = engine.infer_batch(contexts, enable_trace=with_metadata, with_metadata=with_metadata)
+    single = [engine.infer(ctx, enable_trace=with_metadata, with_metadata=with_metadata) for ctx in contexts]
+
+    assert batch == single